@@ -1,33 +1,101 @@
 from __future__ import annotations
 
 import os
+import csv
+import asyncio
+import bisect
+import hashlib
+import heapq
+import io
 import json
+import logging
+import sys
+import time
+import uuid
+import queue
+import threading
+import zlib
+import urllib.parse
 import datetime as dt
-from typing import List, Optional, Dict, Any
-
-from fastapi import FastAPI, HTTPException, Depends, Header, Query
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Annotated, List, Optional, Dict, Any, NamedTuple, AsyncIterator, Iterator, Tuple, Callable
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot updates are only serialized within one process
+    fcntl = None
+
+from fastapi import FastAPI, HTTPException, Depends, Header, Path, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 from sqlalchemy import (
-    create_engine, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, func
+    event, create_engine, Integer, Float, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, func, select, insert
 )
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, sessionmaker, Session
 
-from sklearn.linear_model import LogisticRegression
 import numpy as np
-import joblib
+# scikit-learn and joblib are imported where a model is trained, saved or unpickled, so serving
+# linear models (and starting a worker) does not pay for them
 
 # -----------------------------------------------------------------------------
 # Database setup
 # -----------------------------------------------------------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "database.db")
+DB_PATH = os.getenv("DB_PATH", os.path.join(BASE_DIR, "database.db"))
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
+# WAL lets readers run alongside the writer; NORMAL is crash-safe under WAL and skips an fsync per commit
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": "5000",
+    "temp_store": "MEMORY",
+    "cache_size": "-65536",  # KiB
+}
+
+
+def _apply_pragmas(dbapi_connection: Any, overrides: Optional[Dict[str, str]] = None) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in {**SQLITE_PRAGMAS, **(overrides or {})}.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+event.listen(engine, "connect", lambda conn, _: _apply_pragmas(conn))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Dedicated connection for the group-commit writer. It takes the write lock up front (BEGIN
+# IMMEDIATE) and fsyncs every commit, which costs one fsync per batch rather than per request.
+# pysqlite's own transaction handling is switched off so SAVEPOINTs work.
+write_engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, pool_size=1, max_overflow=0)
+
+
+@event.listens_for(write_engine, "connect")
+def _writer_connect(dbapi_connection: Any, _: Any) -> None:
+    dbapi_connection.isolation_level = None
+    _apply_pragmas(dbapi_connection, {"synchronous": "FULL"})
+
+
+@event.listens_for(write_engine, "begin")
+def _writer_begin(conn: Any) -> None:
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+WriteSessionLocal = sessionmaker(bind=write_engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
+# Async engine for the async read handlers, so they wait on SQLite without holding a threadpool thread
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{DB_PATH}")
+event.listen(async_engine.sync_engine, "connect", lambda conn, _: _apply_pragmas(conn))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 class Base(DeclarativeBase):
     pass
@@ -51,6 +119,7 @@ class Team(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(120), unique=True, index=True)
     meta: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON blob
+    sport: Mapped[Optional[str]] = mapped_column(String(50), nullable=True, index=True)  # lowercased meta["sport"]
 
     attributes: Mapped[List[TeamAttribute]] = relationship("TeamAttribute", back_populates="team", cascade="all, delete-orphan")
     feedback: Mapped[List[Feedback]] = relationship("Feedback", back_populates="team")
@@ -106,8 +175,116 @@ class Feedback(Base):
     team: Mapped[Team] = relationship("Team", back_populates="feedback")
 
 
-# Create tables
-Base.metadata.create_all(engine)
+class AttributeStat(Base):
+    """Running yes/total answer counts per attribute, maintained by `submit_responses`."""
+    __tablename__ = "attribute_stats"
+
+    attribute_id: Mapped[int] = mapped_column(ForeignKey("attributes.id", ondelete="CASCADE"), primary_key=True)
+    yes_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_answers: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class TeamStat(Base):
+    """Running support counts per team, maintained by `submit_feedback`."""
+    __tablename__ = "team_stats"
+
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
+    support_yes: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class AnalyticsCounter(Base):
+    """Named running totals (questionnaires, feedback); the 'built' row marks the stats as complete."""
+    __tablename__ = "analytics_counters"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class DataVersion(Base):
+    """Named write generations that every process sharing the database can see (see `bump_version`)."""
+    __tablename__ = "data_versions"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class WeightProfile(Base):
+    """Heuristic weights by attribute name, edited at runtime through `/weight-profiles`."""
+    __tablename__ = "weight_profiles"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)  # lowercase
+    description: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    default_weight: Mapped[float] = mapped_column(Float, default=1.0)  # for attributes not in `weights`
+    weights: Mapped[str] = mapped_column(Text, default="{}")  # JSON object: attribute name -> weight
+
+
+# Profiles a new (or reset) database starts with; after that they are rows in `weight_profiles`
+DEFAULT_WEIGHT_PROFILES: Dict[str, Dict[str, float]] = {
+    "uniform": {},
+    "sentiment_v1": {
+        "Community Engagement": 1.4,
+        "Possession Play": 1.2,
+        "Youth Academy": 1.3,
+        "National Team Contributors": 1.3,
+        "Iconic Players": 1.2,
+        "Atmospheric Stadium": 1.2,
+        "Budget Conscious": 1.0,
+        "Derby Specialists": 1.1,
+        "Big Match Temperament": 1.2,
+        "Sustainability Focus": 1.0,
+        "Historic Success": 1.3,
+        "Global Fanbase": 1.2,
+    },
+}
+
+
+def seed_weight_profiles(bind: Any) -> None:
+    """Insert `DEFAULT_WEIGHT_PROFILES` if the `weight_profiles` table is empty."""
+    with bind.begin() as conn:
+        if conn.execute(select(func.count()).select_from(WeightProfile)).scalar():
+            return
+        conn.execute(insert(WeightProfile), [
+            {"name": name, "description": None, "default_weight": 1.0, "weights": json.dumps(weights)}
+            for name, weights in DEFAULT_WEIGHT_PROFILES.items()
+        ])
+
+
+def migrate_schema(bind: Any) -> None:
+    """Bring a database created by an older version up to the current schema."""
+    with bind.begin() as conn:
+        team_columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(teams)")}
+        if "sport" not in team_columns:
+            conn.exec_driver_sql("ALTER TABLE teams ADD COLUMN sport VARCHAR(50)")
+            conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_teams_sport ON teams (sport)")
+            conn.exec_driver_sql(
+                "UPDATE teams SET sport = lower(json_extract(meta, '$.sport')) "
+                "WHERE meta IS NOT NULL AND json_valid(meta)"
+            )
+
+
+def sport_key(sport: Optional[str]) -> Optional[str]:
+    """Normalized value stored in `Team.sport`; None means no sport filter."""
+    return sport.lower() if sport else None
+
+
+def sport_slug(sport: Optional[str]) -> str:
+    """Key for a sport's files and per-sport locks; `default` means all teams (sport None).
+
+    Named sports are normalized like `sport_key` and percent-escaped. One literally called
+    "default" becomes `%64efault`, which no escaped name can produce, so keys never collide.
+    """
+    if not sport:
+        return "default"
+    slug = urllib.parse.quote(sport.lower(), safe="")
+    return "%64efault" if slug == "default" else slug
+
+
+def init_db() -> None:
+    """Create missing tables and migrate old ones; runs at startup, not on import."""
+    Base.metadata.create_all(engine)
+    migrate_schema(engine)
+    seed_weight_profiles(engine)
 
 
 # Dependency
@@ -120,42 +297,1298 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits many callers' writes in one transaction.
+
+    `submit(fn)` queues `fn(session)` and blocks until the transaction containing it has committed,
+    then returns what `fn` returned (flush inside `fn` to get generated ids). Each call runs in its
+    own SAVEPOINT, so one caller's exception is re-raised to that caller only, and in the caller's
+    context, so the statements it runs count towards that caller's request.
+    """
+
+    def __init__(self, session_factory: Any, max_batch: int = 256, max_wait: float = 0.002):
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, fn: Any, timeout: Optional[float] = 30.0) -> Any:
+        return self.submit_future(fn).result(timeout)
+
+    async def asubmit(self, fn: Any) -> Any:
+        """`submit` for async handlers: waits for the commit without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit_future(fn))
+
+    def submit_future(self, fn: Any) -> Future:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                    self._thread.start()
+        future: Future = Future()
+        self._queue.put((fn, future, copy_context()))
+        return future
+
+    def _next_batch(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            outcomes: List[tuple] = []  # (future, ok, result or exception)
+            session = self._session_factory()
+            try:
+                for fn, future, context in batch:
+                    try:
+                        with session.begin_nested():
+                            outcomes.append((future, True, context.run(fn, session)))
+                    except Exception as exc:
+                        outcomes.append((future, False, exc))
+                session.commit()
+            except Exception as exc:
+                session.rollback()
+                outcomes = [(f, False, exc) for _, f, _ in batch]
+            finally:
+                session.close()
+            for future, ok, value in outcomes:
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+
+writer = GroupCommitWriter(WriteSessionLocal)
+
+
+# -----------------------------------------------------------------------------
+# Analytics aggregates
+# -----------------------------------------------------------------------------
+def _increment(db: Session, model: Any, key: str, rows: List[Dict[str, int]]) -> None:
+    """Add each row's counts onto the stats row with the same `key`, creating it if missing."""
+    if not rows:
+        return
+    stmt = sqlite_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={c: getattr(model, c) + getattr(stmt.excluded, c) for c in rows[0] if c != key},
+    )
+    db.execute(stmt, rows)
+
+
+def bump_counter(db: Session, name: str, delta: int = 1) -> None:
+    _increment(db, AnalyticsCounter, "name", [{"name": name, "value": delta}])
+
+
+# Data versions other processes' in-memory copies are checked against: the team catalog (teams,
+# attributes, team attributes), weight profiles, training answers and the cached GET bodies
+DATA_VERSIONS = ("catalog", "weight_profiles", "answers", "attributes", "teams", "analytics")
+
+
+def bump_version(db: Session, *names: str) -> Dict[str, int]:
+    """Move the named data versions in the caller's transaction, so they commit with the write.
+
+    A missing row starts at a random value, so a recreated table never hands out a version an
+    old reader already saw. Returns the new values.
+    """
+    stmt = sqlite_insert(DataVersion).values([{"name": name, "value": int.from_bytes(os.urandom(6), "big")} for name in names])
+    stmt = stmt.on_conflict_do_update(index_elements=["name"], set_={"value": DataVersion.value + 1})
+    return dict(db.execute(stmt.returning(DataVersion.name, DataVersion.value)).tuples().all())
+
+
+def data_versions(db: Session, *names: str) -> Dict[str, int]:
+    """Current values of the named data versions in one query; 0 for one never bumped."""
+    rows = dict(db.query(DataVersion.name, DataVersion.value).filter(DataVersion.name.in_(names)).tuples().all())
+    return {name: rows.get(name, 0) for name in names}
+
+
+def data_version(db: Session, name: str) -> int:
+    return data_versions(db, name)[name]
+
+
+def rebuild_analytics(db: Session) -> None:
+    """Recompute every analytics counter from the base tables (and mark them as built)."""
+    db.query(AttributeStat).delete()
+    db.query(TeamStat).delete()
+    db.query(AnalyticsCounter).delete()
+    db.execute(sqlite_insert(AttributeStat).from_select(
+        ["attribute_id", "yes_count", "total_answers"],
+        select(QuestionnaireResponse.attribute_id, func.sum(QuestionnaireResponse.value), func.count(QuestionnaireResponse.id))
+        .group_by(QuestionnaireResponse.attribute_id),
+    ))
+    db.execute(sqlite_insert(TeamStat).from_select(
+        ["team_id", "support_yes", "total"],
+        select(Feedback.team_id, func.sum(Feedback.supported), func.count(Feedback.id)).group_by(Feedback.team_id),
+    ))
+    db.add_all([
+        AnalyticsCounter(name="questionnaires", value=db.query(func.count(Questionnaire.id)).scalar() or 0),
+        AnalyticsCounter(name="feedback", value=db.query(func.count(Feedback.id)).scalar() or 0),
+        AnalyticsCounter(name="built", value=1),
+    ])
+    bump_version(db, "analytics")
+    db.commit()
+
+
+def ensure_analytics(db: Session) -> None:
+    """Build the counters once for a database created before they existed (or after a reset)."""
+    if db.get(AnalyticsCounter, "built") is None:
+        rebuild_analytics(db)
+
+
+# -----------------------------------------------------------------------------
+# HTTP response cache
+# -----------------------------------------------------------------------------
+RESPONSE_CACHE_MAX_BYTES = 4 * 1024 * 1024  # larger bodies are revalidated by ETag but not kept in memory
+RESPONSE_CACHE_VARIANTS = 64  # cached query-string variants per resource
+RESPONSE_CACHE_CONTROL = "no-cache"  # clients may keep bodies but must revalidate each use
+
+
+class CachedBody(NamedTuple):
+    version: int
+    body: bytes
+    headers: Dict[str, str]
+
+
+class ResponseCache:
+    """The serialized GET body of each resource, kept for the data version it was built at.
+
+    Writers bump the resource's data version (see `bump_version`) in their own transaction, so
+    every process sees it. A read fetches the version before it queries, so a cached body is
+    never older than its version. ETags are the version itself and hold across workers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bodies: Dict[Tuple[str, str], CachedBody] = {}
+
+    def etag(self, resource: str, version: int) -> str:
+        return f'W/"{resource}.{version}"'
+
+    def _headers(self, resource: str, version: int, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        return {**(extra or {}), "ETag": self.etag(resource, version), "Cache-Control": RESPONSE_CACHE_CONTROL}
+
+    def lookup(self, request: Request, resource: str, version: int) -> Optional[Response]:
+        """A response if the client or the cache already has `version` of `resource`."""
+        key = str(request.query_params)
+        with self._lock:
+            entry = self._bodies.get((resource, key))
+        etag = self.etag(resource, version)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))):
+            return Response(status_code=304, headers=self._headers(resource, version))
+        if entry is not None and entry.version == version:
+            return Response(entry.body, media_type="application/json", headers=self._headers(resource, version, entry.headers))
+        return None
+
+    def _store(self, request: Request, resource: str, version: int, body: bytes, headers: Dict[str, str]) -> None:
+        if len(body) > RESPONSE_CACHE_MAX_BYTES:
+            return
+        key = (resource, str(request.query_params))
+        with self._lock:
+            self._bodies.pop(key, None)
+            self._bodies[key] = CachedBody(version, body, headers)
+            # Drop bodies of other versions, then the oldest variants beyond the limit
+            for k in [k for k, e in self._bodies.items() if k[0] == resource and e.version != version]:
+                del self._bodies[k]
+            variants = [k for k in self._bodies if k[0] == resource]
+            for k in variants[:-RESPONSE_CACHE_VARIANTS]:
+                del self._bodies[k]
+
+    def respond(self, request: Request, resource: str, version: int, body: bytes,
+                headers: Optional[Dict[str, str]] = None) -> Response:
+        self._store(request, resource, version, body, headers or {})
+        return Response(body, media_type="application/json", headers=self._headers(resource, version, headers))
+
+    def stream(self, request: Request, resource: str, version: int, chunks: Iterator[str],
+               headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+        """Stream `chunks`, keeping a copy to cache if the whole body stays under the size limit."""
+        def _tee():
+            parts: Optional[List[bytes]] = []
+            size = 0
+            for chunk in chunks:
+                data = chunk.encode()
+                yield data
+                if parts is not None:
+                    size += len(data)
+                    parts = parts if size <= RESPONSE_CACHE_MAX_BYTES else None
+                    if parts is not None:
+                        parts.append(data)
+            if parts is not None:
+                self._store(request, resource, version, b"".join(parts), headers or {})
+
+        return StreamingResponse(_tee(), media_type="application/json", headers=self._headers(resource, version, headers))
+
+
+response_cache = ResponseCache()
+
+
+# -----------------------------------------------------------------------------
+# Metrics
+# -----------------------------------------------------------------------------
+# Set METRICS=0 to skip the per-request middleware and SQL hooks entirely
+METRICS_ENABLED = os.getenv("METRICS", "1") != "0"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# name -> (type, help, buckets for histograms)
+METRIC_DEFS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    "http_requests_total": ("counter", "HTTP requests by route and status", ()),
+    "http_request_duration_seconds": ("histogram", "Time from request start to the last body byte sent", LATENCY_BUCKETS),
+    "http_request_sql_statements": ("histogram", "SQL statements executed per request", COUNT_BUCKETS),
+    "http_request_sql_duration_seconds": ("histogram", "Time spent in SQL statements per request", LATENCY_BUCKETS),
+    "sql_statements_total": ("counter", "SQL statements executed, inside a request or in the background", ()),
+    "sql_duration_seconds_total": ("counter", "Time spent in SQL statements", ()),
+    "stage_duration_seconds": ("histogram", "Time per internal stage of predict, training and model loading", LATENCY_BUCKETS),
+    "query_budget_exceeded_total": ("counter", "Requests that ran more SQL statements than their route's budget", ()),
+    "training_snapshot_total": ("counter", "Training matrix loads by snapshot outcome (reused, appended, rebuilt)", ()),
+}
+
+
+class Histogram:
+    """Bucket counts, sum and count for one label set; callers hold the registry lock."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Counters and histograms rendered in the Prometheus text format.
+
+    Recording is a dict lookup and a few additions under one lock. Gauges (cache and registry
+    state) are not stored here; `render` takes them from whoever owns that state.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[tuple, float] = {}
+        self._histograms: Dict[tuple, Histogram] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(METRIC_DEFS[name][2])
+            hist.observe(value)
+
+    def stage(self, op: str, stage: str, seconds: float) -> None:
+        self.observe("stage_duration_seconds", seconds, op=op, stage=stage)
+
+    @contextmanager
+    def timed(self, op: str, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage(op, stage, time.perf_counter() - start)
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, sql: SqlTally) -> None:
+        labels = (("method", method), ("route", route))
+        with self._lock:
+            for name, value in (("http_request_duration_seconds", seconds),
+                                ("http_request_sql_statements", sql.statements),
+                                ("http_request_sql_duration_seconds", sql.seconds)):
+                hist = self._histograms.get((name, labels))
+                if hist is None:
+                    hist = self._histograms[(name, labels)] = Histogram(METRIC_DEFS[name][2])
+                hist.observe(value)
+            for key, value in ((("http_requests_total", labels + (("status", str(status)),)), 1),
+                               (("sql_statements_total", (("context", "request"),)), sql.statements),
+                               (("sql_duration_seconds_total", (("context", "request"),)), sql.seconds)):
+                self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def render(self, gauges: List[Tuple[str, str, str, Dict[str, Any], float]]) -> str:
+        """Exposition text; `gauges` are (name, type, help, labels, value) samples taken at scrape time."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(((k, (list(h.counts), h.sum, h.count, h.buckets)) for k, h in self._histograms.items()),
+                                key=lambda item: item[0])
+        families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+        def family(name: str, kind: str, help_text: str) -> List[str]:
+            return families.setdefault(name, (kind, help_text, []))[2]
+
+        for (name, labels), value in counters:
+            family(name, *METRIC_DEFS[name][:2]).append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            lines = family(name, *METRIC_DEFS[name][:2])
+            cumulative = 0
+            for bound, n in zip(buckets + (float("inf"),), counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        for name, kind, help_text, labels, value in gauges:
+            family(name, kind, help_text).append(f"{name}{_labels(tuple(labels.items()))} {_number(value)}")
+
+        out = []
+        for name, (kind, help_text, lines) in families.items():
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+metrics = Metrics()
+
+
+class SqlTally:
+    """SQL run on behalf of one request; `log` keeps each statement only while profiling it."""
+
+    __slots__ = ("statements", "seconds", "log")
+
+    def __init__(self, log: Optional[List[tuple]] = None):
+        self.statements = 0
+        self.seconds = 0.0
+        self.log = log  # (statement, parameters, executemany, seconds)
+
+
+# Tally for the request being served; None outside a request (warmup, the writer's RELEASE SAVEPOINT)
+_request_sql: ContextVar[Optional[SqlTally]] = ContextVar("request_sql", default=None)
+
+
+def _before_cursor_execute(conn: Any, *_: Any) -> None:
+    conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    elapsed = time.perf_counter() - conn.info.pop("query_start", time.perf_counter())
+    tally = _request_sql.get()
+    if tally is not None:
+        tally.statements += 1
+        tally.seconds += elapsed
+        if tally.log is not None and len(tally.log) < PROFILE_MAX_STATEMENTS:
+            tally.log.append((statement, parameters, executemany, elapsed))
+    else:
+        metrics.inc("sql_statements_total", context="background")
+        metrics.inc("sql_duration_seconds_total", elapsed, context="background")
+
+
+if METRICS_ENABLED:
+    for _engine in (engine, write_engine, async_engine.sync_engine):
+        event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ------------------------- Request profiling ---------------------------------
+# Profile a request by sending `X-Profile: 1` with the admin token, or profile every request whose
+# path starts with one of the comma-separated PROFILE_REQUESTS prefixes ("*" for all of them).
+PROFILE_REQUESTS = tuple(p.strip() for p in os.getenv("PROFILE_REQUESTS", "").split(",") if p.strip())
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000.0
+PROFILE_SLOW_SQL_MS = float(os.getenv("PROFILE_SLOW_SQL_MS", "5"))  # statements at least this slow get a query plan
+PROFILE_KEEP = 50  # reports kept in memory for /admin/profiles
+PROFILE_MAX_STATEMENTS = 5000  # SQL log entries kept per report
+PROFILE_TOP = 30  # functions and stacks listed per report
+
+# Innermost frames of a thread waiting for work; such samples are idle time, not cost
+_IDLE_FRAMES = {
+    ("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select"),
+    ("thread.py", "_worker"), ("connection.py", "wait"),
+}
+
+
+class SamplingProfiler:
+    """Samples the Python stack of every other thread at a fixed interval from a daemon thread.
+
+    Idle samples are dropped, so with one request in flight the counts show where that request
+    spent its time; requests running concurrently are mixed into the same report.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> SamplingProfiler:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                    frame = frame.f_back
+                key = tuple(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def report(self) -> Dict[str, Any]:
+        own: Dict[str, int] = {}
+        total: Dict[str, int] = {}
+        stacks: Dict[str, int] = {}
+        for stack, n in self.stacks.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + n
+            for fn in set(stack):
+                total[fn] = total.get(fn, 0) + n
+            # Collapsed stacks (flame graph input) start at the first frame in this module
+            first = next((i for i, fn in enumerate(stack) if fn.startswith("app.py:")), 0)
+            key = ";".join(stack[first:])
+            stacks[key] = stacks.get(key, 0) + n
+        return {
+            "interval_ms": self.interval * 1000.0,
+            "samples": self.samples,
+            "functions": [{"function": fn, "self": n, "total": total[fn]}
+                          for fn, n in sorted(own.items(), key=lambda item: -item[1])[:PROFILE_TOP]],
+            "stacks": dict(sorted(stacks.items(), key=lambda item: -item[1])[:PROFILE_TOP]),
+        }
+
+
+_profiles: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def _profile_requested(scope: Dict[str, Any]) -> bool:
+    path = scope["path"]
+    if path.startswith("/admin/profiles"):
+        return False
+    if any(prefix == "*" or path.startswith(prefix) for prefix in PROFILE_REQUESTS):
+        return True
+    headers = dict(scope["headers"])
+    return headers.get(b"x-profile", b"").lower() in (b"1", b"true") and headers.get(b"x-admin-token", b"").decode() == ADMIN_TOKEN
+
+
+def _sql_params(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {k: _sql_params(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_sql_params(v) for v in parameters]
+    return parameters if isinstance(parameters, (int, float, str, type(None))) else repr(parameters)
+
+
+def _sql_report(log: List[tuple]) -> List[Dict[str, Any]]:
+    """Statement log with timings; slow statements get their `EXPLAIN QUERY PLAN`."""
+    entries = []
+    conn = engine.raw_connection()  # a raw DBAPI connection, so the EXPLAINs are not tallied
+    try:
+        cursor = conn.cursor()
+        for statement, parameters, executemany, seconds in log:
+            entry: Dict[str, Any] = {"sql": statement, "ms": round(seconds * 1000.0, 3)}
+            if executemany:
+                entry["executemany"] = len(parameters)
+                parameters = parameters[0] if parameters else ()
+            entry["params"] = _sql_params(parameters)
+            words = statement.lstrip().split(None, 1)
+            if seconds * 1000.0 >= PROFILE_SLOW_SQL_MS and words and words[0].upper() in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"):
+                try:
+                    entry["plan"] = [row[3] for row in cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)]
+                except Exception as exc:  # e.g. a temp table that is gone by now
+                    entry["plan_error"] = str(exc)
+            entries.append(entry)
+    finally:
+        conn.close()
+    return entries
+
+
+def _store_profile(profile_id: str, report: Dict[str, Any], tally: SqlTally) -> None:
+    report["sql"] = {
+        "statements": tally.statements,
+        "ms": round(tally.seconds * 1000.0, 3),
+        "log": _sql_report(tally.log or []),
+        "truncated": tally.statements > len(tally.log or []),
+    }
+    with _profiles_lock:
+        _profiles[profile_id] = report
+        while len(_profiles) > PROFILE_KEEP:
+            _profiles.popitem(last=False)
+
+
+# ------------------------- SQL query budgets ---------------------------------
+# off: ignore budgets; warn: log and count breaches; strict: also raise once the response is sent
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET", "warn")
+logger = logging.getLogger("app")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit: int) -> Any:
+    """Declare the most SQL statements one request to the decorated endpoint may run.
+
+    Place it under the route decorator. The count must not grow with table sizes; a breach is
+    logged and counted in /metrics, and under QUERY_BUDGET=strict it raises, failing the
+    TestClient (or bench) request that caused it.
+    """
+    def _declare(endpoint: Any) -> Any:
+        endpoint.query_budget = limit
+        return endpoint
+
+    return _declare
+
+
+class MetricsMiddleware:
+    """Times each HTTP request through its last body chunk and tallies the SQL it ran, per route.
+
+    Routes are labelled by their path template (`/teams/{team_id}`), so label values stay bounded.
+    The same tally drives per-request profiling and query budget checks.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        profile_id = uuid.uuid4().hex[:16] if _profile_requested(scope) else None
+        tally = SqlTally([] if profile_id else None)
+
+        async def _send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile_id:
+                    message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        token = _request_sql.set(tally)
+        profiler = SamplingProfiler(PROFILE_INTERVAL).start() if profile_id else None
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_sql.reset(token)
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            metrics.record_request(scope["method"], path, status, elapsed, tally)
+            if profiler is not None:
+                profiler.stop()
+                report = {
+                    "id": profile_id, "method": scope["method"], "path": scope["path"], "route": path,
+                    "status": status, "ms": round(elapsed * 1000.0, 3),
+                    "at": dt.datetime.utcnow().isoformat(), "profile": profiler.report(),
+                }
+                await run_in_threadpool(_store_profile, profile_id, report, tally)
+
+        budget = getattr(getattr(route, "endpoint", None), "query_budget", None)
+        if budget is not None and tally.statements > budget and QUERY_BUDGET_MODE != "off":
+            metrics.inc("query_budget_exceeded_total", method=scope["method"], route=path)
+            message = f"{scope['method']} {path} ran {tally.statements} SQL statements; its budget is {budget}"
+            if QUERY_BUDGET_MODE == "strict":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
 # -----------------------------------------------------------------------------
 # ML Model persistence
 # -----------------------------------------------------------------------------
-MODEL_DIR = os.path.join(BASE_DIR, "model")
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(BASE_DIR, "model"))
 # sport-aware model paths
 def _model_paths(sport: Optional[str] = None) -> tuple[str, str]:
-    suffix = (sport or "default").lower()
+    suffix = sport_slug(sport)
     return (
         os.path.join(MODEL_DIR, f"model_{suffix}.pkl"),
         os.path.join(MODEL_DIR, f"model_meta_{suffix}.json"),
     )
 
-os.makedirs(MODEL_DIR, exist_ok=True)
+
+def _linear_path(sport: Optional[str] = None) -> str:
+    return os.path.join(MODEL_DIR, f"model_linear_{sport_slug(sport)}.json")
 
 
-def save_model(model: Any, attribute_ids: List[int], team_ids: List[int], sport: Optional[str] = None) -> None:
+def _replace_atomic(path: str, write: Any) -> os.stat_result:
+    """Write via `write(tmp_path)` then rename over `path`; readers see the old or new file, never a partial one."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        st = os.stat(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return st
+
+
+class LinearModel:
+    """A binary linear classifier reduced to its coefficients, scored with plain NumPy.
+
+    `predict_proba` repeats what scikit-learn's linear classifiers do (float64 features, one
+    matrix product, SciPy's `expit`), so decision values and probabilities are bit-identical.
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, classes: np.ndarray, estimator: str):
+        self.coef = coef  # shape (1, n_features)
+        self.intercept = intercept  # shape (1,)
+        self.classes_ = classes
+        self.estimator = estimator
+
+    @classmethod
+    def from_estimator(cls, model: Any, n_features: int) -> Optional["LinearModel"]:
+        """Export `model` if it is a binary linear classifier whose probabilities this class reproduces."""
+        coef, intercept, classes = (getattr(model, a, None) for a in ("coef_", "intercept_", "classes_"))
+        if coef is None or intercept is None or classes is None or len(classes) != 2:
+            return None
+        linear = cls(np.asarray(coef, dtype=np.float64), np.asarray(intercept, dtype=np.float64),
+                     np.asarray(classes), type(model).__name__)
+        # Probe with each single feature, none and all; only export if the estimator really is this model
+        probe = np.vstack([np.eye(n_features, dtype=np.uint8), np.zeros((1, n_features), np.uint8), np.ones((1, n_features), np.uint8)])
+        if not np.array_equal(linear.predict_proba(probe), model.predict_proba(probe)):
+            return None
+        return linear
+
+    @classmethod
+    def load(cls, f: Any) -> "LinearModel":
+        data = json.load(f)
+        return cls(np.array(data["coef"], dtype=np.float64), np.array(data["intercept"], dtype=np.float64),
+                   np.array(data["classes"]), data["estimator"])
+
+    def dump(self, f: Any) -> None:
+        # JSON floats round-trip exactly, and the file stays readable
+        json.dump({"estimator": self.estimator, "classes": self.classes_.tolist(),
+                   "coef": self.coef.tolist(), "intercept": self.intercept.tolist()}, f)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) @ self.coef.T + self.intercept).ravel()
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        from scipy.special import expit  # what scikit-learn uses; a hand-written sigmoid differs in the last bit
+
+        p = expit(self.decision_function(X))
+        return np.vstack([1 - p, p]).T
+
+
+def model_name(model: Any) -> Optional[str]:
+    """Estimator class name reported as `model_used`, whichever form the model was loaded in."""
+    if model is None:
+        return None
+    return model.estimator if isinstance(model, LinearModel) else type(model).__name__
+
+
+def save_model(model: Any, attribute_ids: List[int], team_ids: List[int], sport: Optional[str] = None,
+               extra: Optional[Dict[str, Any]] = None) -> None:
+    import joblib
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
     model_path, meta_path = _model_paths(sport)
-    joblib.dump(model, model_path)
-    with open(meta_path, "w", encoding="utf-8") as f:
-        json.dump({
-            "attribute_ids": attribute_ids,
-            "team_ids": team_ids,
-            "saved_at": dt.datetime.utcnow().isoformat() + "Z",
-            "sklearn": type(model).__name__,
-            "sport": (sport or "default"),
-        }, f)
+    # Pickle and compact artifact first, meta last: the meta file is the commit point and records
+    # which files it belongs to
+    model_st = _replace_atomic(model_path, lambda p: joblib.dump(model, p))
+    linear = LinearModel.from_estimator(model, len(attribute_ids))
+    linear_path = _linear_path(sport)
+    if linear is not None:
+        def _write_linear(p: str) -> None:
+            with open(p, "w", encoding="utf-8") as f:
+                linear.dump(f)
+
+        linear_st = _replace_atomic(linear_path, _write_linear)
+    elif os.path.exists(linear_path):
+        os.remove(linear_path)
+    meta = {
+        "attribute_ids": attribute_ids,
+        "team_ids": team_ids,
+        "saved_at": dt.datetime.utcnow().isoformat() + "Z",
+        "sklearn": type(model).__name__,
+        "sport": (sport or "default"),
+        "version": f"{time.time_ns():x}",
+        "model_mtime_ns": model_st.st_mtime_ns,
+        "model_size": model_st.st_size,
+        **({"linear_mtime_ns": linear_st.st_mtime_ns, "linear_size": linear_st.st_size} if linear is not None else {}),
+        **(extra or {}),
+    }
+
+    def _write_meta(p: str) -> None:
+        with open(p, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    _replace_atomic(meta_path, _write_meta)
+
+
+class LoadedModel(NamedTuple):
+    model: Any
+    attribute_ids: List[int]
+    team_ids: List[int]
+    version: str
+    stamp: tuple  # (mtime_ns, size, inode) of the meta file this entry was loaded from
+    meta: Dict[str, Any]
+
+
+class ModelRegistry:
+    """Keeps one loaded model per sport in memory.
+
+    Every lookup stats the meta file; the pickle is only deserialized again when that changes.
+    Entries are replaced wholesale, so requests already holding the previous entry keep using it.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, LoadedModel] = {}
+        self._lock = threading.Lock()
+        self.loads = self.load_failures = 0
+
+    def get(self, sport: Optional[str] = None) -> Optional[LoadedModel]:
+        fresh, entry = self.cached(sport)
+        if fresh:
+            return entry
+        key = sport_slug(sport)
+        model_path, meta_path = _model_paths(sport)
+        stamp = self._stamp(meta_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                return entry
+            with metrics.timed("model_registry", "load"):
+                loaded = self._load(model_path, meta_path, _linear_path(sport))
+            if loaded is not None:
+                self._entries[key] = loaded
+                self.loads += 1
+                return loaded
+            self.load_failures += 1
+            # Files are mid-swap and never settled; keep serving what we had
+            return entry
+
+    def cached(self, sport: Optional[str] = None) -> tuple[bool, Optional[LoadedModel]]:
+        """`(True, entry)` when answering needs no unpickling (entry is None if no model is saved)."""
+        key = sport_slug(sport)
+        model_path, meta_path = _model_paths(sport)
+        stamp = self._stamp(meta_path)
+        entry = self._entries.get(key)
+        if stamp is None or not os.path.exists(model_path):
+            self._entries.pop(key, None)
+            return True, None
+        if entry is not None and entry.stamp == stamp:
+            return True, entry
+        return False, entry
+
+    def stats(self) -> Dict[str, Any]:
+        entries = dict(self._entries)
+        return {
+            "loads": self.loads,
+            "load_failures": self.load_failures,
+            "models": {key: {"version": e.version, "model": model_name(e.model)} for key, e in entries.items()},
+        }
+
+    def clear(self, sport: Optional[str] = None) -> None:
+        with self._lock:
+            if sport is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(sport_slug(sport), None)
+
+    @staticmethod
+    def _stamp(meta_path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(meta_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def load_estimator(self, sport: Optional[str] = None) -> Optional[LoadedModel]:
+        """Load the full pickled estimator (e.g. to keep training it), bypassing the cache and compact artifact."""
+        return self._load(*_model_paths(sport), linear_path=None)
+
+    def _load(self, model_path: str, meta_path: str, linear_path: Optional[str], attempts: int = 5) -> Optional[LoadedModel]:
+        for _ in range(attempts):
+            stamp = self._stamp(meta_path)
+            if stamp is None:
+                return None
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                # Linear models are served from the compact artifact; the pickle is the fallback
+                use_linear = linear_path is not None and "linear_size" in meta
+                keys = ("linear_mtime_ns", "linear_size") if use_linear else ("model_mtime_ns", "model_size")
+                if not use_linear:
+                    import joblib
+                with open(linear_path if use_linear else model_path, "r" if use_linear else "rb") as f:
+                    model_st = os.fstat(f.fileno())
+                    model = LinearModel.load(f) if use_linear else joblib.load(f)
+            except (FileNotFoundError, ValueError, EOFError, KeyError):
+                time.sleep(0.01)
+                continue
+            # A file renamed in before its meta would not match the recorded stat; retry until both agree
+            expected = (meta.get(keys[0]), meta.get(keys[1]))
+            if expected != (None, None) and expected != (model_st.st_mtime_ns, model_st.st_size):
+                time.sleep(0.01)
+                continue
+            if self._stamp(meta_path) != stamp:
+                continue
+            return LoadedModel(
+                model=model,
+                attribute_ids=meta.get("attribute_ids", []),
+                team_ids=meta.get("team_ids", []),
+                version=meta.get("version") or meta.get("saved_at", ""),
+                stamp=stamp,
+                meta=meta,
+            )
+        return None
+
+
+model_registry = ModelRegistry()
 
 
 def load_model(sport: Optional[str] = None) -> tuple[Optional[Any], Optional[List[int]], Optional[List[int]]]:
-    model_path, meta_path = _model_paths(sport)
-    if not (os.path.exists(model_path) and os.path.exists(meta_path)):
+    entry = model_registry.get(sport)
+    if entry is None:
         return None, None, None
-    model = joblib.load(model_path)
-    with open(meta_path, "r", encoding="utf-8") as f:
-        meta = json.load(f)
-    return model, meta.get("attribute_ids", []), meta.get("team_ids", [])
+    return entry.model, entry.attribute_ids, entry.team_ids
+
+
+# -----------------------------------------------------------------------------
+# Scoring engine
+# -----------------------------------------------------------------------------
+# Upper bound on the users x teams x features (or words) block materialized at once
+SCORE_BLOCK_CELLS = 8_000_000
+# Weight vectors with at most this many distinct values score the heuristic from packed bitsets
+POPCOUNT_MAX_WEIGHTS = 8
+
+
+def pack_bits(M: np.ndarray) -> np.ndarray:
+    """Pack a 0/1 matrix row-wise into uint64 words (bit j of a row is column j)."""
+    n_words = max(1, -(-M.shape[1] // 64))
+    padded = np.zeros((M.shape[0], n_words * 64), dtype=np.uint8)
+    padded[:, :M.shape[1]] = M
+    return np.packbits(padded, axis=1, bitorder="little").view(np.uint64)
+
+
+class TeamCatalog:
+    """In-memory team x attribute matrix used to score every team in one pass.
+
+    Alongside the 0/1 matrix (model features) the teams are kept as packed bitsets, one row of
+    uint64 words per 64 attributes, so the heuristic overlap for a weight vector with few distinct
+    values is a popcount of `user & team` per value. A transposed float64 copy, one contiguous row per attribute, serves any other
+    weights. Rows live in buffers with spare capacity; `set_team` updates or appends a row (bits
+    included) without rebuilding the catalog. Compiled weight profiles
+    for this attribute list are cached in `weight_vectors` (see `WeightProfileStore`).
+    """
+
+    def __init__(self, team_ids: List[int], team_names: List[str], attribute_ids: List[int],
+                 attribute_names: List[str], matrix: np.ndarray):
+        self.team_ids = team_ids
+        self.team_names = team_names
+        self.attribute_ids = attribute_ids
+        self.attribute_names = attribute_names
+        self.attr_index = {aid: i for i, aid in enumerate(attribute_ids)}
+        self.team_index = {tid: i for i, tid in enumerate(team_ids)}
+        self._matrix_buf = matrix
+        self._bits_buf = np.ascontiguousarray(pack_bits(matrix).T)
+        self._dense_buf = np.ascontiguousarray(matrix.T, dtype=np.float64)
+        self.matrix = matrix  # uint8, shape (n_teams, n_attributes), 1 if team has attribute
+        self.bits = self._bits_buf  # uint64 packed `matrix.T`, shape (n_words, n_teams)
+        self.dense = self._dense_buf  # float64 `matrix.T`, shape (n_attributes, n_teams)
+        self.weight_vectors: Dict[tuple, np.ndarray] = {}
+
+    def user_vector(self, prefs: Dict[int, int], attribute_ids: Optional[List[int]] = None) -> np.ndarray:
+        ids = self.attribute_ids if attribute_ids is None else attribute_ids
+        return np.array([1 if prefs.get(aid, 0) else 0 for aid in ids], dtype=np.uint8)
+
+    def columns(self, attribute_ids: List[int]) -> np.ndarray:
+        """Team matrix re-aligned to `attribute_ids`; ids unknown to the catalog become zero columns."""
+        if attribute_ids == self.attribute_ids:
+            return self.matrix
+        out = np.zeros((len(self.team_ids), len(attribute_ids)), dtype=np.uint8)
+        for j, aid in enumerate(attribute_ids):
+            i = self.attr_index.get(aid)
+            if i is not None:
+                out[:, j] = self.matrix[:, i]
+        return out
+
+    def weighted_overlap(self, U: np.ndarray, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """`(match, desired)`: sums of `weights` over attributes both the user and each team have, (users,
+        teams), and over all the user's attributes, (users,).
+
+        When `weights` has at most `POPCOUNT_MAX_WEIGHTS` distinct values (uniform and the stored
+        profiles), each value adds `value * popcount(user & team)` over the packed bitsets, in
+        ascending value order. The counts are exact integers, so teams with the same matching
+        attributes tie exactly and a team with all of a user's attributes scores exactly 1.0.
+        Otherwise (model weights) `match` is one float64 product, `(U * weights) @ dense`, over
+        the attributes some user answered; the product may sum in any order, so equal sums can
+        differ in the last bit.
+        """
+        values = np.unique(weights)
+        if len(values) <= POPCOUNT_MAX_WEIGHTS:
+            return self._popcount_overlap(U, weights, values)
+        cols = np.flatnonzero(U.any(axis=0))
+        weighted = U[:, cols] * weights[cols]
+        return weighted @ self.dense[cols], weighted.sum(axis=1)
+
+    def _popcount_overlap(self, U: np.ndarray, weights: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        n_users, n_teams = U.shape[0], len(self.team_ids)
+        match = np.zeros((n_users, n_teams), dtype=np.float64)
+        desired = np.zeros(n_users, dtype=np.float64)
+        answered = U.any(axis=0)
+        step = max(1, SCORE_BLOCK_CELLS // max(1, n_teams))
+        for w in values:
+            mask = answered & (weights == w)
+            if w == 0 or not mask.any():
+                continue
+            ub = pack_bits(U & mask)
+            desired += w * np.bitwise_count(ub).sum(axis=1)
+            words = np.flatnonzero(ub.any(axis=0))  # only words holding one of these attributes
+            for start in range(0, n_users, step):
+                block = ub[start:start + step]
+                counts = np.bitwise_count(block[:, words[0], None] & self.bits[words[0]]).astype(np.uint32)
+                for k in words[1:]:
+                    counts += np.bitwise_count(block[:, k, None] & self.bits[k])
+                match[start:start + step] += w * counts
+        return match, desired
+
+    def set_team(self, team_id: int, team_name: str, values: Dict[int, int]) -> Optional[TeamCatalog]:
+        """Apply `values` (attribute_id -> 0/1) to one team and return the catalog to publish.
+
+        An existing row is updated in place. A new team is written into spare buffer capacity and a
+        new catalog covering it is returned, so catalogs already handed out never change shape.
+        Returns None when `values` mention an attribute the catalog does not know (rebuild instead).
+        """
+        if any(aid not in self.attr_index for aid in values):
+            return None
+        row = self.team_index.get(team_id)
+        target = self
+        if row is None:
+            row = len(self.team_ids)
+            if row == self._matrix_buf.shape[0]:
+                capacity = max(16, 2 * row)
+                matrix_buf = np.zeros((capacity, self._matrix_buf.shape[1]), dtype=np.uint8)
+                bits_buf = np.zeros((self._bits_buf.shape[0], capacity), dtype=np.uint64)
+                dense_buf = np.zeros((self._dense_buf.shape[0], capacity), dtype=np.float64)
+                matrix_buf[:row] = self.matrix
+                bits_buf[:, :row] = self.bits
+                dense_buf[:, :row] = self.dense
+            else:
+                matrix_buf, bits_buf, dense_buf = self._matrix_buf, self._bits_buf, self._dense_buf
+                matrix_buf[row] = 0
+            target = TeamCatalog.__new__(TeamCatalog)
+            target.team_ids = self.team_ids + [team_id]
+            target.team_names = self.team_names + [team_name]
+            target.attribute_ids = self.attribute_ids
+            target.attribute_names = self.attribute_names
+            target.attr_index = self.attr_index
+            target.team_index = {**self.team_index, team_id: row}
+            target._matrix_buf, target._bits_buf, target._dense_buf = matrix_buf, bits_buf, dense_buf
+            target.matrix, target.bits, target.dense = matrix_buf[:row + 1], bits_buf[:, :row + 1], dense_buf[:, :row + 1]
+            target.weight_vectors = self.weight_vectors  # same attributes, same compiled profiles
+
+        for aid, val in values.items():
+            target._matrix_buf[row, self.attr_index[aid]] = 1 if val else 0
+        target._bits_buf[:, row] = pack_bits(target._matrix_buf[row:row + 1])[0]
+        target._dense_buf[:, row] = target._matrix_buf[row]
+        return target
+
+
+_catalogs: Dict[Optional[str], TeamCatalog] = {}  # sport -> catalog of that sport's teams; None -> all teams
+_catalog_version = 0  # the `catalog` data version `_catalogs` were built at
+_catalog_lock = threading.Lock()
+
+
+def _build_catalog(db: Session, sport: Optional[str] = None) -> TeamCatalog:
+    attributes = db.query(Attribute.id, Attribute.name).order_by(Attribute.id.asc()).all()
+    team_query = db.query(Team.id, Team.name).order_by(Team.id.asc())
+    ta_query = db.query(TeamAttribute.team_id, TeamAttribute.attribute_id, TeamAttribute.value)
+    if sport is not None:
+        team_query = team_query.filter(Team.sport == sport)
+        ta_query = ta_query.join(Team, Team.id == TeamAttribute.team_id).filter(Team.sport == sport)
+    teams = team_query.all()
+    attribute_ids = [a.id for a in attributes]
+    team_ids = [t.id for t in teams]
+    attr_index = {aid: i for i, aid in enumerate(attribute_ids)}
+    team_index = {tid: i for i, tid in enumerate(team_ids)}
+
+    matrix = np.zeros((len(team_ids), len(attribute_ids)), dtype=np.uint8)
+    for team_id, attribute_id, value in ta_query:
+        ti, ai = team_index.get(team_id), attr_index.get(attribute_id)
+        if ti is not None and ai is not None:
+            matrix[ti, ai] = 1 if value else 0
+
+    return TeamCatalog(team_ids, [t.name for t in teams], attribute_ids, [a.name for a in attributes], matrix)
+
+
+def _cached_catalog(key: Optional[str], version: int) -> Optional[TeamCatalog]:
+    """The cached catalog for `key` if the catalogs are at `version`; otherwise drop them all."""
+    global _catalog_version
+    with _catalog_lock:
+        if version != _catalog_version:
+            _catalogs.clear()
+            _catalog_version = version
+        return _catalogs.get(key)
+
+
+def load_catalog(db: Session, sport: Optional[str] = None, version: Optional[int] = None) -> TeamCatalog:
+    """Return the cached catalog for `sport` (all teams if None), rebuilding it if the `catalog`
+    data version moved, in any process. Pass `version` if it was already read."""
+    key = sport_key(sport)
+    if version is None:
+        version = data_version(db, "catalog")
+    catalog = _cached_catalog(key, version)
+    if catalog is not None:
+        return catalog
+    with metrics.timed("catalog", "build"):
+        catalog = _build_catalog(db, key)
+    with _catalog_lock:
+        # Only publish if no write landed while we were building
+        if version == _catalog_version:
+            _catalogs[key] = catalog
+    return catalog
+
+
+def update_catalog_team(team_id: int, team_name: str, sport: Optional[str], values: Dict[int, int], version: int) -> None:
+    """Apply one team's committed attribute values to the cached catalogs without a rebuild.
+
+    `version` is the `catalog` data version the write committed. Unless the catalogs are at the
+    one just before it, another write came in between, and they are dropped instead.
+    """
+    global _catalog_version
+    with _catalog_lock:
+        if _catalog_version == version:
+            return  # already rebuilt since the commit
+        if _catalog_version != version - 1:
+            _catalogs.clear()
+            _catalog_version = version
+            return
+        for key in {None, sport_key(sport)}:
+            catalog = _catalogs.get(key)
+            if catalog is None:
+                continue
+            updated = catalog.set_team(team_id, team_name, values)
+            if updated is None:
+                del _catalogs[key]
+            else:
+                _catalogs[key] = updated
+        _catalog_version += 1
+
+
+DEFAULT_WEIGHT_PROFILE = "sentiment_v1"
+# Not stored: derived from the loaded model of the sport being scored
+MODEL_WEIGHT_PROFILE = "model"
+# Compiled vectors kept per catalog before the cache is cleared (profile edits add new keys)
+WEIGHT_VECTORS_PER_CATALOG = 64
+
+
+def _model_weights(catalog: TeamCatalog, entry: Optional[LoadedModel]) -> np.ndarray:
+    """Per-attribute weights from a linear model's coefficients, clamped at 0 and scaled to max 1.
+
+    A feature is "user wants it and the team has it", so a positive coefficient says a match on
+    that attribute raises the odds of support. Attributes whose match lowers them, and attributes
+    the model does not know, weigh 0, so such a match never raises a team's score. Non-linear
+    models, a missing model and a model with no positive coefficient give uniform weights.
+    """
+    uniform = np.ones(len(catalog.attribute_ids), dtype=np.float64)
+    model = entry.model if entry is not None else None
+    coef = model.coef if isinstance(model, LinearModel) else getattr(model, "coef_", None)
+    if coef is None:
+        return uniform
+    weights = np.zeros(len(catalog.attribute_ids), dtype=np.float64)
+    pairs = [(catalog.attr_index[aid], j) for j, aid in enumerate(entry.attribute_ids) if aid in catalog.attr_index]
+    if pairs:
+        rows, cols = map(list, zip(*pairs))
+        weights[rows] = np.maximum(np.asarray(coef, dtype=np.float64)[0, cols], 0.0)
+    top = weights.max(initial=0.0)
+    return weights / top if top > 0 else uniform
+
+
+class WeightProfileStore:
+    """Heuristic weight profiles from the `weight_profiles` table, compiled per catalog.
+
+    Rows are read once and kept while the `weight_profiles` data version, which every profile
+    write bumps, stays at `version`; `refresh` compares the two. A compiled profile is a vector
+    aligned to a catalog's `attribute_ids`, cached in the catalog's `weight_vectors` under the
+    store version (for the `model` profile, the model's stamp). A catalog rebuilt after an
+    attribute write starts empty, so each profile is compiled once per attribute list, profile
+    version and model.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._profiles: Optional[Dict[str, Tuple[float, Dict[str, float]]]] = None
+        self.version = 0
+        self.compiles = 0
+
+    def current(self, version: int) -> bool:
+        """Whether the loaded rows are those of `weight_profiles` data version `version`."""
+        return self._profiles is not None and self.version == version
+
+    def refresh(self, db: Optional[Session] = None, version: Optional[int] = None) -> None:
+        """Re-read the rows unless they are current; `version` saves the query if the caller has it."""
+        session = db or SessionLocal()
+        try:
+            if version is None:
+                version = data_version(session, "weight_profiles")
+            if self.current(version):
+                return
+            rows = session.query(WeightProfile.name, WeightProfile.default_weight, WeightProfile.weights).all()
+        finally:
+            if db is None:
+                session.close()
+        # Attribute names are unique regardless of case, so profiles match them that way too
+        profiles = {
+            name: (default, {attr.lower(): w for attr, w in json.loads(weights).items()})
+            for name, default, weights in rows
+        }
+        with self._lock:
+            self._profiles, self.version = profiles, version
+
+    def vector(self, catalog: TeamCatalog, name: Optional[str], entry: Optional[LoadedModel] = None) -> np.ndarray:
+        """Weights for profile `name` aligned to `catalog.attribute_ids`; unknown names are uniform.
+
+        `entry` is the model being served, used by the `model` profile. Stored profiles come from
+        the rows as of the last `refresh`. The result is shared between requests and read-only.
+        """
+        name = (name or DEFAULT_WEIGHT_PROFILE).lower()
+        if name != MODEL_WEIGHT_PROFILE and self._profiles is None:
+            self.refresh()
+        with self._lock:
+            profiles, version = self._profiles, self.version
+        if name == MODEL_WEIGHT_PROFILE:
+            key = (name, entry.stamp if entry is not None else None)
+        else:
+            key = (name, version)
+        weights = catalog.weight_vectors.get(key)
+        if weights is not None:
+            return weights
+        if name == MODEL_WEIGHT_PROFILE:
+            weights = _model_weights(catalog, entry)
+        else:
+            default, by_name = profiles.get(name, (1.0, {}))
+            weights = np.array([by_name.get(n.lower(), default) for n in catalog.attribute_names], dtype=np.float64)
+        weights.setflags(write=False)
+        if len(catalog.weight_vectors) >= WEIGHT_VECTORS_PER_CATALOG:
+            catalog.weight_vectors.clear()
+        catalog.weight_vectors[key] = weights
+        self.compiles += 1
+        return weights
+
+
+weight_profiles = WeightProfileStore()
+
+
+def score_users(
+    catalog: TeamCatalog,
+    U: np.ndarray,
+    weights: np.ndarray,
+    model: Optional[Any] = None,
+    model_attr_ids: Optional[List[int]] = None,
+    blend: Optional[float] = None,
+    op: str = "predict",
+) -> np.ndarray:
+    """Score every team for a block of users; returns a (users, teams) array.
+
+    `U` is a 0/1 matrix of the users' answers aligned to `catalog.attribute_ids` and `weights` is
+    aligned the same way. The heuristic is the weighted share of each user's desired attributes
+    that a team has. When a model is given, its probabilities for every (user, team) pair come from
+    `predict_proba` over the stacked feature rows and are optionally blended with the heuristic.
+    Feature building and inference time are recorded as stages of `op`.
+    """
+    n_users, n_teams = U.shape[0], len(catalog.team_ids)
+    if n_users == 0 or n_teams == 0:
+        return np.zeros((n_users, n_teams), dtype=np.float64)
+
+    started = time.perf_counter()
+    match_w, desired_w = catalog.weighted_overlap(U, weights)
+    # A user with no weighted answers has no matches either, and 0 / inf gives their 0.0 scores
+    heur = match_w / np.where(desired_w == 0, np.inf, desired_w)[:, None]
+
+    if model is None:
+        metrics.stage(op, "inference", time.perf_counter() - started)
+        return heur
+
+    mark = time.perf_counter()
+    build, infer = 0.0, mark - started
+    feat_ids = model_attr_ids or catalog.attribute_ids
+    T = catalog.columns(feat_ids)
+    Um = U if feat_ids == catalog.attribute_ids else _align_columns(U, catalog.attr_index, feat_ids)
+    model_prob = np.empty((n_users, n_teams), dtype=np.float64)
+    step = max(1, SCORE_BLOCK_CELLS // max(1, n_teams * len(feat_ids)))
+    for start in range(0, n_users, step):
+        block = Um[start:start + step]
+        X = (block[:, None, :] & T[None, :, :]).reshape(-1, len(feat_ids))
+        built = time.perf_counter()
+        build += built - mark
+        model_prob[start:start + step] = model.predict_proba(X)[:, 1].reshape(block.shape[0], n_teams)
+        mark = time.perf_counter()
+        infer += mark - built
+    metrics.stage(op, "feature_build", build)
+    metrics.stage(op, "inference", infer)
+    if blend is not None and 0.0 <= blend <= 1.0:
+        return float(blend) * model_prob + (1.0 - float(blend)) * heur
+    return model_prob  # default: keep previous behavior unless blend provided
+
+
+def _align_columns(U: np.ndarray, attr_index: Dict[int, int], attribute_ids: List[int]) -> np.ndarray:
+    out = np.zeros((U.shape[0], len(attribute_ids)), dtype=U.dtype)
+    for j, aid in enumerate(attribute_ids):
+        i = attr_index.get(aid)
+        if i is not None:
+            out[:, j] = U[:, i]
+    return out
+
+
+def score_teams(
+    catalog: TeamCatalog,
+    user_prefs: Dict[int, int],
+    weights: np.ndarray,
+    model: Optional[Any] = None,
+    model_attr_ids: Optional[List[int]] = None,
+    blend: Optional[float] = None,
+) -> np.ndarray:
+    """Score every team in the catalog for one user (see `score_users`)."""
+    U = catalog.user_vector(user_prefs)[None, :]
+    return score_users(catalog, U, weights, model, model_attr_ids, blend)[0]
+
+
+def rank(scores: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """Indices of `scores` best-first; ties keep catalog order. With `top_k`, only the best k."""
+    if top_k is None or top_k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    kth = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+    # argpartition picks arbitrary members of a tie at the cut; take the earliest so top_k is a prefix of the full ranking
+    above = np.flatnonzero(scores > kth)
+    idx = np.concatenate([above, np.flatnonzero(scores == kth)[: top_k - len(above)]])
+    return idx[np.lexsort((idx, -scores[idx]))]
 
 
 # -----------------------------------------------------------------------------
@@ -219,17 +1652,101 @@ class FeedbackIn(BaseModel):
     supported: int  # 0/1
 
 
+class BulkOut(BaseModel):
+    accepted: int
+    rejected: int
+    errors: List[Dict[str, Any]] = Field(default_factory=list, description="Per-row errors (line number and reason), capped")
+
+
 class TrainOut(BaseModel):
     trained_on_rows: int
     attributes: List[int]
     teams: List[int]
     saved: bool
+    mode: str = "full"
+    feedback_watermark: Optional[int] = None
+
+
+class TrainJobOut(BaseModel):
+    job_id: str
+    sport: Optional[str]
+    mode: str
+    status: str  # queued | running | succeeded | failed
+    progress: Dict[str, Any]
+    submitted_at: dt.datetime
+    finished_at: Optional[dt.datetime] = None
+    result: Optional[TrainOut] = None
+    error: Optional[str] = None
+
+
+class EvalCandidate(BaseModel):
+    family: str = Field(pattern="^(logistic|sgd|hist_gb)$", description="LogisticRegression, SGDClassifier (log loss) or HistGradientBoostingClassifier")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Estimator keyword arguments, e.g. {\"C\": 0.1}")
+
+
+class EvaluationIn(BaseModel):
+    sports: Optional[List[Optional[str]]] = Field(default=None, description="null entries mean all teams; default: all teams and every sport")
+    candidates: List[EvalCandidate] = Field(default_factory=lambda: [EvalCandidate(**c) for c in EVAL_GRID], min_length=1)
+    folds: int = Field(default=5, ge=2, le=20)
+    n_jobs: int = Field(default=-1, description="Worker processes; -1 uses every core")
+    promote: bool = Field(default=False, description="Refit each sport's best candidate on all rows and save it as the served model")
+
+
+class CandidateResult(BaseModel):
+    family: str
+    params: Dict[str, Any]
+    auc: float
+    auc_std: float
+    log_loss: float
+    log_loss_std: float
+    fit_seconds: float
+    predict_ms: float  # one user against every team, as /predict scores it
+
+
+class SportEvaluation(BaseModel):
+    sport: Optional[str]  # None: all teams
+    rows: int
+    positives: int
+    teams: int
+    results: List[CandidateResult] = Field(default_factory=list)  # best first
+    promoted: bool = False
+    error: Optional[str] = None
+
+
+class EvaluationOut(BaseModel):
+    folds: int
+    n_jobs: int
+    seconds: float
+    sports: List[SportEvaluation]
 
 
 class PredictionIn(BaseModel):
     questionnaire_id: int
     blend: Optional[float] = Field(default=None, description="If provided and model exists, final_score = blend*model + (1-blend)*heuristic")
-    weights_profile: Optional[str] = Field(default="sentiment_v1", description="Weight profile for heuristic: 'sentiment_v1' or 'uniform'")
+    weights_profile: Optional[str] = Field(default="sentiment_v1", description="Heuristic weight profile: a name from /weight-profiles, or 'model' for the trained model's positive coefficients")
+    top_k: Optional[int] = Field(default=None, ge=1, description="Only return the best k teams")
+
+
+class PredictionBatchIn(BaseModel):
+    questionnaire_ids: List[int] = Field(default_factory=list)
+    answers: List[Dict[int, int]] = Field(default_factory=list, description="Raw answer vectors (attribute_id -> 0/1) scored without a stored questionnaire")
+    blend: Optional[float] = Field(default=None, description="Same as /predict")
+    weights_profile: Optional[str] = Field(default="sentiment_v1", description="Same as /predict")
+    top_k: Optional[int] = Field(default=None, ge=1, description="Only return the best k teams per questionnaire")
+
+
+Weight = Annotated[float, Field(ge=0, allow_inf_nan=False)]
+
+
+class WeightProfileIn(BaseModel):
+    description: Optional[str] = Field(default=None, max_length=255)
+    default_weight: Weight = Field(default=1.0, description="Weight of attributes not listed in `weights`")
+    weights: Dict[str, Weight] = Field(default_factory=dict, description="Attribute name -> weight")
+
+
+class WeightProfileOut(WeightProfileIn):
+    name: str
+    derived: bool = False
 
 
 class TeamScore(BaseModel):
@@ -253,10 +1770,60 @@ class AnalyticsOut(BaseModel):
     team_support_rate: List[Dict[str, Any]]
 
 
+class SeedSport(BaseModel):
+    sport: Optional[str] = Field(default=None, description="None seeds the default football dataset with named attributes and teams")
+    attributes: int = Field(default=62, ge=1, le=100_000)
+    teams: int = Field(default=15, ge=1, le=1_000_000)
+    questionnaires: int = Field(default=20, ge=0, le=100_000_000)
+    answers: Optional[int] = Field(default=None, ge=1, description="Attributes answered per questionnaire; default all of them")
+    feedback: Optional[int] = Field(default=None, ge=1, description="Teams rated per questionnaire; default every team")
+    density: float = Field(default=0.5, ge=0.0, le=1.0, description="Chance a team has an attribute outside its style")
+
+    @model_validator(mode="after")
+    def _bounded_team_matrix(self) -> "SeedSport":
+        if self.teams * self.attributes > SEED_MAX_TEAM_CELLS:
+            raise ValueError(f"teams x attributes must be at most {SEED_MAX_TEAM_CELLS:,}")
+        return self
+
+
+class SeedRequest(BaseModel):
+    seed: int = 42
+    sports: List[SeedSport] = Field(default_factory=lambda: [SeedSport()], min_length=1)
+
+
 # -----------------------------------------------------------------------------
 # FastAPI app
 # -----------------------------------------------------------------------------
-app = FastAPI(title="Smart Feedback & Analytics API", version="0.1.0")
+UI_DIR = os.path.join(BASE_DIR, "ui")
+# Set WARMUP=0 to skip loading catalogs and models before the first request (e.g. for quick --reload cycles)
+WARMUP = os.getenv("WARMUP", "1") != "0"
+
+
+def warmup() -> None:
+    """Build the team catalogs, default weights and saved models for every sport, plus the analytics counters."""
+    db = SessionLocal()
+    try:
+        sports = [None] + [sport for (sport,) in db.query(Team.sport).filter(Team.sport.isnot(None)).distinct()]
+        weight_profiles.refresh(db)
+        for sport in sports:
+            catalog = load_catalog(db, sport)
+            weight_profiles.vector(catalog, DEFAULT_WEIGHT_PROFILE, model_registry.get(sport))
+        ensure_analytics(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    os.makedirs(UI_DIR, exist_ok=True)
+    await run_in_threadpool(init_db)
+    if WARMUP:
+        await run_in_threadpool(warmup)
+    yield
+    shutdown_train_pool()
+
+
+app = FastAPI(title="Smart Feedback & Analytics API", version="0.1.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -264,60 +1831,132 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
-# Mount static UI
-UI_DIR = os.path.join(BASE_DIR, "ui")
-os.makedirs(UI_DIR, exist_ok=True)
-app.mount("/ui", StaticFiles(directory=UI_DIR, html=True), name="ui")
+# Mount static UI (the directory is created at startup)
+app.mount("/ui", StaticFiles(directory=UI_DIR, html=True, check_dir=False), name="ui")
 
 
 # ----------------------- Attribute Endpoints ---------------------------------
 @app.post("/attributes", response_model=AttributeOut)
+@query_budget(4)
 def create_attribute(payload: AttributeCreate, db: Session = Depends(get_db)):
     exists = db.query(Attribute).filter(func.lower(Attribute.name) == payload.name.lower()).first()
     if exists:
         raise HTTPException(status_code=400, detail="Attribute name already exists")
     attr = Attribute(name=payload.name, description=payload.description, active=payload.active)
     db.add(attr)
+    bump_version(db, "catalog", "attributes", "analytics")
     db.commit()
     db.refresh(attr)
     return attr
 
 
+_attribute_list = TypeAdapter(List[AttributeOut])
+
+
 @app.get("/attributes", response_model=List[AttributeOut])
-def list_attributes(db: Session = Depends(get_db)):
-    return db.query(Attribute).order_by(Attribute.id.asc()).all()
+@query_budget(2)
+async def list_attributes(request: Request, db: AsyncSession = Depends(get_async_db)):
+    version = await db.run_sync(data_version, "attributes")
+    cached = response_cache.lookup(request, "attributes", version)
+    if cached is not None:
+        return cached
+    attributes = (await db.scalars(select(Attribute).order_by(Attribute.id.asc()))).all()
+    return response_cache.respond(request, "attributes", version, _attribute_list.dump_json(attributes))
 
 
 # -------------------------- Team Endpoints -----------------------------------
+TEAM_PAGE_ROWS = 1000  # teams serialized per attribute query when listing
+TEAM_FIELDS = ("id", "name", "meta", "attributes")
+
+
 @app.post("/teams", response_model=TeamOut)
+@query_budget(3)
 def create_team(payload: TeamCreate, db: Session = Depends(get_db)):
     exists = db.query(Team).filter(func.lower(Team.name) == payload.name.lower()).first()
     if exists:
         raise HTTPException(status_code=400, detail="Team name already exists")
     meta = json.dumps(payload.meta) if payload.meta is not None else None
-    team = Team(name=payload.name, meta=meta)
+    sport = (payload.meta or {}).get("sport")
+    team = Team(name=payload.name, meta=meta, sport=sport_key(sport) if isinstance(sport, str) else None)
     db.add(team)
+    db.flush()
+    team_id, team_sport = team.id, team.sport
+    version = bump_version(db, "catalog", "teams", "analytics")["catalog"]
     db.commit()
-    db.refresh(team)
-    return _team_to_out(team, db)
+    update_catalog_team(team_id, payload.name, team_sport, {}, version)
+    return TeamOut(id=team_id, name=payload.name, meta=payload.meta, attributes={})
 
 
 @app.get("/teams", response_model=List[TeamOut])
-def list_teams(db: Session = Depends(get_db), sport: Optional[str] = Query(default=None)):
-    teams = db.query(Team).order_by(Team.id.asc()).all()
-    if sport:
-        def _sport_of(t: Team) -> Optional[str]:
-            try:
-                m = json.loads(t.meta) if t.meta else {}
-                return (m or {}).get("sport")
-            except Exception:
-                return None
-        teams = [t for t in teams if (_sport_of(t) or "").lower() == sport.lower()]
-    return [_team_to_out(t, db) for t in teams]
+def list_teams(
+    request: Request,
+    db: Session = Depends(get_db),
+    sport: Optional[str] = Query(default=None),
+    limit: Optional[int] = Query(default=None, ge=1, le=10_000, description="Page size; the next page starts after the X-Next-Cursor header"),
+    after: Optional[int] = Query(default=None, description="Cursor: return teams with id greater than this"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated subset of id,name,meta,attributes"),
+):
+    """Stream teams as a JSON array, ordered by id.
+
+    Teams are read in keyset pages of `TEAM_PAGE_ROWS` with one attribute query per page, so the
+    query count grows with pages rather than teams and the body is never held in memory at once.
+    """
+    selected = _team_fields(fields)
+    sport = sport_key(sport)
+    version = data_version(db, "teams")
+    cached = response_cache.lookup(request, "teams", version)
+    if cached is not None:
+        return cached
+
+    next_cursor = None
+    if limit is not None:
+        # Only the ids are read up front, to know whether there is a next page before headers go out
+        id_query = db.query(Team.id).order_by(Team.id.asc())
+        if sport:
+            id_query = id_query.filter(Team.sport == sport)
+        if after is not None:
+            id_query = id_query.filter(Team.id > after)
+        page_ids = [tid for (tid,) in id_query.limit(limit + 1)]
+        if len(page_ids) > limit:
+            next_cursor = page_ids[limit - 1]
+
+    def _stream():
+        # The request session is closed once the handler returns, so streaming uses its own
+        session = SessionLocal()
+        try:
+            cursor, remaining, first = after, limit, True
+            yield "["
+            while remaining is None or remaining > 0:
+                page_size = TEAM_PAGE_ROWS if remaining is None else min(TEAM_PAGE_ROWS, remaining)
+                query = session.query(Team.id, Team.name, Team.meta).order_by(Team.id.asc())
+                if sport:
+                    query = query.filter(Team.sport == sport)
+                if cursor is not None:
+                    query = query.filter(Team.id > cursor)
+                rows = query.limit(page_size).all()
+                if not rows:
+                    break
+                chunk = ",".join(_team_json(session, rows, selected))
+                yield chunk if first else "," + chunk
+                first = False
+                cursor = rows[-1].id
+                if remaining is not None:
+                    remaining -= len(rows)
+                if len(rows) < page_size:
+                    break
+            yield "]"
+        finally:
+            session.close()
+
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else None
+    return response_cache.stream(request, "teams", version, _stream(), headers)
 
 
 @app.get("/teams/{team_id}", response_model=TeamOut)
+@query_budget(2)
 def get_team(team_id: int, db: Session = Depends(get_db)):
     team = db.get(Team, team_id)
     if not team:
@@ -326,10 +1965,12 @@ def get_team(team_id: int, db: Session = Depends(get_db)):
 
 
 @app.post("/teams/{team_id}/attributes", response_model=TeamOut)
+@query_budget(5)
 def set_team_attributes(team_id: int, payload: TeamAttributeSet, db: Session = Depends(get_db)):
     team = db.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
+    team_name, team_meta, team_sport = team.name, team.meta, team.sport
 
     # Validate attributes
     valid_attr_ids = {a.id for a in db.query(Attribute.id).all()}
@@ -337,32 +1978,143 @@ def set_team_attributes(team_id: int, payload: TeamAttributeSet, db: Session = D
         if aid not in valid_attr_ids:
             raise HTTPException(status_code=400, detail=f"Attribute {aid} does not exist")
 
-    # Upsert team attributes
-    existing = {ta.attribute_id: ta for ta in db.query(TeamAttribute).filter(TeamAttribute.team_id == team_id).all()}
-    for aid, val in payload.attributes.items():
-        v = 1 if val else 0
-        if aid in existing:
-            existing[aid].value = v
-        else:
-            db.add(TeamAttribute(team_id=team_id, attribute_id=aid, value=v))
+    # Upsert team attributes in one statement; per-row ORM updates would cost a query per attribute
+    attr_map = dict(db.query(TeamAttribute.attribute_id, TeamAttribute.value).filter(TeamAttribute.team_id == team_id).all())
+    values = {aid: 1 if val else 0 for aid, val in payload.attributes.items()}
+    if values:
+        stmt = sqlite_insert(TeamAttribute)
+        db.execute(
+            stmt.on_conflict_do_update(index_elements=["team_id", "attribute_id"], set_={"value": stmt.excluded.value}),
+            [{"team_id": team_id, "attribute_id": aid, "value": v} for aid, v in values.items()],
+        )
+    attr_map.update(values)
+    version = bump_version(db, "catalog", "teams", "analytics")["catalog"]
 
     db.commit()
-    db.refresh(team)
-    return _team_to_out(team, db)
+    update_catalog_team(team_id, team_name, team_sport, values, version)
+    # The response is built from what was just written rather than re-read
+    return TeamOut(id=team_id, name=team_name, meta=json.loads(team_meta) if team_meta else None, attributes=attr_map)
+
+
+def _team_fields(fields: Optional[str]) -> tuple:
+    if not fields:
+        return TEAM_FIELDS
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(requested.difference(TEAM_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown team fields: {', '.join(unknown)}")
+    return tuple(f for f in TEAM_FIELDS if f in requested)
+
+
+def _team_attribute_json(db: Session, team_ids: List[int]) -> Dict[int, str]:
+    """team_id -> attributes as a JSON object string, aggregated by SQLite in one query."""
+    rows = (
+        db.query(TeamAttribute.team_id, func.json_group_object(TeamAttribute.attribute_id, TeamAttribute.value))
+        .filter(TeamAttribute.team_id.in_(team_ids))
+        .group_by(TeamAttribute.team_id)
+    )
+    return {team_id: attrs for team_id, attrs in rows}
+
+
+def _team_json(db: Session, rows: List[Any], fields: tuple = TEAM_FIELDS) -> List[str]:
+    """Serialize (id, name, meta) rows to JSON objects with a single attribute query for all of them.
+
+    The attribute objects come pre-built from SQLite and are spliced in as-is, so a team's
+    attributes never pass through Python one by one.
+    """
+    attr_json = _team_attribute_json(db, [row.id for row in rows]) if "attributes" in fields and rows else {}
+    out = []
+    for row in rows:
+        item: Dict[str, Any] = {}
+        if "id" in fields:
+            item["id"] = row.id
+        if "name" in fields:
+            item["name"] = row.name
+        if "meta" in fields:
+            item["meta"] = json.loads(row.meta) if row.meta else None
+        text = json.dumps(item)
+        if "attributes" in fields:
+            attrs = attr_json.get(row.id, "{}")
+            text = f'{{"attributes": {attrs}}}' if not item else f'{text[:-1]}, "attributes": {attrs}}}'
+        out.append(text)
+    return out
 
 
 def _team_to_out(team: Team, db: Session) -> TeamOut:
-    attrs = db.query(TeamAttribute).filter(TeamAttribute.team_id == team.id).all()
-    attr_map = {a.attribute_id: a.value for a in attrs}
-    meta = json.loads(team.meta) if team.meta else None
-    return TeamOut(id=team.id, name=team.name, meta=meta, attributes=attr_map)
+    return TeamOut.model_validate_json(_team_json(db, [team])[0])
+
+
+# ---------------------- Weight Profile Endpoints -----------------------------
+WeightProfileName = Annotated[str, Path(min_length=1, max_length=50)]
+
+
+def _weight_profile_out(name: str, description: Optional[str], default_weight: float, weights: str) -> WeightProfileOut:
+    return WeightProfileOut(name=name, description=description, default_weight=default_weight, weights=json.loads(weights))
+
+
+@app.get("/weight-profiles", response_model=List[WeightProfileOut])
+@query_budget(1)
+def list_weight_profiles(db: Session = Depends(get_db)):
+    rows = db.query(WeightProfile.name, WeightProfile.description, WeightProfile.default_weight, WeightProfile.weights)
+    return [_weight_profile_out(*row) for row in rows.order_by(WeightProfile.name.asc())]
+
+
+@app.get("/weight-profiles/{name}", response_model=WeightProfileOut)
+@query_budget(4)
+def get_weight_profile(name: WeightProfileName, db: Session = Depends(get_db),
+                       sport: Optional[str] = Query(default=None, description="Sport whose model the 'model' profile is derived from")):
+    """A stored profile, or the `model` profile's weights as currently derived for `sport`."""
+    name = name.lower()
+    if name == MODEL_WEIGHT_PROFILE:
+        catalog = load_catalog(db, sport)
+        weights = weight_profiles.vector(catalog, name, model_registry.get(sport))
+        return WeightProfileOut(
+            name=name, description="Odds ratio of each attribute in the trained model", derived=True,
+            weights=dict(zip(catalog.attribute_names, weights.tolist())),
+        )
+    row = db.query(WeightProfile.name, WeightProfile.description, WeightProfile.default_weight, WeightProfile.weights).filter(WeightProfile.name == name).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Weight profile not found")
+    return _weight_profile_out(*row)
+
+
+@app.put("/weight-profiles/{name}", response_model=WeightProfileOut)
+@query_budget(2)
+def put_weight_profile(name: WeightProfileName, payload: WeightProfileIn, db: Session = Depends(get_db)):
+    """Create or replace a profile; predictions use it from the next request."""
+    name = name.lower()
+    if name == MODEL_WEIGHT_PROFILE:
+        raise HTTPException(status_code=400, detail="The 'model' profile is derived from the trained model and cannot be stored")
+    values = {"name": name, "description": payload.description, "default_weight": payload.default_weight,
+              "weights": json.dumps(payload.weights)}
+    stmt = sqlite_insert(WeightProfile).values(values)
+    db.execute(stmt.on_conflict_do_update(index_elements=[WeightProfile.name], set_={
+        key: getattr(stmt.excluded, key) for key in ("description", "default_weight", "weights")
+    }))
+    bump_version(db, "weight_profiles")
+    db.commit()
+    return _weight_profile_out(**values)
+
+
+@app.delete("/weight-profiles/{name}")
+@query_budget(2)
+def delete_weight_profile(name: WeightProfileName, db: Session = Depends(get_db)):
+    deleted = db.query(WeightProfile).filter(WeightProfile.name == name.lower()).delete()
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Weight profile not found")
+    bump_version(db, "weight_profiles")
+    db.commit()
+    return {"status": "ok", "deleted": name.lower()}
 
 
 # ----------------------- Questionnaire Endpoints ------------------------------
 @app.post("/questionnaires", response_model=QuestionnaireOut)
+@query_budget(5)
 def create_questionnaire(payload: QuestionnaireCreate, db: Session = Depends(get_db)):
     q = Questionnaire(user_id=payload.user_id)
     db.add(q)
+    bump_counter(db, "questionnaires")
+    bump_version(db, "analytics")
     db.commit()
     db.refresh(q)
 
@@ -375,37 +2127,65 @@ def create_questionnaire(payload: QuestionnaireCreate, db: Session = Depends(get
     )
 
 
-@app.post("/questionnaires/{questionnaire_id}/responses")
-def submit_responses(questionnaire_id: int, payload: ResponsesIn, db: Session = Depends(get_db)):
+def _note_answer_changes(db: Session, questionnaire_ids: set) -> None:
+    """Move the `answers` version if any of these questionnaires already has feedback.
+
+    Training rows for that feedback were built from the old answers, so training snapshots
+    check this version. Answers given before any feedback need no bump.
+    """
+    if questionnaire_ids and db.query(Feedback.id).filter(Feedback.questionnaire_id.in_(questionnaire_ids)).first() is not None:
+        bump_version(db, "answers")
+
+
+def _upsert_responses(db: Session, questionnaire_id: int, payload: ResponsesIn) -> None:
     questionnaire = db.get(Questionnaire, questionnaire_id)
     if not questionnaire:
         raise HTTPException(status_code=404, detail="Questionnaire not found")
 
     valid_attr_ids = {a.id for a in db.query(Attribute.id).all()}
+    existing = dict(
+        db.query(QuestionnaireResponse.attribute_id, QuestionnaireResponse.value)
+        .filter(QuestionnaireResponse.questionnaire_id == questionnaire_id)
+    )
+    stats: Dict[int, Dict[str, int]] = {}  # attribute_id -> analytics deltas
+    values: Dict[int, int] = {}  # attribute_id -> value to store; the last answer wins
+    changed = False
     for item in payload.responses:
         if item.attribute_id not in valid_attr_ids:
             raise HTTPException(status_code=400, detail=f"Attribute {item.attribute_id} does not exist")
         val = 1 if item.value else 0
-        existing = db.query(QuestionnaireResponse).filter(
-            QuestionnaireResponse.questionnaire_id == questionnaire_id,
-            QuestionnaireResponse.attribute_id == item.attribute_id,
-        ).first()
-        if existing:
-            existing.value = val
+        delta = stats.setdefault(item.attribute_id, {"attribute_id": item.attribute_id, "yes_count": 0, "total_answers": 0})
+        if item.attribute_id in existing:
+            # Overwritten answer: only the yes count can move
+            delta["yes_count"] += val - existing[item.attribute_id]
         else:
-            db.add(QuestionnaireResponse(
-                questionnaire_id=questionnaire_id,
-                attribute_id=item.attribute_id,
-                value=val,
-            ))
+            delta["yes_count"] += val
+            delta["total_answers"] += 1
+        changed |= existing.get(item.attribute_id) != val
+        existing[item.attribute_id] = values[item.attribute_id] = val
+
+    # One upsert for every answer; per-row ORM updates would cost a query per answer
+    if values:
+        stmt = sqlite_insert(QuestionnaireResponse)
+        db.execute(
+            stmt.on_conflict_do_update(index_elements=["questionnaire_id", "attribute_id"], set_={"value": stmt.excluded.value}),
+            [{"questionnaire_id": questionnaire_id, "attribute_id": aid, "value": v} for aid, v in values.items()],
+        )
+    _increment(db, AttributeStat, "attribute_id", list(stats.values()))
+    bump_version(db, "analytics")
+    if changed:
+        _note_answer_changes(db, {questionnaire_id})
 
-    db.commit()
+
+@app.post("/questionnaires/{questionnaire_id}/responses")
+@query_budget(11)
+async def submit_responses(questionnaire_id: int, payload: ResponsesIn):
+    await writer.asubmit(lambda db: _upsert_responses(db, questionnaire_id, payload))
     return {"status": "ok"}
 
 
 # ----------------------------- Feedback --------------------------------------
-@app.post("/feedback")
-def submit_feedback(payload: FeedbackIn, db: Session = Depends(get_db)):
+def _insert_feedback(db: Session, payload: FeedbackIn) -> int:
     q = db.get(Questionnaire, payload.questionnaire_id)
     t = db.get(Team, payload.team_id)
     if not q or not t:
@@ -417,183 +2197,1139 @@ def submit_feedback(payload: FeedbackIn, db: Session = Depends(get_db)):
         supported=1 if payload.supported else 0,
     )
     db.add(fb)
-    db.commit()
-    return {"status": "ok", "feedback_id": fb.id}
+    db.flush()
+    _increment(db, TeamStat, "team_id", [{"team_id": payload.team_id, "support_yes": fb.supported, "total": 1}])
+    bump_counter(db, "feedback")
+    bump_version(db, "analytics")
+    return fb.id
+
+
+@app.post("/feedback")
+@query_budget(8)
+async def submit_feedback(payload: FeedbackIn):
+    feedback_id = await writer.asubmit(lambda db: _insert_feedback(db, payload))
+    return {"status": "ok", "feedback_id": feedback_id}
+
+
+# --------------------------- Bulk ingestion ----------------------------------
+# Rows written and committed per transaction by the bulk endpoints
+BULK_CHUNK_ROWS = 5_000
+# Per-row errors echoed back (lowest line numbers first); the rest are only counted
+BULK_MAX_ERRORS = 100
+
+
+class BulkErrors:
+    """Rejected rows of one upload: all are counted, only the `keep` with the lowest line numbers are held."""
+
+    def __init__(self, keep: int = BULK_MAX_ERRORS):
+        self.count = 0
+        self._keep = keep
+        self._heap: List[tuple] = []  # (-line, message): the highest kept line is popped first
+
+    def append(self, error: tuple) -> None:
+        line, message = error
+        self.count += 1
+        heapq.heappush(self._heap, (-line, message))
+        if len(self._heap) > self._keep:
+            heapq.heappop(self._heap)
+
+    def first(self) -> List[Dict[str, Any]]:
+        return [{"line": -line, "error": message} for line, message in sorted(self._heap, reverse=True)]
+
+
+async def _bulk_rows(request: Request, fmt: Optional[str], fields: tuple[str, ...]) -> AsyncIterator[tuple[int, Any]]:
+    """Parse an NDJSON or CSV (with header) body as it arrives.
+
+    Yields `(line_no, values)` with one int per name in `fields`, or `(line_no, error message)`.
+    """
+    if fmt is None:
+        fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    header: Optional[List[str]] = None
+    line_no = 0
+    buf = b""
+
+    def _parse(raw: bytes) -> Any:
+        nonlocal header
+        try:
+            line = raw.decode("utf-8").strip()
+        except UnicodeDecodeError as exc:
+            raise ValueError(f"invalid UTF-8: {exc.reason} at byte {exc.start}") from None
+        if not line:
+            return None
+        if fmt == "csv":
+            cells = next(csv.reader([line]))
+            if header is None:
+                header = [c.strip() for c in cells]
+                return None
+            row = dict(zip(header, cells))
+        else:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+        missing = [f for f in fields if row.get(f) in (None, "")]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        return tuple(int(row[f]) for f in fields)
+
+    async for chunk in request.stream():
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            try:
+                values = _parse(raw)
+            except (ValueError, TypeError) as exc:
+                yield line_no, str(exc)
+                continue
+            if values is not None:
+                yield line_no, values
+    if buf.strip():
+        line_no += 1
+        try:
+            values = _parse(buf)
+        except (ValueError, TypeError) as exc:
+            yield line_no, str(exc)
+        else:
+            if values is not None:
+                yield line_no, values
+
+
+def _known_ids(db: Session, column: Any, ids: set) -> set:
+    """The subset of `ids` present in `column`, with one `IN (...)` query."""
+    return {i for (i,) in db.query(column).filter(column.in_(ids))}
+
+
+def _write_responses_chunk(db: Session, rows: List[tuple], errors: BulkErrors) -> int:
+    """Upsert `(line, questionnaire_id, attribute_id, value)` rows; runs on the writer, in one transaction
+    with the read of the answers it overwrites, so the analytics deltas cannot race `/responses`."""
+    known = _known_ids(db, Questionnaire.id, {r[1] for r in rows})
+    attributes = _known_ids(db, Attribute.id, {r[2] for r in rows})
+    latest: Dict[tuple, tuple] = {}  # (questionnaire_id, attribute_id) -> (line, value); last row wins
+    for line, qid, aid, value in rows:
+        if qid not in known:
+            errors.append((line, f"Questionnaire {qid} not found"))
+        elif aid not in attributes:
+            errors.append((line, f"Attribute {aid} does not exist"))
+        else:
+            latest[(qid, aid)] = (line, 1 if value else 0)
+    if not latest:
+        return 0
+
+    # Previous answers, so overwritten ones only move the analytics yes count
+    previous = {
+        (qid, aid): v
+        for qid, aid, v in db.query(QuestionnaireResponse.questionnaire_id, QuestionnaireResponse.attribute_id, QuestionnaireResponse.value)
+        .filter(QuestionnaireResponse.questionnaire_id.in_({qid for qid, _ in latest}))
+    }
+    stats: Dict[int, Dict[str, int]] = {}
+    for (qid, aid), (_, value) in latest.items():
+        delta = stats.setdefault(aid, {"attribute_id": aid, "yes_count": 0, "total_answers": 0})
+        old = previous.get((qid, aid))
+        delta["yes_count"] += value - (old or 0)
+        delta["total_answers"] += 0 if old is not None else 1
+
+    stmt = sqlite_insert(QuestionnaireResponse)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["questionnaire_id", "attribute_id"],  # uq_response_once
+        set_={"value": stmt.excluded.value},
+    )
+    db.execute(stmt, [{"questionnaire_id": qid, "attribute_id": aid, "value": v} for (qid, aid), (_, v) in latest.items()])
+    _increment(db, AttributeStat, "attribute_id", list(stats.values()))
+    bump_version(db, "analytics")
+    _note_answer_changes(db, {qid for (qid, aid), (_, v) in latest.items() if previous.get((qid, aid)) != v})
+    return len(latest)
+
+
+def _write_feedback_chunk(db: Session, rows: List[tuple], errors: BulkErrors) -> int:
+    """Insert `(line, questionnaire_id, team_id, supported)` rows; runs on the writer, in one transaction."""
+    known = _known_ids(db, Questionnaire.id, {r[1] for r in rows})
+    teams = _known_ids(db, Team.id, {r[2] for r in rows})
+    values: List[Dict[str, int]] = []
+    stats: Dict[int, Dict[str, int]] = {}
+    for line, qid, tid, supported in rows:
+        if qid not in known or tid not in teams:
+            errors.append((line, "Questionnaire or Team not found"))
+            continue
+        supported = 1 if supported else 0
+        values.append({"questionnaire_id": qid, "team_id": tid, "supported": supported})
+        delta = stats.setdefault(tid, {"team_id": tid, "support_yes": 0, "total": 0})
+        delta["support_yes"] += supported
+        delta["total"] += 1
+    if not values:
+        return 0
+
+    db.execute(insert(Feedback), values)
+    _increment(db, TeamStat, "team_id", list(stats.values()))
+    bump_counter(db, "feedback", len(values))
+    bump_version(db, "analytics")
+    return len(values)
+
+
+async def _bulk_ingest(request: Request, fmt: Optional[str], fields: tuple[str, ...], write_chunk: Any) -> BulkOut:
+    accepted = 0
+    errors = BulkErrors()
+    chunk: List[tuple] = []
+
+    async def _flush(rows: List[tuple]) -> int:
+        # Each chunk is its own transaction on the group-commit writer, like single writes
+        return await writer.asubmit(lambda db: write_chunk(db, rows, errors))
+
+    async for line, values in _bulk_rows(request, fmt, fields):
+        if isinstance(values, str):
+            errors.append((line, values))
+            continue
+        chunk.append((line, *values))
+        if len(chunk) >= BULK_CHUNK_ROWS:
+            accepted += await _flush(chunk)
+            chunk = []
+    if chunk:
+        accepted += await _flush(chunk)
+    return BulkOut(accepted=accepted, rejected=errors.count, errors=errors.first())
+
+
+@app.post("/bulk/responses", response_model=BulkOut)
+async def bulk_responses(request: Request,
+                         format: Optional[str] = Query(default=None, pattern="^(ndjson|csv)$", description="Defaults from Content-Type")):
+    """Upsert questionnaire answers from NDJSON or CSV rows of questionnaire_id, attribute_id, value."""
+    return await _bulk_ingest(request, format, ("questionnaire_id", "attribute_id", "value"), _write_responses_chunk)
+
+
+@app.post("/bulk/feedback", response_model=BulkOut)
+async def bulk_feedback(request: Request,
+                        format: Optional[str] = Query(default=None, pattern="^(ndjson|csv)$", description="Defaults from Content-Type")):
+    """Insert feedback from NDJSON or CSV rows of questionnaire_id, team_id, supported."""
+    return await _bulk_ingest(request, format, ("questionnaire_id", "team_id", "supported"), _write_feedback_chunk)
 
 
 # ------------------------------ Training -------------------------------------
-@app.post("/train", response_model=TrainOut)
-def train_model(db: Session = Depends(get_db), sport: Optional[str] = Query(default=None, description="Optional sport filter e.g. 'cricket' or 'football'")):
-    # Build dataset rows = each feedback entry
-    feedback_rows = db.query(Feedback).all()
-    if not feedback_rows:
-        raise HTTPException(status_code=400, detail="No feedback available for training")
+# Epochs over the full history when an incremental model has to be started from scratch
+INCREMENTAL_BOOTSTRAP_EPOCHS = 20
+# Rows fetched per round trip when streaming training data
+DATASET_CHUNK_ROWS = 10_000
 
-    # Attribute universe and team universe
-    attributes = db.query(Attribute).order_by(Attribute.id.asc()).all()
-    attribute_ids = [a.id for a in attributes]
-    teams = db.query(Team).order_by(Team.id.asc()).all()
+
+def _sport_team_ids(db: Session, sport: Optional[str]) -> List[int]:
+    query = db.query(Team.id).order_by(Team.id.asc())
     if sport:
-        def _sport_of(t: Team) -> Optional[str]:
-            try:
-                m = json.loads(t.meta) if t.meta else {}
-                return (m or {}).get("sport")
-            except Exception:
-                return None
-        teams = [t for t in teams if (_sport_of(t) or "").lower() == sport.lower()]
-    team_ids = [t.id for t in teams]
-    allowed_team_ids = set(team_ids)
+        query = query.filter(Team.sport == sport_key(sport))
+    return [tid for (tid,) in query]
+
+
+def _sport_teams(column: Any, sport: Optional[str]) -> List[Any]:
+    """SQL conditions keeping rows whose team id `column` belongs to `sport` (none for all teams)."""
+    if not sport:
+        return []
+    return [column.in_(select(Team.id).where(Team.sport == sport_key(sport)))]
+
+
+def _team_matrix(db: Session, attribute_ids: List[int], team_ids: List[int], sport: Optional[str] = None) -> np.ndarray:
+    """0/1 team x attribute matrix for the training universe, from one streamed query."""
+    attr_index = {aid: i for i, aid in enumerate(attribute_ids)}
+    team_row = {tid: i for i, tid in enumerate(team_ids)}
+    T = np.zeros((len(team_ids), len(attribute_ids)), dtype=np.uint8)
+    team_attrs = (
+        db.query(TeamAttribute.team_id, TeamAttribute.attribute_id)
+        .filter(TeamAttribute.value != 0, *_sport_teams(TeamAttribute.team_id, sport))
+        .yield_per(DATASET_CHUNK_ROWS)
+    )
+    for tid, aid in team_attrs:
+        ti, ai = team_row.get(tid), attr_index.get(aid)
+        if ti is not None and ai is not None:
+            T[ti, ai] = 1
+    return T
+
+
+def _training_groups(db: Session, attribute_ids: List[int], team_ids: List[int], since_id: int = 0,
+                     since: Optional[dt.datetime] = None, sport: Optional[str] = None,
+                     ) -> Iterator[tuple[int, np.ndarray, List[tuple[int, Optional[int], int]]]]:
+    """Feedback with `Feedback.id > since_id` (and `created_at >= since`) on `sport`'s teams, one
+    questionnaire at a time. The sport filter runs in SQL, so other sports' rows are never read.
+
+    Yields `(questionnaire_id, u, feedback)`: `u` is the user's 0/1 "yes" vector aligned to
+    `attribute_ids`, one buffer reused for every group, and `feedback` lists `(feedback_id, team
+    row, supported)` in id order, where the team row indexes `team_ids` (None for other teams).
+    Feedback and "yes" answers are streamed in questionnaire order and merged, so only one
+    user's answers are held at a time.
+    """
+    attr_index = {aid: i for i, aid in enumerate(attribute_ids)}
+    team_row = {tid: i for i, tid in enumerate(team_ids)}
+    conditions = [Feedback.id > since_id, *_sport_teams(Feedback.team_id, sport)]
+    if since is not None:
+        conditions.append(Feedback.created_at >= since)
+    feedback = (
+        db.query(Feedback.questionnaire_id, Feedback.id, Feedback.team_id, Feedback.supported)
+        .filter(*conditions)
+        .order_by(Feedback.questionnaire_id.asc(), Feedback.id.asc())
+        .yield_per(DATASET_CHUNK_ROWS)
+    )
+    answers = iter(
+        db.query(QuestionnaireResponse.questionnaire_id, QuestionnaireResponse.attribute_id)
+        .filter(
+            QuestionnaireResponse.value != 0,
+            QuestionnaireResponse.questionnaire_id.in_(select(Feedback.questionnaire_id).where(*conditions)),
+        )
+        .order_by(QuestionnaireResponse.questionnaire_id.asc())
+        .yield_per(DATASET_CHUNK_ROWS)
+    )
 
-    # Preload maps
-    team_attr_map: Dict[int, Dict[int, int]] = {
-        t.id: {ta.attribute_id: ta.value for ta in db.query(TeamAttribute).filter(TeamAttribute.team_id == t.id)}
-        for t in teams
-    }
-    q_resp_map: Dict[int, Dict[int, int]] = {}
+    u = np.zeros(len(attribute_ids), dtype=np.uint8)
+    pending = next(answers, None)
+    current_q: Optional[int] = None
+    group: List[tuple[int, Optional[int], int]] = []
+    for qid, fid, tid, supported in feedback:
+        if qid != current_q:
+            if group:
+                yield current_q, u, group
+            group = []
+            current_q = qid
+            u[:] = 0
+            while pending is not None and pending[0] < qid:
+                pending = next(answers, None)
+            while pending is not None and pending[0] == qid:
+                ai = attr_index.get(pending[1])
+                if ai is not None:
+                    u[ai] = 1
+                pending = next(answers, None)
+        group.append((fid, team_row.get(tid), 1 if supported else 0))
+    if group:
+        yield current_q, u, group
+
+
+def _build_dataset(db: Session, attribute_ids: List[int], team_ids: List[int], since_id: int = 0,
+                   T: Optional[np.ndarray] = None, sport: Optional[str] = None) -> tuple[np.ndarray, np.ndarray, int]:
+    """Feature rows for `sport`'s feedback with `Feedback.id > since_id`; returns (X, y, max feedback id seen).
+
+    Uses three set-based queries whatever the data size: team attributes (unless `T` from
+    `_team_matrix` is passed), then feedback and "yes" answers merged by `_training_groups`, all
+    filtered to the sport in SQL. Rows are written straight into a matrix preallocated from the
+    sport's feedback count.
+    """
+    if T is None:
+        T = _team_matrix(db, attribute_ids, team_ids, sport)
+
+    n_max = db.query(func.count(Feedback.id)).filter(Feedback.id > since_id, *_sport_teams(Feedback.team_id, sport)).scalar() or 0
+    X = np.zeros((n_max, len(attribute_ids)), dtype=np.uint8)
+    y = np.zeros(n_max, dtype=np.uint8)
+    if n_max == 0:
+        return X, y, since_id
+
+    n = 0
+    max_id = since_id
+    for _, u, feedback in _training_groups(db, attribute_ids, team_ids, since_id, sport=sport):
+        max_id = max(max_id, feedback[-1][0])
+        # Skip feedback for teams not in the selected universe (prevents cross-sport leakage)
+        kept = [(ti, label) for _, ti, label in feedback if ti is not None]
+        if kept:
+            rows, labels = zip(*kept)
+            # Feature: for each attribute id, 1 if user wants it and team has it, else 0
+            X[n:n + len(rows)] = T[list(rows)] & u
+            y[n:n + len(rows)] = labels
+            n += len(rows)
 
-    X: List[List[int]] = []
-    y: List[int] = []
+    return X[:n], y[:n], max_id
 
-    for fb in feedback_rows:
-        # Skip feedback for teams not in the selected universe (prevents cross-sport leakage)
-        if fb.team_id not in allowed_team_ids:
-            continue
-        # Load questionnaire responses once per questionnaire
-        if fb.questionnaire_id not in q_resp_map:
-            q_resps = db.query(QuestionnaireResponse).filter(
-                QuestionnaireResponse.questionnaire_id == fb.questionnaire_id
-            ).all()
-            q_resp_map[fb.questionnaire_id] = {r.attribute_id: r.value for r in q_resps}
-
-        user_prefs = q_resp_map.get(fb.questionnaire_id, {})
-        team_attrs = team_attr_map.get(fb.team_id, {})
-
-        # Feature: for each attribute id, 1 if user wants it and team has it, else 0
-        features = [int(user_prefs.get(aid, 0) and team_attrs.get(aid, 0)) for aid in attribute_ids]
-        X.append(features)
-        y.append(int(fb.supported))
-
-    if len(set(y)) < 2:
+
+# Set TRAINING_SNAPSHOTS=0 to rebuild the training matrix from the database on every run
+TRAINING_SNAPSHOTS = os.getenv("TRAINING_SNAPSHOTS", "1") != "0"
+SNAPSHOT_FORMAT = 2
+_snapshot_lock_local = threading.Lock()
+
+
+def _snapshot_paths(sport: Optional[str] = None) -> tuple[str, str, str]:
+    """Feature rows, labels (raw uint8, row-major) and meta of a sport's training snapshot."""
+    suffix = sport_slug(sport)
+    return (
+        os.path.join(MODEL_DIR, f"dataset_{suffix}.X.bin"),
+        os.path.join(MODEL_DIR, f"dataset_{suffix}.y.bin"),
+        os.path.join(MODEL_DIR, f"dataset_meta_{suffix}.json"),
+    )
+
+
+@contextmanager
+def _snapshot_lock(meta_path: str) -> Iterator[None]:
+    """Serialize snapshot updates across threads and, where `fcntl` exists, across train job processes."""
+    with _snapshot_lock_local, open(meta_path + ".lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+        yield
+
+
+def _feedback_stamp(db: Session, feedback_id: int) -> Optional[list]:
+    """Identity of one feedback row, to tell the same database from a reset and reseeded one."""
+    row = (
+        db.query(Feedback.questionnaire_id, Feedback.team_id, Feedback.supported, Feedback.created_at)
+        .filter(Feedback.id == feedback_id)
+        .first()
+    )
+    return None if row is None else [row[0], row[1], row[2], row[3].isoformat()]
+
+
+def _map_rows(path: str, rows: int, width: int) -> np.ndarray:
+    if rows * width == 0:
+        return np.zeros((rows, width), dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r", shape=(rows, width))
+
+
+def load_training_matrix(db: Session, sport: Optional[str], attribute_ids: List[int],
+                         team_ids: List[int]) -> tuple[np.ndarray, np.ndarray, int]:
+    """`_build_dataset` over all feedback, persisted as a snapshot next to the sport's model.
+
+    The meta file records the attribute and team ids, a fingerprint of the team x attribute
+    matrix (the catalog version), the `answers` data version, the max `Feedback.id` included and
+    that row's identity. While all of them match, only feedback past the watermark is built and
+    appended to the row files. Any change to team attributes or attributes, changed answers on
+    a questionnaire with feedback, or a reset feedback table, rebuilds the snapshot into new
+    files instead. X and y come back as read-only memory maps of the files.
+    The meta file is written last and is the commit point; bytes past its row count are
+    leftovers of an interrupted append and get overwritten by the next one.
+    """
+    if not TRAINING_SNAPSHOTS:
+        return _build_dataset(db, attribute_ids, team_ids, sport=sport)
+    x_path, y_path, meta_path = _snapshot_paths(sport)
+    width = len(attribute_ids)
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    with _snapshot_lock(meta_path):
+        T = _team_matrix(db, attribute_ids, team_ids, sport)
+        catalog_version = hashlib.blake2b(repr(T.shape).encode() + T.tobytes(), digest_size=16).hexdigest()
+        answers_version = data_version(db, "answers")
+        meta: Optional[Dict[str, Any]] = None
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        if (
+            meta is not None
+            and meta.get("format") == SNAPSHOT_FORMAT
+            and meta["attribute_ids"] == attribute_ids
+            and meta["team_ids"] == team_ids
+            and meta["catalog_version"] == catalog_version
+            and meta["answers_version"] == answers_version
+            and all(os.path.exists(p) and os.path.getsize(p) >= meta["rows"] * w for p, w in ((x_path, width), (y_path, 1)))
+            and _feedback_stamp(db, meta["feedback_watermark"]) == meta["watermark_row"]
+        ):
+            X, y, watermark = _build_dataset(db, attribute_ids, team_ids, since_id=meta["feedback_watermark"], T=T, sport=sport)
+            rows = meta["rows"] + len(y)
+            for path, data, w in ((x_path, X, width), (y_path, y, 1)):
+                with open(path, "r+b") as f:
+                    f.truncate(meta["rows"] * w)
+                    f.seek(0, os.SEEK_END)
+                    f.write(data.tobytes())
+            outcome = "appended" if watermark != meta["feedback_watermark"] else "reused"
+        else:
+            X, y, watermark = _build_dataset(db, attribute_ids, team_ids, T=T, sport=sport)
+            rows = len(y)
+            # New files, so memory maps of the old snapshot stay valid
+            for path, data in ((x_path, X), (y_path, y)):
+                _replace_atomic(path, lambda p, data=data: data.tofile(p))
+            meta = {"format": SNAPSHOT_FORMAT, "attribute_ids": attribute_ids, "team_ids": team_ids,
+                    "catalog_version": catalog_version, "answers_version": answers_version, "built_at": dt.datetime.utcnow().isoformat() + "Z"}
+            outcome = "rebuilt"
+        if outcome != "reused":
+            meta.update(
+                rows=rows, feedback_watermark=watermark, watermark_row=_feedback_stamp(db, watermark),
+                version=f"{time.time_ns():x}", updated_at=dt.datetime.utcnow().isoformat() + "Z",
+            )
+
+            def _write_meta(p: str) -> None:
+                with open(p, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+
+            _replace_atomic(meta_path, _write_meta)
+        metrics.inc("training_snapshot_total", outcome=outcome)
+        return _map_rows(x_path, rows, width), _map_rows(y_path, rows, 1).reshape(rows), watermark
+
+
+def _balanced_weights(class_counts: List[int]) -> Dict[int, float]:
+    """Same weighting as class_weight='balanced', from cumulative label counts."""
+    total = sum(class_counts)
+    return {c: total / (2.0 * max(1, n)) for c, n in enumerate(class_counts)}
+
+
+def _report(progress: Optional[Dict[str, Any]], stage: str, **info: Any) -> None:
+    """Record the current training stage; `progress` is shared with the job's parent when set."""
+    if progress is not None:
+        progress.update(stage=stage, **info)
+
+
+def run_training(db: Session, sport: Optional[str] = None, mode: str = "full",
+                 progress: Optional[Dict[str, Any]] = None) -> TrainOut:
+    """Train and save the model for `sport`; shared by `/train` and background training jobs."""
+    # Attribute universe and team universe
+    attribute_ids = [a.id for a in db.query(Attribute.id).order_by(Attribute.id.asc())]
+    team_ids = _sport_team_ids(db, sport)
+
+    if mode == "incremental":
+        return _train_incremental(db, sport, attribute_ids, team_ids, progress)
+
+    # Build dataset rows = each feedback entry
+    _report(progress, "dataset")
+    with metrics.timed("train_full", "dataset"):
+        X, y, watermark = load_training_matrix(db, sport, attribute_ids, team_ids)
+    if watermark == 0:
+        raise HTTPException(status_code=400, detail="No feedback available for training")
+    if len(set(y.tolist())) < 2:
         raise HTTPException(status_code=400, detail="Not enough class variety in feedback to train a model")
 
+    from sklearn.linear_model import LogisticRegression
+
     # Balance classes to avoid over-favoring teams with more positive labels
+    _report(progress, "fit", rows=len(X))
     model = LogisticRegression(max_iter=1000, class_weight='balanced')
-    model.fit(np.array(X), np.array(y))
+    with metrics.timed("train_full", "fit"):
+        model.fit(X, y)
 
-    save_model(model, attribute_ids, team_ids, sport=sport)
+    _report(progress, "save")
+    with metrics.timed("train_full", "save"):
+        save_model(model, attribute_ids, team_ids, sport=sport, extra={
+            "feedback_watermark": watermark,
+            "class_counts": np.bincount(y, minlength=2).tolist(),
+        })
 
     return TrainOut(
         trained_on_rows=len(X),
         attributes=attribute_ids,
         teams=team_ids,
         saved=True,
+        feedback_watermark=watermark,
     )
 
 
-# ------------------------------ Prediction -----------------------------------
-@app.post("/predict", response_model=PredictionOut)
-def predict(payload: PredictionIn, db: Session = Depends(get_db), sport: Optional[str] = Query(default=None, description="Optional sport filter e.g. 'cricket' or 'football'")):
-    q = db.get(Questionnaire, payload.questionnaire_id)
-    if not q:
-        raise HTTPException(status_code=404, detail="Questionnaire not found")
+@app.post("/train", response_model=TrainOut)
+@query_budget(9)
+def train_model(
+    db: Session = Depends(get_db),
+    sport: Optional[str] = Query(default=None, description="Optional sport filter e.g. 'cricket' or 'football'"),
+    mode: str = Query(default="full", pattern="^(full|incremental)$", description="'full' refits from all feedback; 'incremental' only consumes feedback newer than the saved watermark"),
+):
+    """Train in the request; 409 while a training job (or another `/train`) runs for the same sport."""
+    with _training_slot(sport):
+        return run_training(db, sport, mode)
+
+
+def _train_incremental(db: Session, sport: Optional[str], attribute_ids: List[int], team_ids: List[int],
+                       progress: Optional[Dict[str, Any]] = None) -> TrainOut:
+    """Update the sport's online model with feedback newer than its watermark.
+
+    The online model is an `SGDClassifier` with log loss, i.e. the same objective as the full
+    `LogisticRegression`, with balanced class weights recomputed from cumulative label counts. If
+    the current model is not an online one, or the attribute universe changed, it is started
+    from scratch over the full history.
+    """
+    from sklearn.linear_model import SGDClassifier
+
+    entry = model_registry.load_estimator(sport)
+    resume = (
+        entry is not None
+        and isinstance(entry.model, SGDClassifier)
+        and entry.attribute_ids == attribute_ids
+        and "feedback_watermark" in entry.meta
+    )
+    if resume:
+        model = entry.model
+        since_id = int(entry.meta["feedback_watermark"])
+        class_counts = list(entry.meta.get("class_counts", [0, 0]))
+        epochs = 1
+    else:
+        model = SGDClassifier(loss="log_loss", random_state=0)
+        since_id, class_counts, epochs = 0, [0, 0], INCREMENTAL_BOOTSTRAP_EPOCHS
+
+    _report(progress, "dataset")
+    with metrics.timed("train_incremental", "dataset"):
+        if resume:
+            X, y, watermark = _build_dataset(db, attribute_ids, team_ids, since_id=since_id, sport=sport)
+        else:
+            X, y, watermark = load_training_matrix(db, sport, attribute_ids, team_ids)
+    if len(X) == 0:
+        if not resume:
+            raise HTTPException(status_code=400, detail="No feedback available for training")
+        return TrainOut(trained_on_rows=0, attributes=attribute_ids, teams=team_ids, saved=False,
+                        mode="incremental", feedback_watermark=since_id)
+
+    new_counts = np.bincount(y, minlength=2)
+    class_counts = [class_counts[0] + int(new_counts[0]), class_counts[1] + int(new_counts[1])]
+    if not resume and min(class_counts) == 0:
+        raise HTTPException(status_code=400, detail="Not enough class variety in feedback to train a model")
+    _report(progress, "fit", rows=len(X))
+    model.class_weight = _balanced_weights(class_counts)
+    with metrics.timed("train_incremental", "fit"):
+        for _ in range(epochs):
+            model.partial_fit(X, y, classes=np.array([0, 1]))
+
+    _report(progress, "save")
+    with metrics.timed("train_incremental", "save"):
+        save_model(model, attribute_ids, team_ids, sport=sport, extra={
+            "feedback_watermark": watermark,
+            "class_counts": class_counts,
+        })
 
-    # Load all attributes and teams
-    attributes = db.query(Attribute).order_by(Attribute.id.asc()).all()
-    attribute_ids = [a.id for a in attributes]
-    teams = db.query(Team).order_by(Team.id.asc()).all()
-
-    # Load user responses
-    q_resps = db.query(QuestionnaireResponse).filter(QuestionnaireResponse.questionnaire_id == q.id).all()
-    user_prefs = {r.attribute_id: r.value for r in q_resps}
-
-    # Weight profiles for heuristic
-    weight_profiles: Dict[str, Dict[str, float]] = {
-        "uniform": {},
-        "sentiment_v1": {
-            "Community Engagement": 1.4,
-            "Possession Play": 1.2,
-            "Youth Academy": 1.3,
-            "National Team Contributors": 1.3,
-            "Iconic Players": 1.2,
-            "Atmospheric Stadium": 1.2,
-            "Budget Conscious": 1.0,
-            "Derby Specialists": 1.1,
-            "Big Match Temperament": 1.2,
-            "Sustainability Focus": 1.0,
-            "Historic Success": 1.3,
-            "Global Fanbase": 1.2,
-        },
+    return TrainOut(
+        trained_on_rows=len(X),
+        attributes=attribute_ids,
+        teams=team_ids,
+        saved=True,
+        mode="incremental",
+        feedback_watermark=watermark,
+    )
+
+
+# ---------------------------- Training jobs ----------------------------------
+class TrainJob:
+    """State of one background training job, as tracked by the API process."""
+
+    def __init__(self, job_id: str, sport: Optional[str], mode: str, progress: Dict[str, Any]):
+        self.job_id = job_id
+        self.sport = sport
+        self.mode = mode
+        self.status = "queued"
+        self.progress = progress  # manager dict, written by the worker process
+        self.submitted_at = dt.datetime.utcnow()
+        self.finished_at: Optional[dt.datetime] = None
+        self.result: Optional[TrainOut] = None
+        self.error: Optional[str] = None
+
+    def to_out(self) -> TrainJobOut:
+        progress = dict(self.progress)
+        status = "running" if self.status == "queued" and progress.get("stage") else self.status
+        return TrainJobOut(
+            job_id=self.job_id,
+            sport=self.sport,
+            mode=self.mode,
+            status=status,
+            progress=progress,
+            submitted_at=self.submitted_at,
+            finished_at=self.finished_at,
+            result=self.result,
+            error=self.error,
+        )
+
+
+# Finished jobs kept for status lookups; older ones are dropped first
+TRAIN_JOBS_KEEP = 100
+
+_train_jobs: Dict[str, TrainJob] = {}
+_active_train_jobs: Dict[str, str] = {}  # sport key -> job id currently queued or running
+_train_jobs_lock = threading.Lock()
+_train_executor: Optional[Any] = None
+_train_manager: Optional[Any] = None
+
+
+def _claim_training(key: str, owner: str) -> None:
+    """Reserve a sport's training slot for a job or a `/train` call; the caller holds `_train_jobs_lock`."""
+    if key in _active_train_jobs:
+        raise HTTPException(status_code=409, detail=f"Training job {_active_train_jobs[key]} is already running for '{key}'")
+    _active_train_jobs[key] = owner
+
+
+@contextmanager
+def _training_slot(sport: Optional[str]) -> Iterator[None]:
+    """Hold the sport's training slot while a synchronous `/train` runs, so it never races a job's save."""
+    key, owner = sport_slug(sport), f"sync-{uuid.uuid4().hex}"
+    with _train_jobs_lock:
+        _claim_training(key, owner)
+    try:
+        yield
+    finally:
+        with _train_jobs_lock:
+            if _active_train_jobs.get(key) == owner:
+                del _active_train_jobs[key]
+
+
+def _train_pool() -> tuple[Any, Any]:
+    """Process pool (one worker per core) and the manager used to share job progress."""
+    global _train_executor, _train_manager
+    if _train_executor is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawn: forking a threaded server process can copy held locks into the child
+        ctx = multiprocessing.get_context("spawn")
+        _train_manager = ctx.Manager()
+        _train_executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=ctx)
+    return _train_executor, _train_manager
+
+
+def shutdown_train_pool() -> None:
+    """Stop the worker processes and manager at shutdown; queued jobs are cancelled."""
+    global _train_executor, _train_manager
+    if _train_executor is not None:
+        _train_executor.shutdown(wait=False, cancel_futures=True)
+        _train_manager.shutdown()
+        _train_executor = _train_manager = None
+
+
+def _train_job_worker(sport: Optional[str], mode: str, progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs in a pool process; the model is published through `save_model` like a sync train."""
+    _report(progress, "starting")
+    db = SessionLocal()
+    try:
+        return run_training(db, sport, mode, progress).model_dump()
+    except HTTPException as exc:
+        # Only plain exceptions survive the trip back to the parent reliably
+        raise RuntimeError(exc.detail) from None
+    finally:
+        db.close()
+
+
+def _finish_train_job(job: TrainJob, key: str, future: Any) -> None:
+    with _train_jobs_lock:
+        try:
+            job.result = TrainOut(**future.result())
+            job.status = "succeeded"
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = "failed"
+        job.finished_at = dt.datetime.utcnow()
+        if _active_train_jobs.get(key) == job.job_id:
+            del _active_train_jobs[key]
+        finished = [jid for jid, j in _train_jobs.items() if j.finished_at is not None]
+        for jid in finished[:max(0, len(finished) - TRAIN_JOBS_KEEP)]:
+            del _train_jobs[jid]
+
+
+@app.post("/train/jobs", response_model=TrainJobOut, status_code=202)
+def submit_train_job(
+    sport: Optional[str] = Query(default=None, description="Optional sport filter e.g. 'cricket' or 'football'"),
+    mode: str = Query(default="full", pattern="^(full|incremental)$", description="Same as /train"),
+):
+    """Queue a training run in a worker process and return its job id straight away."""
+    key = sport_slug(sport)
+    executor, manager = _train_pool()
+    job_id = uuid.uuid4().hex
+    with _train_jobs_lock:
+        _claim_training(key, job_id)
+        job = TrainJob(job_id, sport, mode, manager.dict())
+        _train_jobs[job.job_id] = job
+    future = executor.submit(_train_job_worker, sport, mode, job.progress)
+    future.add_done_callback(lambda f: _finish_train_job(job, key, f))
+    return job.to_out()
+
+
+@app.get("/train/jobs/{job_id}", response_model=TrainJobOut)
+def get_train_job(job_id: str):
+    job = _train_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job.to_out()
+
+
+# --------------------------- Model evaluation --------------------------------
+# Default candidates for /train/evaluate and evaluate.py; /train fits the logistic C=1.0 one
+EVAL_GRID: List[Dict[str, Any]] = [
+    *({"family": "logistic", "params": {"C": c}} for c in (0.01, 0.1, 1.0, 10.0)),
+    *({"family": "sgd", "params": {"alpha": a}} for a in (1e-4, 1e-3)),
+    {"family": "hist_gb", "params": {}},
+]
+# predict_proba calls per fold when timing inference; the median is reported
+EVAL_LATENCY_REPEATS = 5
+
+
+def _eval_estimator(family: str, params: Dict[str, Any]) -> Any:
+    """Unfitted estimator for a candidate; unset options default to what training uses."""
+    if family == "logistic":
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(**{"max_iter": 1000, "class_weight": "balanced", **params})
+    if family == "sgd":
+        from sklearn.linear_model import SGDClassifier
+        return SGDClassifier(**{"loss": "log_loss", "class_weight": "balanced", "random_state": 0, **params})
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    return HistGradientBoostingClassifier(**{"class_weight": "balanced", "random_state": 0, **params})
+
+
+def _eval_fit(family: str, params: Dict[str, Any], X: np.ndarray, y: np.ndarray) -> Any:
+    model = _eval_estimator(family, params)
+    model.fit(X, y)
+    return model
+
+
+def _eval_fold(family: str, params: Dict[str, Any], X: np.ndarray, y: np.ndarray,
+               train: np.ndarray, test: np.ndarray, n_teams: int) -> Dict[str, float]:
+    """Fit on `train`, score `test`; runs in a joblib worker process.
+
+    Inference is timed on `n_teams` test rows (one /predict request) with the model in the form
+    serving would load it, i.e. the NumPy `LinearModel` for linear estimators.
+    """
+    from sklearn.metrics import log_loss, roc_auc_score
+
+    started = time.perf_counter()
+    model = _eval_fit(family, params, X[train], y[train])
+    fit_seconds = time.perf_counter() - started
+    prob = model.predict_proba(X[test])[:, 1]
+
+    served = LinearModel.from_estimator(model, X.shape[1]) or model
+    request = X[np.resize(test, max(1, n_teams))]
+    timings = []
+    for _ in range(EVAL_LATENCY_REPEATS):
+        mark = time.perf_counter()
+        served.predict_proba(request)
+        timings.append(time.perf_counter() - mark)
+    return {
+        "auc": float(roc_auc_score(y[test], prob)),
+        "log_loss": float(log_loss(y[test], prob, labels=[0, 1])),
+        "fit_seconds": fit_seconds,
+        "predict_ms": float(np.median(timings)) * 1e3,
     }
 
-    # Build attribute name map for weights
-    attr_name_by_id = {a.id: a.name for a in attributes}
-    weights_by_id: Dict[int, float] = {}
-    selected_profile = (payload.weights_profile or "sentiment_v1").lower()
-    prof = weight_profiles.get(selected_profile, weight_profiles["uniform"])
-    for aid in attribute_ids:
-        w = prof.get(attr_name_by_id[aid], 1.0)
-        weights_by_id[aid] = float(w)
-
-    # Load model if present
-    model, model_attr_ids, _ = load_model(sport=sport)
-
-    scores: List[TeamScore] = []
-
-    for t in teams:
-        team_attrs = {ta.attribute_id: ta.value for ta in db.query(TeamAttribute).filter(TeamAttribute.team_id == t.id)}
-        # Feature vector for model
-        if model is not None and model_attr_ids:
-            feats = [int(user_prefs.get(aid, 0) and team_attrs.get(aid, 0)) for aid in model_attr_ids]
-        else:
-            feats = [int(user_prefs.get(aid, 0) and team_attrs.get(aid, 0)) for aid in attribute_ids]
 
-        # Weighted heuristic score
-        desired_w = sum(weights_by_id[aid] for aid, v in user_prefs.items() if v == 1)
-        if desired_w == 0:
-            heur = 0.0
-        else:
-            match_w = sum(weights_by_id[aid] for aid, v in user_prefs.items() if v == 1 and team_attrs.get(aid, 0) == 1)
-            heur = match_w / desired_w
-
-        # Combine with model if available
-        if model is not None:
-            model_prob = float(model.predict_proba(np.array(feats).reshape(1, -1))[0, 1])
-            model_used = type(model).__name__
-            if payload.blend is not None and 0.0 <= payload.blend <= 1.0:
-                prob = float(payload.blend) * model_prob + (1.0 - float(payload.blend)) * heur
-            else:
-                prob = model_prob  # default: keep previous behavior unless blend provided
-        else:
-            prob = heur
-            model_used = None
+def evaluate_models(db: Session, request: EvaluationIn) -> EvaluationOut:
+    """Cross-validate every candidate for each sport, in parallel, and optionally promote the best.
+
+    Datasets are built here (the same rows `/train` would use); then every (sport, candidate,
+    fold) fit runs as one joblib task across `n_jobs` worker processes, with the feature matrices
+    memory-mapped to the workers rather than copied. Folds are stratified and fixed per sport, so
+    every candidate is scored on the same splits. The best candidate has the highest mean AUC,
+    with lower log loss breaking ties. With `promote`, each sport's best candidate is refit on
+    all of its rows and saved through `save_model`, with its scores in the model meta, while
+    holding the sport's training slot (409 if a job or `/train` holds it).
+    """
+    from joblib import Parallel, delayed, effective_n_jobs
+    from sklearn.model_selection import StratifiedKFold
+
+    started = time.perf_counter()
+    if request.sports is None:
+        sports = [None] + [s for (s,) in db.query(Team.sport).filter(Team.sport.isnot(None)).distinct().order_by(Team.sport)]
+    else:
+        sports = list(dict.fromkeys(sport_key(s) for s in request.sports))
+    attribute_ids = [a.id for a in db.query(Attribute.id).order_by(Attribute.id.asc())]
+    candidates = request.candidates
+    for c in candidates:
+        try:
+            _eval_estimator(c.family, c.params)
+        except TypeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid {c.family} params {c.params}: {e}")
+
+    reports: List[SportEvaluation] = []
+    datasets: List[tuple] = []  # (report, sport, team_ids, X, y, watermark, splits)
+    with metrics.timed("evaluate", "dataset"):
+        for sport in sports:
+            team_ids = _sport_team_ids(db, sport)
+            X, y, watermark = load_training_matrix(db, sport, attribute_ids, team_ids)
+            counts = np.bincount(y, minlength=2)
+            report = SportEvaluation(sport=sport, rows=len(y), positives=int(counts[1]), teams=len(team_ids))
+            reports.append(report)
+            if counts.min() < request.folds:
+                report.error = f"Each class needs at least {request.folds} rows for {request.folds}-fold cross-validation"
+                continue
+            splits = list(StratifiedKFold(n_splits=request.folds, shuffle=True, random_state=0).split(X, y))
+            datasets.append((report, sport, team_ids, X, y, watermark, splits))
+
+    n_jobs = effective_n_jobs(request.n_jobs)
+    tasks = [(d, c, fold) for d in datasets for c in candidates for fold in d[6]]
+    with metrics.timed("evaluate", "cross_validate"):
+        try:
+            scores = Parallel(n_jobs=n_jobs)(
+                delayed(_eval_fold)(c.family, c.params, X, y, train, test, len(team_ids))
+                for (_, _, team_ids, X, y, _, _), c, (train, test) in tasks
+            )
+        except ValueError as e:
+            # sklearn rejects bad parameter values at fit time
+            raise HTTPException(status_code=400, detail=f"Invalid candidate: {e}")
+
+    for di, (report, *_) in enumerate(datasets):
+        for ci, c in enumerate(candidates):
+            start = (di * len(candidates) + ci) * request.folds
+            folds = scores[start:start + request.folds]
+            auc = np.array([f["auc"] for f in folds])
+            loss = np.array([f["log_loss"] for f in folds])
+            report.results.append(CandidateResult(
+                family=c.family, params=c.params,
+                auc=float(auc.mean()), auc_std=float(auc.std()),
+                log_loss=float(loss.mean()), log_loss_std=float(loss.std()),
+                fit_seconds=float(np.mean([f["fit_seconds"] for f in folds])),
+                predict_ms=float(np.median([f["predict_ms"] for f in folds])),
+            ))
+        report.results.sort(key=lambda r: (-r.auc, r.log_loss))
+
+    if request.promote and datasets:
+        # Hold every promoted sport's training slot through refit and save, like /train; a sport
+        # with a job or /train running fails the whole promote with 409 before anything is saved
+        with metrics.timed("evaluate", "promote"), ExitStack() as slots:
+            for _, sport, *_ in datasets:
+                slots.enter_context(_training_slot(sport))
+            models = Parallel(n_jobs=min(n_jobs, len(datasets)))(
+                delayed(_eval_fit)(report.results[0].family, report.results[0].params, X, y)
+                for report, _, _, X, y, _, _ in datasets
+            )
+            for (report, sport, team_ids, X, y, watermark, _), model in zip(datasets, models):
+                best = report.results[0]
+                save_model(model, attribute_ids, team_ids, sport=sport, extra={
+                    "feedback_watermark": watermark,
+                    "class_counts": np.bincount(y, minlength=2).tolist(),
+                    "evaluation": {"family": best.family, "params": best.params, "folds": request.folds,
+                                   "auc": best.auc, "log_loss": best.log_loss},
+                })
+                report.promoted = True
+
+    return EvaluationOut(folds=request.folds, n_jobs=n_jobs, seconds=time.perf_counter() - started, sports=reports)
+
+
+@app.post("/train/evaluate", response_model=EvaluationOut)
+def evaluate_endpoint(payload: EvaluationIn, db: Session = Depends(get_db),
+                      x_admin_token: str = Header("", alias="X-Admin-Token", description="Required with promote")):
+    """k-fold cross-validation of a model grid per sport across worker processes (see `evaluate_models`).
+
+    Runs while the request is open; use `python evaluate.py` for large datasets. `promote`
+    replaces served models, so it needs the admin token.
+    """
+    if payload.promote:
+        require_admin(x_admin_token)
+    return evaluate_models(db, payload)
 
-        scores.append(TeamScore(team_id=t.id, team_name=t.name, score=prob))
 
-    scores.sort(key=lambda s: s.score, reverse=True)
+# ------------------------------ Prediction -----------------------------------
+# Above this many team x feature cells, scoring runs in the threadpool instead of on the event loop
+SCORE_INLINE_CELLS = 200_000
+
+
+async def aload_catalog(sport: Optional[str], version: int) -> TeamCatalog:
+    """`load_catalog` for async handlers, which read `version` themselves; a rebuild runs in the
+    threadpool on a sync session."""
+    catalog = _cached_catalog(sport_key(sport), version)
+    if catalog is not None:
+        return catalog
+
+    def _load() -> TeamCatalog:
+        db = SessionLocal()
+        try:
+            return load_catalog(db, sport, version)
+        finally:
+            db.close()
+
+    return await run_in_threadpool(_load)
+
+
+# Rankings repeat for identical answer sets; keep the full score vector per (answers, sport, options, versions)
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "1024"))  # entries; 0 disables the cache
+PREDICT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+PREDICT_CACHE_TTL = float(os.getenv("PREDICT_CACHE_TTL", "300"))  # seconds
+
+
+class PredictionCache:
+    """LRU + TTL cache of per-team scores for one answer set.
+
+    Keys carry the catalog version and the loaded model's stamp, so after a retrain or a team
+    attribute change older entries are never hit again and simply age out.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, np.ndarray]] = OrderedDict()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    @staticmethod
+    def answers_key(prefs: Dict[int, int]) -> bytes:
+        """Digest of the set of attributes answered yes; scores only depend on that set."""
+        yes = np.array(sorted(aid for aid, value in prefs.items() if value), dtype=np.int64)
+        return hashlib.blake2b(yes.tobytes(), digest_size=16).digest()
+
+    def get(self, key: tuple) -> Optional[np.ndarray]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, scores: np.ndarray) -> None:
+        if self.max_entries <= 0 or scores.nbytes > self.max_bytes:
+            return
+        scores.setflags(write=False)  # shared between requests
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, scores)
+            self._bytes += scores.nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: tuple) -> None:
+        _, scores = self._entries.pop(key)
+        self._bytes -= scores.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+            }
+
+
+prediction_cache = PredictionCache(PREDICT_CACHE_SIZE, PREDICT_CACHE_MAX_BYTES, PREDICT_CACHE_TTL)
+
 
-    return PredictionOut(
-        questionnaire_id=q.id,
-        scores=scores,
-        model_used=model_used if model is not None else None,
+@app.post("/predict", response_model=PredictionOut)
+@query_budget(6)
+async def predict(payload: PredictionIn, db: AsyncSession = Depends(get_async_db), sport: Optional[str] = Query(default=None, description="Optional sport filter e.g. 'cricket' or 'football'")):
+    # Load user responses; the questionnaire itself is only looked up when it has none
+    with metrics.timed("predict", "response_load"):
+        q_resps = await db.execute(
+            select(QuestionnaireResponse.attribute_id, QuestionnaireResponse.value)
+            .where(QuestionnaireResponse.questionnaire_id == payload.questionnaire_id)
+        )
+        user_prefs = {aid: value for aid, value in q_resps}
+        if not user_prefs and await db.get(Questionnaire, payload.questionnaire_id) is None:
+            raise HTTPException(status_code=404, detail="Questionnaire not found")
+
+    # Only the requested sport's teams are scored; without a sport, every team is. The catalog and
+    # profile versions are read from the database, so writes from any process are seen.
+    with metrics.timed("predict", "catalog_load"):
+        versions = await db.run_sync(data_versions, "catalog", "weight_profiles")
+        catalog_version = versions["catalog"]
+        catalog = await aload_catalog(sport, catalog_version)
+
+    # Load model if present (a reload unpickles, so keep it off the event loop)
+    with metrics.timed("predict", "model_load"):
+        fresh, entry = model_registry.cached(sport)
+        if not fresh:
+            entry = await run_in_threadpool(model_registry.get, sport)
+    model, model_attr_ids = (entry.model, entry.attribute_ids) if entry is not None else (None, None)
+
+    # Compiled once per catalog and profile version; only a profile edit makes this read the rows
+    with metrics.timed("predict", "weights"):
+        profiles_version = versions["weight_profiles"]
+        if not weight_profiles.current(profiles_version):
+            await run_in_threadpool(weight_profiles.refresh, None, profiles_version)
+        weights = weight_profiles.vector(catalog, payload.weights_profile, entry)
+
+    cache_key = (
+        sport_key(sport), payload.blend, (payload.weights_profile or DEFAULT_WEIGHT_PROFILE).lower(), profiles_version,
+        catalog_version, entry.stamp if entry is not None else None, PredictionCache.answers_key(user_prefs),
     )
+    cached = prediction_cache.get(cache_key)
+
+    def _score() -> np.ndarray:
+        return cached if cached is not None else score_teams(catalog, user_prefs, weights, model, model_attr_ids, payload.blend)
+
+    if len(catalog.team_ids) * len(model_attr_ids or catalog.attribute_ids) > SCORE_INLINE_CELLS:
+        probs = await run_in_threadpool(_score)
+    else:
+        probs = _score()
+    if cached is None:
+        prediction_cache.put(cache_key, probs)
+
+    with metrics.timed("predict", "sort_serialize"):
+        scores = [
+            TeamScore(team_id=catalog.team_ids[i], team_name=catalog.team_names[i], score=float(probs[i]))
+            for i in rank(probs, payload.top_k)
+        ]
+        return PredictionOut(
+            questionnaire_id=payload.questionnaire_id,
+            scores=scores,
+            model_used=model_name(model),
+        )
+
+
+@app.get("/predict/cache")
+async def predict_cache_stats():
+    return prediction_cache.stats()
+
+
+# Questionnaires scored per chunk in /predict/batch; bounds the users x teams score matrix held at once
+BATCH_CHUNK_SIZE = 256
+
+
+def _answers_matrix(catalog: TeamCatalog, rows: List[tuple], qids: List[int]) -> np.ndarray:
+    """0/1 answers matrix for `qids` from (questionnaire_id, attribute_id, value) rows."""
+    row_index = {qid: i for i, qid in enumerate(qids)}
+    U = np.zeros((len(qids), len(catalog.attribute_ids)), dtype=np.uint8)
+    for qid, aid, value in rows:
+        ai = catalog.attr_index.get(aid)
+        if ai is not None and value:
+            U[row_index[qid], ai] = 1
+    return U
+
+
+@app.post("/predict/batch")
+def predict_batch(payload: PredictionBatchIn, db: Session = Depends(get_db), sport: Optional[str] = Query(default=None, description="Optional sport filter e.g. 'cricket' or 'football'")):
+    """Score many questionnaires (or raw answer vectors) and stream one NDJSON line per entry.
+
+    Responses are loaded with one query per chunk of `BATCH_CHUNK_SIZE` questionnaires and each
+    chunk is scored as a users x teams matrix, so memory stays flat however long the batch is.
+    """
+    catalog = load_catalog(db, sport)
+    entry = model_registry.get(sport)
+    model, model_attr_ids = (entry.model, entry.attribute_ids) if entry is not None else (None, None)
+    weight_profiles.refresh(db)
+    weights = weight_profiles.vector(catalog, payload.weights_profile, entry)
+    model_used = model_name(model)
+
+    def _lines(U: np.ndarray, keys: List[Dict[str, Any]]):
+        probs = score_users(catalog, U, weights, model, model_attr_ids, payload.blend, op="predict_batch")
+        for key, row in zip(keys, probs):
+            scores = [
+                {"team_id": catalog.team_ids[i], "team_name": catalog.team_names[i], "score": float(row[i])}
+                for i in rank(row, payload.top_k)
+            ]
+            yield json.dumps({**key, "scores": scores, "model_used": model_used}) + "\n"
+
+    def _stream():
+        # The request session is closed once the handler returns, so streaming uses its own
+        session = SessionLocal()
+        try:
+            ids = payload.questionnaire_ids
+            for start in range(0, len(ids), BATCH_CHUNK_SIZE):
+                chunk = ids[start:start + BATCH_CHUNK_SIZE]
+                known = {qid for (qid,) in session.query(Questionnaire.id).filter(Questionnaire.id.in_(chunk))}
+                qids = [qid for qid in dict.fromkeys(chunk) if qid in known]
+                rows = (
+                    session.query(QuestionnaireResponse.questionnaire_id, QuestionnaireResponse.attribute_id, QuestionnaireResponse.value)
+                    .filter(QuestionnaireResponse.questionnaire_id.in_(qids))
+                    .all()
+                )
+                # Each distinct questionnaire is scored once; every entry, repeats included, gets its
+                # line in input order
+                lines = dict(zip(qids, _lines(_answers_matrix(catalog, rows, qids), [{"questionnaire_id": qid} for qid in qids])))
+                for qid in chunk:
+                    if qid in lines:
+                        yield lines[qid]
+                    else:
+                        yield json.dumps({"questionnaire_id": qid, "error": "Questionnaire not found"}) + "\n"
+        finally:
+            session.close()
+
+        for start in range(0, len(payload.answers), BATCH_CHUNK_SIZE):
+            chunk = payload.answers[start:start + BATCH_CHUNK_SIZE]
+            U = np.stack([catalog.user_vector(a) for a in chunk]) if chunk else np.zeros((0, len(catalog.attribute_ids)), dtype=np.uint8)
+            yield from _lines(U, [{"answers_index": start + i} for i in range(len(chunk))])
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
 
 
 # ------------------------------ Analytics ------------------------------------
 @app.get("/analytics", response_model=AnalyticsOut)
-def analytics(db: Session = Depends(get_db)):
-    total_questionnaires = db.query(func.count(Questionnaire.id)).scalar() or 0
-    total_feedback = db.query(func.count(Feedback.id)).scalar() or 0
-    total_teams = db.query(func.count(Team.id)).scalar() or 0
-    total_attributes = db.query(func.count(Attribute.id)).scalar() or 0
+@query_budget(14)
+async def analytics(request: Request, db: AsyncSession = Depends(get_async_db)):
+    version = await db.run_sync(data_version, "analytics")
+    cached = response_cache.lookup(request, "analytics", version)
+    if cached is not None:
+        return cached
+    await db.run_sync(ensure_analytics)
+    counters = {c.name: c.value for c in await db.scalars(select(AnalyticsCounter))}
 
     # Attribute popularity: how often users answered yes per attribute
-    rows = (
-        db.query(Attribute.id, Attribute.name, func.sum(QuestionnaireResponse.value).label("yes_count"), func.count(QuestionnaireResponse.id).label("total"))
-        .join(QuestionnaireResponse, QuestionnaireResponse.attribute_id == Attribute.id, isouter=True)
-        .group_by(Attribute.id, Attribute.name)
+    rows = (await db.execute(
+        select(Attribute.id, Attribute.name, AttributeStat.yes_count, AttributeStat.total_answers)
+        .join(AttributeStat, AttributeStat.attribute_id == Attribute.id, isouter=True)
         .order_by(Attribute.id.asc())
-        .all()
-    )
+    )).all()
     attribute_popularity = [
         {
             "attribute_id": r[0],
@@ -606,13 +3342,11 @@ def analytics(db: Session = Depends(get_db)):
     ]
 
     # Team support rate from feedback
-    rows2 = (
-        db.query(Team.id, Team.name, func.sum(Feedback.supported).label("yes"), func.count(Feedback.id).label("total"))
-        .join(Feedback, Feedback.team_id == Team.id, isouter=True)
-        .group_by(Team.id, Team.name)
+    rows2 = (await db.execute(
+        select(Team.id, Team.name, TeamStat.support_yes, TeamStat.total)
+        .join(TeamStat, TeamStat.team_id == Team.id, isouter=True)
         .order_by(Team.id.asc())
-        .all()
-    )
+    )).all()
     team_support_rate = [
         {
             "team_id": r[0],
@@ -624,19 +3358,48 @@ def analytics(db: Session = Depends(get_db)):
         for r in rows2
     ]
 
-    return AnalyticsOut(
-        total_questionnaires=total_questionnaires,
-        total_feedback=total_feedback,
-        total_teams=total_teams,
-        total_attributes=total_attributes,
+    out = AnalyticsOut(
+        total_questionnaires=counters.get("questionnaires", 0),
+        total_feedback=counters.get("feedback", 0),
+        total_teams=len(team_support_rate),
+        total_attributes=len(attribute_popularity),
         attribute_popularity=attribute_popularity,
         team_support_rate=team_support_rate,
     )
+    return response_cache.respond(request, "analytics", version, out.model_dump_json().encode())
+
+
+# ------------------------------ Metrics --------------------------------------
+@app.get("/metrics")
+def metrics_endpoint():
+    """Prometheus text exposition: request, SQL and stage metrics plus cache and registry state."""
+    cache = prediction_cache.stats()
+    registry = model_registry.stats()
+    with _catalog_lock:
+        catalogs = {key: len(c.team_ids) for key, c in _catalogs.items()}
+        catalog_version = _catalog_version
+    gauges: List[Tuple[str, str, str, Dict[str, Any], float]] = [
+        ("process_uptime_seconds", "gauge", "Seconds since the app module was loaded", {}, time.time() - metrics.started),
+        ("prediction_cache_entries", "gauge", "Score vectors held by the /predict cache", {}, cache["entries"]),
+        ("prediction_cache_bytes", "gauge", "Bytes held by the /predict cache", {}, cache["bytes"]),
+        *[(f"prediction_cache_{name}_total", "counter", f"/predict cache {name}", {}, cache[name])
+          for name in ("hits", "misses", "evictions", "expirations")],
+        ("model_registry_loads_total", "counter", "Model artifacts loaded into the registry", {}, registry["loads"]),
+        ("model_registry_load_failures_total", "counter", "Registry loads that never saw a consistent artifact", {}, registry["load_failures"]),
+        *[("model_registry_model_info", "gauge", "Loaded model per sport (always 1)",
+           {"sport": sport, "version": m["version"], "model": m["model"] or ""}, 1) for sport, m in sorted(registry["models"].items())],
+        ("team_catalog_version", "gauge", "Catalog data version the cached team catalogs were built at", {}, catalog_version),
+        *[("team_catalog_teams", "gauge", "Teams in each cached scoring catalog", {"sport": key or "all"}, n)
+          for key, n in sorted(catalogs.items(), key=lambda item: item[0] or "")],
+        ("weight_profiles_version", "gauge", "Weight profile data version of the loaded profiles", {}, weight_profiles.version),
+        ("weight_profile_compiles_total", "counter", "Weight vectors compiled for a catalog", {}, weight_profiles.compiles),
+    ]
+    return Response(metrics.render(gauges), media_type="text/plain; version=0.0.4")
 
 
 # ------------------------------ Root -----------------------------------------
 @app.get("/")
-def root():
+async def root():
     return {"status": "ok", "service": "Smart Feedback & Analytics API"}
 
 
@@ -644,33 +3407,317 @@ def root():
 # Run: uvicorn app:app --reload --port 8000
 
 
+# ------------------------------ Seeding --------------------------------------
+# Synthetic data for demos, training and benchmarks: generated with NumPy under a fixed seed and
+# written with executemany inserts, so the same request always produces the same rows.
+SEED_CHUNK_ROWS = 10_000  # questionnaires generated and written per batch
+SEED_BLOCK_CELLS = 20_000_000  # cap on matrix cells held per batch
+SEED_MAX_TEAM_CELLS = 100_000_000  # cap on teams x attributes per sport; the team matrix is held as bools
+SEED_EXTRA_CHOICES = 8  # attributes a questionnaire considers beyond its profile
+SEED_EXTRA_YES_RATE = 0.3  # chance each of those is a yes
+SEED_STYLED_TEAMS = 0.5  # share of generated teams leaning towards one profile
+SEED_STYLE_PROB = 0.8  # chance a styled team has each of its profile's attributes
+
+DEMO_ATTRIBUTE_NAMES = [
+    "High Press", "Counter-Attack", "Possession Play", "Wing Play", "Through Balls",
+    "Set Piece Threat", "Compact Defense", "High Line", "Low Block", "Wide Formation",
+    "Narrow Formation", "3-Back Preference", "4-Back Preference", "5-Back Flex",
+    "Youth Academy", "Star Signings", "Net Spend High", "Budget Conscious",
+    "Local Talent Focus", "International Scouting", "National Team Contributors", "Veteran Experience", "Pace & Power",
+    "Technical Midfield", "Creative No10", "Target Man", "Press-Resistant",
+    "Fullback Overlaps", "Inverted Wingers", "Sweeper Keeper", "Long Shots",
+    "Crossing Frequency", "Dribble-Oriented", "Short Passing", "Long Passing",
+    "Build From Back", "Direct Play", "Tiki-Taka Tendencies", "Gegenpress Tendencies",
+    "Backroom Stability", "Manager Longevity", "Analytics Adoption", "Sports Science",
+    "Injury Resilience", "Academy Integration", "Community Engagement",
+    "Sustainability Focus", "Global Fanbase", "Historic Success", "Recent Form Strong",
+    "Derby Specialists", "European Pedigree", "Big Match Temperament", "Home Fortress",
+    "Away Warriors", "Atmospheric Stadium", "Modern Stadium", "Iconic Players",
+    "Defensive Mid Anchor", "Box-to-Box Engine", "Ball-Playing CB", "Aerial Dominance",
+]
+DEMO_TEAM_NAMES = [
+    "Manchester City", "Manchester United", "Liverpool", "Chelsea", "Arsenal",
+    "Tottenham Hotspur", "Real Madrid", "FC Barcelona", "Atletico Madrid", "Bayern Munich",
+    "Borussia Dortmund", "Paris Saint-Germain", "Juventus", "Inter Milan", "AC Milan",
+]
+# (team name keywords, attributes those teams lean towards, probability); later rules win
+DEMO_TEAM_STYLES = [
+    (("city", "barcelona", "bayern"), ("Possession Play", "High Press", "Build From Back", "Short Passing", "Sports Science", "Analytics Adoption"), 0.8),
+    (("real", "juventus", "psg"), ("Star Signings", "Global Fanbase", "Historic Success", "European Pedigree", "Iconic Players"), 0.85),
+    (("united", "arsenal"), ("Youth Academy", "Academy Integration", "Technical Midfield"), 0.75),
+    (("atletico", "inter"), ("Compact Defense", "Low Block", "Big Match Temperament"), 0.8),
+]
+# Synthetic user profiles biased to some styles; questionnaire i always says yes to profile i % 5
+DEMO_PROFILES = [
+    ("High Press", "Possession Play", "Short Passing", "Build From Back"),
+    ("Counter-Attack", "Direct Play", "Pace & Power", "Long Passing"),
+    ("Compact Defense", "Low Block", "Set Piece Threat"),
+    ("Youth Academy", "Academy Integration", "Budget Conscious"),
+    ("Star Signings", "Global Fanbase", "Iconic Players"),
+]
+
+
+def _seed_names(preset: List[str], n: int, prefix: str) -> List[str]:
+    """The first `n` preset names, topped up with numbered ones."""
+    return preset[:n] + [f"{prefix} {i}" for i in range(len(preset) + 1, n + 1)]
+
+
+def _seed_styles(spec: SeedSport, rng: np.random.Generator, attr_names: List[str],
+                 team_names: List[str]) -> Tuple[List[np.ndarray], Callable[[int, int], np.ndarray]]:
+    """Questionnaire profiles (attribute index arrays), and a function giving the per-attribute
+    probabilities of teams `start:stop`, so no teams x attributes array is built for all teams."""
+    n_a, n_t = len(attr_names), len(team_names)
+    if spec.sport is None:
+        index = {name: i for i, name in enumerate(attr_names)}
+        lowered = [name.lower() for name in team_names]
+        styles = [
+            (np.array([i for i, name in enumerate(lowered) if any(k in name for k in keywords)], dtype=np.int64),
+             [index[n] for n in names if n in index], p)
+            for keywords, names, p in DEMO_TEAM_STYLES
+        ]
+        profiles = [np.array([index[n] for n in names if n in index], dtype=np.int64) for names in DEMO_PROFILES]
+    else:
+        profiles = [rng.choice(n_a, size=min(4, n_a), replace=False) for _ in DEMO_PROFILES]
+        styled = rng.random(n_t) < SEED_STYLED_TEAMS
+        style = rng.integers(0, len(profiles), size=n_t)
+        styles = [(np.flatnonzero(styled & (style == p)), cols, SEED_STYLE_PROB) for p, cols in enumerate(profiles)]
+
+    def team_prob(start: int, stop: int) -> np.ndarray:
+        prob = np.full((stop - start, n_a), spec.density)
+        for rows, cols, p in styles:
+            prob[np.ix_(rows[(rows >= start) & (rows < stop)] - start, cols)] = p
+        return prob
+
+    return profiles, team_prob
+
+
+def _seed_sport(db: Session, spec: SeedSport, rng: np.random.Generator, created: str) -> Dict[str, int]:
+    """Generate and insert one sport's attributes, teams, questionnaires, answers and feedback."""
+    conn = db.connection()
+
+    def next_id(table: str) -> int:
+        return conn.exec_driver_sql(f"SELECT coalesce(max(id), 0) FROM {table}").scalar_one()
+
+    a0, t0, q0 = next_id("attributes"), next_id("teams"), next_id("questionnaires")
+    label = spec.sport.strip().title() if spec.sport else ""
+    attr_names = _seed_names(DEMO_ATTRIBUTE_NAMES if spec.sport is None else [], spec.attributes, f"{label} Attribute".strip())
+    team_names = _seed_names(DEMO_TEAM_NAMES if spec.sport is None else [], spec.teams, f"{label} Team".strip())
+    n_a, n_t, n_q = len(attr_names), len(team_names), spec.questionnaires
+    meta = json.dumps({"league": "Top"} if spec.sport is None else {"sport": spec.sport, "league": "Synthetic"})
+
+    conn.exec_driver_sql(
+        "INSERT INTO attributes (id, name, description, active) VALUES (?, ?, NULL, 1)",
+        [(a0 + i + 1, name) for i, name in enumerate(attr_names)],
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO teams (id, name, meta, sport) VALUES (?, ?, ?, ?)",
+        [(t0 + i + 1, name, meta, sport_key(spec.sport)) for i, name in enumerate(team_names)],
+    )
+    profiles, team_prob = _seed_styles(spec, rng, attr_names, team_names)
+    # Drawn and written in blocks of teams; the draws are the same as one (teams, attributes) call
+    has = np.empty((n_t, n_a), dtype=bool)
+    n_team_attributes = 0
+    team_chunk = max(1, SEED_BLOCK_CELLS // n_a)
+    for start in range(0, n_t, team_chunk):
+        stop = min(n_t, start + team_chunk)
+        has[start:stop] = rng.random((stop - start, n_a)) < team_prob(start, stop)
+        # Only attributes a team has are stored; a missing pair reads as 0 everywhere
+        ti, ai = np.nonzero(has[start:stop])
+        conn.exec_driver_sql(
+            "INSERT INTO team_attributes (team_id, attribute_id, value) VALUES (?, ?, 1)",
+            list(zip((ti + t0 + start + 1).tolist(), (ai + a0 + 1).tolist())),
+        )
+        n_team_attributes += len(ti)
+
+    k = n_a if spec.answers is None else min(spec.answers, n_a)
+    n_f = n_t if spec.feedback is None else min(spec.feedback, n_t)
+    every_team = spec.feedback is None
+    extra = min(SEED_EXTRA_CHOICES, n_a)
+    has_f = has.astype(np.float32) if every_team else None  # every team is scored against each questionnaire
+    attr_yes, attr_total = np.zeros(n_a, dtype=np.int64), np.zeros(n_a, dtype=np.int64)
+    team_yes, team_total = np.zeros(n_t, dtype=np.int64), np.zeros(n_t, dtype=np.int64)
+    per_row = 3 * n_a + (n_t if every_team else n_f * n_a)
+    chunk = max(1, min(SEED_CHUNK_ROWS, SEED_BLOCK_CELLS // per_row))
+    for start in range(0, n_q, chunk):
+        n = min(chunk, n_q - start)
+        rows = np.arange(n)[:, None]
+        qids = np.arange(q0 + start + 1, q0 + start + n + 1)
+        conn.exec_driver_sql(
+            "INSERT INTO questionnaires (id, user_id, created_at) VALUES (?, ?, ?)",
+            [(int(q), f"{spec.sport + '-' if spec.sport else ''}synthetic-{start + i}", created) for i, q in enumerate(qids)],
+        )
+        # Yes to the questionnaire's profile, plus a few other attributes it considered
+        if spec.sport is None:
+            profile = (start + np.arange(n)) % len(profiles)
+        else:
+            profile = rng.integers(0, len(profiles), size=n)
+        yes = np.zeros((n, n_a), dtype=bool)
+        for p, cols in enumerate(profiles):
+            yes[np.ix_(np.flatnonzero(profile == p), cols)] = True
+        order = rng.random((n, n_a))
+        considered = np.argpartition(order, extra - 1, axis=1)[:, :extra]
+        yes[rows, considered] |= rng.random((n, extra)) < SEED_EXTRA_YES_RATE
+        if k < n_a:
+            # Answer the yes attributes first, then ones considered, then the rest at random
+            order[rows, considered] -= 1.0
+            order[yes] -= 2.0
+            answered = np.argpartition(order, k - 1, axis=1)[:, :k]
+            kept = np.zeros_like(yes)
+            kept[rows, answered] = True
+            yes &= kept
+        else:
+            answered = np.broadcast_to(np.arange(n_a), (n, n_a))
+        values = yes[rows, answered].ravel()
+        conn.exec_driver_sql(
+            "INSERT INTO questionnaire_responses (questionnaire_id, attribute_id, value) VALUES (?, ?, ?)",
+            list(zip(np.repeat(qids, k).tolist(), (answered + a0 + 1).ravel().tolist(), values.astype(int).tolist())),
+        )
+        attr_total += np.bincount(answered.ravel(), minlength=n_a)
+        attr_yes += np.bincount(answered.ravel(), weights=values, minlength=n_a).astype(np.int64)
+
+        # Label by how much of the user's yes set the team covers, against a threshold of 0.4-0.6
+        yes_f = yes.astype(np.float32)
+        if every_team:
+            rated = np.broadcast_to(np.arange(n_t), (n, n_t))
+            overlap = yes_f @ has_f.T
+        else:
+            rated = rng.integers(0, n_t, size=(n, n_f))
+            overlap = np.einsum("nfa,na->nf", has[rated].astype(np.float32), yes_f)
+        desired = yes_f.sum(axis=1, keepdims=True)
+        rate = np.divide(overlap, desired, out=np.zeros_like(overlap), where=desired > 0)
+        labels = rate >= 0.4 + rng.integers(0, 20, size=(n, n_f)) / 100.0
+        conn.exec_driver_sql(
+            "INSERT INTO feedback (questionnaire_id, team_id, supported, created_at) VALUES (?, ?, ?, ?)",
+            list(zip(np.repeat(qids, n_f).tolist(), (rated + t0 + 1).ravel().tolist(),
+                     labels.ravel().astype(int).tolist(), [created] * (n * n_f))),
+        )
+        team_total += np.bincount(rated.ravel(), minlength=n_t)
+        team_yes += np.bincount(rated.ravel(), weights=labels.ravel(), minlength=n_t).astype(np.int64)
+
+    # Analytics counters, kept in the same transaction as the rows like the write endpoints do
+    _increment(db, AttributeStat, "attribute_id", [
+        {"attribute_id": int(a0 + i + 1), "yes_count": int(attr_yes[i]), "total_answers": int(attr_total[i])}
+        for i in np.flatnonzero(attr_total)
+    ])
+    _increment(db, TeamStat, "team_id", [
+        {"team_id": int(t0 + i + 1), "support_yes": int(team_yes[i]), "total": int(team_total[i])}
+        for i in np.flatnonzero(team_total)
+    ])
+    bump_counter(db, "questionnaires", n_q)
+    bump_counter(db, "feedback", n_q * n_f)
+    return {
+        "attributes": n_a,
+        "teams": n_t,
+        "team_attributes": n_team_attributes,
+        "questionnaires": n_q,
+        "responses": n_q * k,
+        "feedback": n_q * n_f,
+    }
+
+
+def seed_database(bind: Any, sports: List[SeedSport], seed: int = 42) -> Dict[str, Any]:
+    """Append a synthetic dataset for each sport in one transaction, analytics counters included.
+
+    Ids continue from the current maxima, so this works on a fresh schema or an existing one;
+    names must not clash with rows already there. Returns per-sport row counts and totals.
+    """
+    started = time.perf_counter()
+    keys = [sport_key(s.sport) for s in sports]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Each sport can only be seeded once per run")
+    rng = np.random.default_rng(seed)
+    created = dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+    with Session(bind) as db:
+        ensure_analytics(db)  # cheap on a fresh schema; the seeded rows are then counted as they go in
+        per_sport = {s.sport or "default": _seed_sport(db, s, rng, created) for s in sports}
+        bump_version(db, *DATA_VERSIONS)
+        db.commit()
+    totals = {key: sum(counts[key] for counts in per_sport.values()) for key in next(iter(per_sport.values()))}
+    return {**totals, "sports": per_sport, "seconds": round(time.perf_counter() - started, 2)}
+
+
 # ------------------------------ Admin ----------------------------------------
 # Simple header token protection for admin endpoints
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "dev-admin")
 
 
+def recreate_schema() -> None:
+    """Drop and recreate every table with the default weight profiles; analytics counters get rebuilt on next use.
+
+    Every data version restarts at a new random value, so all processes drop their cached copies.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    seed_weight_profiles(engine)
+    with Session(engine) as db:
+        bump_version(db, *DATA_VERSIONS)
+        db.commit()
+
+
 def require_admin(x_admin_token: str = Header("", alias="X-Admin-Token")):
     if x_admin_token != ADMIN_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid or missing admin token")
     return True
 
 
+@app.get("/admin/profiles")
+def admin_list_profiles(_: bool = Depends(require_admin)):
+    """Summaries of the kept request profiles, newest first."""
+    with _profiles_lock:
+        reports = list(_profiles.values())
+    return [
+        {key: r[key] for key in ("id", "method", "path", "route", "status", "ms", "at")} | {"sql_statements": r["sql"]["statements"]}
+        for r in reversed(reports)
+    ]
+
+
+@app.get("/admin/profiles/{profile_id}")
+def admin_get_profile(profile_id: str, _: bool = Depends(require_admin)):
+    with _profiles_lock:
+        report = _profiles.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
+
+
 @app.post("/admin/reset-db")
 def admin_reset_db(_: bool = Depends(require_admin), db: Session = Depends(get_db)):
     # Drop and recreate all tables
     db.close()
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
+    recreate_schema()
     return {"status": "ok", "message": "Database schema reset"}
 
 
+@app.post("/admin/rebuild-analytics")
+def admin_rebuild_analytics(_: bool = Depends(require_admin), db: Session = Depends(get_db)):
+    """Recompute analytics counters from scratch and report any that had drifted."""
+    def _snapshot() -> Dict[str, Any]:
+        return {
+            "attributes": {r.attribute_id: (r.yes_count, r.total_answers) for r in db.query(AttributeStat)},
+            "teams": {r.team_id: (r.support_yes, r.total) for r in db.query(TeamStat)},
+            "counters": {r.name: r.value for r in db.query(AnalyticsCounter) if r.name != "built"},
+        }
+
+    before = _snapshot()
+    rebuild_analytics(db)
+    after = _snapshot()
+    drift = {
+        section: sorted(str(k) for k in set(before[section]) | set(after[section]) if before[section].get(k) != after[section].get(k))
+        for section in after
+    }
+    return {"status": "ok", "consistent": not any(drift.values()), "drift": drift}
+
+
 @app.post("/admin/delete-model")
-def admin_delete_model(_: bool = Depends(require_admin)):
+def admin_delete_model(_: bool = Depends(require_admin), sport: Optional[str] = Query(default=None)):
     removed = []
-    for p in [MODEL_PATH, META_PATH]:
+    model_path, meta_path = _model_paths(sport)
+    # Meta first so the registry stops serving the model before its files disappear
+    for p in [meta_path, model_path, _linear_path(sport)]:
         if os.path.exists(p):
             os.remove(p)
             removed.append(os.path.basename(p))
+    model_registry.clear(sport)
     return {"status": "ok", "removed": removed}
 
 
@@ -678,8 +3725,7 @@ def admin_delete_model(_: bool = Depends(require_admin)):
 def admin_reseed_demo(_: bool = Depends(require_admin), db: Session = Depends(get_db)):
     """Populate a small demo dataset for quick testing."""
     # Clear existing
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
+    recreate_schema()
 
     # Attributes
     attrs = [
@@ -770,123 +3816,157 @@ def admin_reseed_demo(_: bool = Depends(require_admin), db: Session = Depends(ge
         Feedback(questionnaire_id=q2.id, team_id=united.id, supported=1),
         Feedback(questionnaire_id=q2.id, team_id=rovers.id, supported=1),
     ])
+    bump_version(db, *DATA_VERSIONS)
     db.commit()
 
     return {"status": "ok", "message": "Demo data reseeded", "questionnaires": [q1.id, q2.id]}
 
 
 @app.post("/admin/reseed-large")
-def admin_reseed_large(_: bool = Depends(require_admin), db: Session = Depends(get_db)):
-    """Seed 60+ attributes and ~15 famous teams with synthetic data and feedback for training."""
-    import random
-
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
-
-    # 60 attributes
-    attr_names = [
-        "High Press", "Counter-Attack", "Possession Play", "Wing Play", "Through Balls",
-        "Set Piece Threat", "Compact Defense", "High Line", "Low Block", "Wide Formation",
-        "Narrow Formation", "3-Back Preference", "4-Back Preference", "5-Back Flex",
-        "Youth Academy", "Star Signings", "Net Spend High", "Budget Conscious",
-        "Local Talent Focus", "International Scouting", "National Team Contributors", "Veteran Experience", "Pace & Power",
-        "Technical Midfield", "Creative No10", "Target Man", "Press-Resistant",
-        "Fullback Overlaps", "Inverted Wingers", "Sweeper Keeper", "Long Shots",
-        "Crossing Frequency", "Dribble-Oriented", "Short Passing", "Long Passing",
-        "Build From Back", "Direct Play", "Tiki-Taka Tendencies", "Gegenpress Tendencies",
-        "Backroom Stability", "Manager Longevity", "Analytics Adoption", "Sports Science",
-        "Injury Resilience", "Academy Integration", "Community Engagement",
-        "Sustainability Focus", "Global Fanbase", "Historic Success", "Recent Form Strong",
-        "Derby Specialists", "European Pedigree", "Big Match Temperament", "Home Fortress",
-        "Away Warriors", "Atmospheric Stadium", "Modern Stadium", "Iconic Players",
-        "Defensive Mid Anchor", "Box-to-Box Engine", "Ball-Playing CB", "Aerial Dominance"
-    ]
-    attrs = [Attribute(name=n, description=None, active=True) for n in attr_names]
-    db.add_all(attrs)
-    db.commit()
-    for a in attrs:
-        db.refresh(a)
-    attr_id = {a.name: a.id for a in attrs}
+def admin_reseed_large(payload: Optional[SeedRequest] = None, _: bool = Depends(require_admin), db: Session = Depends(get_db)):
+    """Replace all data with a synthetic dataset for training.
 
-    # 15 famous teams
-    team_names = [
-        "Manchester City", "Manchester United", "Liverpool", "Chelsea", "Arsenal",
-        "Tottenham Hotspur", "Real Madrid", "FC Barcelona", "Atletico Madrid", "Bayern Munich",
-        "Borussia Dortmund", "Paris Saint-Germain", "Juventus", "Inter Milan", "AC Milan"
-    ]
-    teams = [Team(name=t, meta=json.dumps({"league": "Top"})) for t in team_names]
-    db.add_all(teams)
-    db.commit()
-    for t in teams:
-        db.refresh(t)
-
-    # Deterministic assignment of attributes to teams
-    random.seed(42)
-    for t in teams:
-        for a in attrs:
-            # Team-specific likelihoods based on name keywords
-            prob = 0.5
-            name = t.name.lower()
-            if "city" in name or "barcelona" in name or "bayern" in name:
-                if a.name in {"Possession Play", "High Press", "Build From Back", "Short Passing", "Sports Science", "Analytics Adoption"}:
-                    prob = 0.8
-            if "real" in name or "juventus" in name or "psg" in name:
-                if a.name in {"Star Signings", "Global Fanbase", "Historic Success", "European Pedigree", "Iconic Players"}:
-                    prob = 0.85
-            if "united" in name or "arsenal" in name:
-                if a.name in {"Youth Academy", "Academy Integration", "Technical Midfield"}:
-                    prob = 0.75
-            if "atletico" in name or "inter" in name:
-                if a.name in {"Compact Defense", "Low Block", "Big Match Temperament"}:
-                    prob = 0.8
-
-            val = 1 if random.random() < prob else 0
-            db.add(TeamAttribute(team_id=t.id, attribute_id=a.id, value=val))
-    db.commit()
-
-    # Create synthetic questionnaires and responses
-    questionnaires: List[Questionnaire] = []
-    for i in range(20):
-        q = Questionnaire(user_id=f"synthetic-{i}")
-        db.add(q)
-        questionnaires.append(q)
-    db.commit()
-    for q in questionnaires:
-        db.refresh(q)
-
-    # Synthetic user profiles biased to some styles
-    profiles = [
-        {"High Press": 1, "Possession Play": 1, "Short Passing": 1, "Build From Back": 1},
-        {"Counter-Attack": 1, "Direct Play": 1, "Pace & Power": 1, "Long Passing": 1},
-        {"Compact Defense": 1, "Low Block": 1, "Set Piece Threat": 1},
-        {"Youth Academy": 1, "Academy Integration": 1, "Budget Conscious": 1},
-        {"Star Signings": 1, "Global Fanbase": 1, "Iconic Players": 1}
-    ]
-
-    for idx, q in enumerate(questionnaires):
-        base = profiles[idx % len(profiles)]
-        # Fill 12 selected preferences; default 0
-        chosen = set(base.keys())
-        # Add a few random other preferences
-        more = random.sample(attr_names, 8)
-        chosen.update(more)
-        for name in attr_names:
-            val = 1 if name in chosen and (name in base or random.random() < 0.3) else 0
-            db.add(QuestionnaireResponse(questionnaire_id=q.id, attribute_id=attr_id[name], value=val))
-        db.commit()
+    Without a body this is the 62 named football attributes, 15 famous teams and 20
+    questionnaires with feedback; a body sets the seed and per-sport sizes (see seed_data.py).
+    """
+    payload = payload or SeedRequest()
+    db.close()
+    recreate_schema()
+    try:
+        counts = seed_database(engine, payload.sports, payload.seed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "ok", **counts}
+
+
+# ------------------------------ Export ---------------------------------------
+# Rows fetched per round trip and written per body chunk by /export and export.py
+EXPORT_CHUNK_ROWS = 5_000
+EXPORT_TABLES = ("feedback", "responses", "team_attributes", "training")
+
+
+def check_export(table: str, since: Optional[dt.datetime], sport: Optional[str]) -> None:
+    """Reject filter combinations a table cannot honour (ValueError), before any byte is streamed."""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table {table!r}; expected one of {', '.join(EXPORT_TABLES)}")
+    if since is not None and table == "team_attributes":
+        raise ValueError("team_attributes have no timestamp; use since_id")
+    if sport and table == "responses":
+        raise ValueError("responses are not tied to a sport")
+
+
+def _export_rows(db: Session, table: str, since_id: int, since: Optional[dt.datetime],
+                 sport: Optional[str], fmt: str) -> tuple[List[str], Iterator[tuple]]:
+    """Header and row iterator for one export; rows stream from the database with `yield_per`.
+
+    Tables come out in id order, so the last id seen is the `since_id` of the next pull. For
+    `responses`, `since` filters on the questionnaire's creation time. `training` is the matrix
+    `/train` fits on, in questionnaire order: CSV gets one 0/1 column per attribute, NDJSON the
+    list of attribute ids that are 1.
+    """
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(dt.timezone.utc).replace(tzinfo=None)  # stored as naive UTC
+    if table == "training":
+        attribute_ids = [a.id for a in db.query(Attribute.id).order_by(Attribute.id.asc())]
+        team_ids = _sport_team_ids(db, sport)
+        T = _team_matrix(db, attribute_ids, team_ids, sport)
+        ids = np.asarray(attribute_ids, dtype=np.int64)
+        header = ["feedback_id", "questionnaire_id", "team_id", "supported"]
+        header += [f"attr_{aid}" for aid in attribute_ids] if fmt == "csv" else ["attributes"]
+
+        def _training() -> Iterator[tuple]:
+            for qid, u, feedback in _training_groups(db, attribute_ids, team_ids, since_id, since, sport):
+                kept = [(fid, ti, label) for fid, ti, label in feedback if ti is not None]
+                if not kept:
+                    continue
+                features = T[[ti for _, ti, _ in kept]] & u
+                for (fid, ti, label), x in zip(kept, features):
+                    head = (fid, qid, team_ids[ti], label)
+                    yield (*head, *x.tolist()) if fmt == "csv" else (*head, ids[x != 0].tolist())
+
+        return header, _training()
+
+    if table == "feedback":
+        columns = [Feedback.id, Feedback.questionnaire_id, Feedback.team_id, Feedback.supported, Feedback.created_at]
+        query = db.query(*columns).filter(Feedback.id > since_id)
+        if since is not None:
+            query = query.filter(Feedback.created_at >= since)
+        if sport:
+            query = query.join(Team, Team.id == Feedback.team_id).filter(Team.sport == sport_key(sport))
+    elif table == "responses":
+        columns = [QuestionnaireResponse.id, QuestionnaireResponse.questionnaire_id, QuestionnaireResponse.attribute_id, QuestionnaireResponse.value]
+        query = db.query(*columns).filter(QuestionnaireResponse.id > since_id)
+        if since is not None:
+            query = query.join(Questionnaire, Questionnaire.id == QuestionnaireResponse.questionnaire_id).filter(Questionnaire.created_at >= since)
+    else:
+        columns = [TeamAttribute.id, TeamAttribute.team_id, TeamAttribute.attribute_id, TeamAttribute.value]
+        query = db.query(*columns).filter(TeamAttribute.id > since_id)
+        if sport:
+            query = query.join(Team, Team.id == TeamAttribute.team_id).filter(Team.sport == sport_key(sport))
+    rows = query.order_by(columns[0].asc()).yield_per(EXPORT_CHUNK_ROWS)
+    if table == "feedback":
+        rows = ((*r[:-1], r[-1].isoformat()) for r in rows)
+    return [c.key for c in columns], rows
+
+
+def export_stream(table: str, fmt: str = "ndjson", since_id: int = 0, since: Optional[dt.datetime] = None,
+                  sport: Optional[str] = None, compress: bool = False) -> Iterator[bytes]:
+    """Body of an export as byte chunks of `EXPORT_CHUNK_ROWS` rows, gzip-compressed on the fly if asked.
+
+    Uses its own session, since a streamed response outlives the request's. Call `check_export`
+    first; memory stays flat however many rows there are.
+    """
+    db = SessionLocal()
+    try:
+        header, rows = _export_rows(db, table, since_id, since, sport, fmt)
+        gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits 31: gzip container
+        buf = io.StringIO()
+        csv_writer = csv.writer(buf, lineterminator="\n") if fmt == "csv" else None
+
+        def _take() -> Iterator[bytes]:
+            data = buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+            chunk = gz.compress(data) if gz is not None else data
+            if chunk:
+                yield chunk
+
+        if csv_writer is not None:
+            csv_writer.writerow(header)
+        for n, row in enumerate(rows, 1):
+            if csv_writer is not None:
+                csv_writer.writerow(row)
+            else:
+                buf.write(json.dumps(dict(zip(header, row))) + "\n")
+            if n % EXPORT_CHUNK_ROWS == 0:
+                yield from _take()
+        yield from _take()
+        if gz is not None:
+            yield gz.flush()
+    finally:
+        db.close()
 
-    # Generate feedback labels comparing preference-team overlap to threshold to ensure both classes
-    for q in questionnaires:
-        q_prefs = {r.attribute_id: r.value for r in db.query(QuestionnaireResponse).filter(QuestionnaireResponse.questionnaire_id == q.id)}
-        for t in teams:
-            t_attrs = {ta.attribute_id: ta.value for ta in db.query(TeamAttribute).filter(TeamAttribute.team_id == t.id)}
-            overlap = sum(1 for aid, v in q_prefs.items() if v == 1 and t_attrs.get(aid, 0) == 1)
-            desired = sum(1 for v in q_prefs.values() if v == 1)
-            rate = (overlap / desired) if desired else 0.0
-            # stochastic threshold around 0.4 to 0.6
-            thr = 0.4 + (hash((q.id, t.id)) % 20) / 100.0
-            label = 1 if rate >= thr else 0
-            db.add(Feedback(questionnaire_id=q.id, team_id=t.id, supported=label))
-    db.commit()
 
-    return {"status": "ok", "attributes": len(attrs), "teams": len(teams), "questionnaires": len(questionnaires)}
+@app.get("/export/{table}")
+@query_budget(5)
+def export_table(
+    table: str,
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    since_id: int = Query(default=0, ge=0, description="Only rows with a larger id (feedback id for training)"),
+    since: Optional[dt.datetime] = Query(default=None, description="Only rows created at or after this time (UTC unless an offset is given)"),
+    sport: Optional[str] = Query(default=None, description="Only this sport's teams (feedback, team_attributes, training)"),
+    gzip: bool = Query(default=False, description="gzip the body on the fly, served as a .gz download"),
+    _: bool = Depends(require_admin),
+):
+    """Stream feedback, responses, team attributes or the training matrix as NDJSON or CSV (see `export_stream`)."""
+    try:
+        check_export(table, since, sport)
+    except ValueError as e:
+        raise HTTPException(status_code=404 if table not in EXPORT_TABLES else 400, detail=str(e))
+    filename = f"{table}.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else ("text/csv" if format == "csv" else "application/x-ndjson")
+    return StreamingResponse(
+        export_stream(table, format, since_id, since, sport, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
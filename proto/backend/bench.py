@@ -0,0 +1,420 @@
+"""Benchmark and load test for the API on generated data.
+
+Generates a deterministic synthetic dataset at a chosen scale (questionnaires with answers and
+feedback, teams with attributes) into a work directory. It then runs each scenario in-process
+(httpx ASGI transport, no sockets) and/or against a local `uvicorn` server. Per-scenario latency
+percentiles and throughput are printed and can be saved as a JSON baseline. Later runs compared
+against that baseline exit 1 when a metric regresses past the threshold.
+
+Usage (from this directory; needs `httpx`, see requirements-dev.txt):
+
+  python bench.py                                     # small scale, both modes
+  python bench.py --scale large --mode server         # 100k questionnaires, 10k teams, 500 attributes
+  python bench.py --save-baseline bench_baseline.json
+  python bench.py --baseline bench_baseline.json --threshold 0.25
+  python bench.py --only predict,predict_sync,predict_busy_pool,predict_sync_busy_pool   # async vs sync handlers
+
+The database and trained models live in the work directory (a temp dir unless --workdir is
+given), never in backend/. Compare baselines taken at the same scale on the same machine.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SCALES = {
+    "small": dict(questionnaires=2_000, teams=200, attributes=60, answers=20, feedback=3, density=0.3),
+    "medium": dict(questionnaires=20_000, teams=2_000, attributes=200, answers=20, feedback=3, density=0.3),
+    "large": dict(questionnaires=100_000, teams=10_000, attributes=500, answers=20, feedback=3, density=0.3),
+}
+BULK_ROWS = 20_000  # rows per bulk ingestion request
+
+# Metric -> whether a bigger value is better; used for the baseline comparison
+METRICS = {"p50_ms": False, "p95_ms": False, "rps": True, "rows_per_s": True}
+
+
+# ------------------------------ Dataset --------------------------------------
+def generate(path: str, cfg: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    """Write a synthetic dataset to a new SQLite database at `path`.
+
+    Uses the seeding engine behind POST /admin/reseed-large (app.seed_database): every
+    questionnaire answers `answers` attributes and gives `feedback` team verdicts, labelled by
+    how much of the user's yes set the team has, so a trained model has signal to find.
+    """
+    from sqlalchemy import create_engine
+
+    import app
+
+    engine = create_engine(f"sqlite:///{path}")
+    app.Base.metadata.create_all(engine)
+    app.migrate_schema(engine)
+    spec = app.SeedSport(**{key: cfg[key] for key in ("questionnaires", "teams", "attributes", "answers", "feedback", "density")})
+    counts = app.seed_database(engine, [spec], seed)
+    engine.dispose()
+    return {key: counts[key] for key in ("seconds", "team_attributes", "responses", "feedback")}
+
+
+# ------------------------------ Scenarios ------------------------------------
+class Scenario(NamedTuple):
+    name: str
+    requests: int
+    concurrency: int
+    request: Callable[[int], Tuple[str, str, Dict[str, Any]]]  # i -> (method, url, httpx kwargs)
+    rows: int = 0  # rows carried per request, for ingestion throughput
+    # Requests kept in flight while the scenario runs, `background_concurrency` at a time; not measured
+    background: Optional[Callable[[int], Tuple[str, str, Dict[str, Any]]]] = None
+    background_concurrency: int = 0
+
+
+def scenarios(cfg: Dict[str, Any], requests: int, concurrency: int, seed: int = 0) -> List[Scenario]:
+    """Reads first, then writes, so read numbers are taken on the generated data as-is."""
+    rng = random.Random(seed)
+    n_q, n_t, n_a = cfg["questionnaires"], cfg["teams"], cfg["attributes"]
+    qids = [rng.randint(1, n_q) for _ in range(requests)]
+    batch = 256
+
+    def answers(i: int) -> List[Dict[str, int]]:
+        r = random.Random(i)
+        return [{"attribute_id": a, "value": r.randint(0, 1)} for a in r.sample(range(1, n_a + 1), min(cfg["answers"], n_a))]
+
+    def ndjson(rows: List[Dict[str, int]]) -> bytes:
+        return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+    bulk_responses = ndjson([{"questionnaire_id": rng.randint(1, n_q), "attribute_id": rng.randint(1, n_a), "value": rng.randint(0, 1)}
+                             for _ in range(BULK_ROWS)])
+    bulk_feedback = ndjson([{"questionnaire_id": rng.randint(1, n_q), "team_id": rng.randint(1, n_t), "supported": rng.randint(0, 1)}
+                            for _ in range(BULK_ROWS)])
+    few = max(1, requests // 100)
+    # More blocking requests than the threadpool has threads (40), as when slow sync work piles up
+    busy = lambda i: ("GET", f"{BLOCK_PATH}?ms={BLOCK_MS}", {})  # noqa: E731
+    return [
+        Scenario("train_full", 2, 1, lambda i: ("POST", "/train", {})),
+        Scenario("predict", requests, concurrency, lambda i: ("POST", "/predict", {"json": {"questionnaire_id": qids[i]}})),
+        Scenario("predict_top10_blend", requests, concurrency,
+                 lambda i: ("POST", "/predict", {"json": {"questionnaire_id": qids[i], "top_k": 10, "blend": 0.5}})),
+        Scenario("predict_repeat", requests, concurrency, lambda i: ("POST", "/predict", {"json": {"questionnaire_id": qids[0]}})),
+        # The same scoring in a sync handler, as /predict was before it moved to async def
+        Scenario("predict_sync", requests, concurrency, lambda i: ("POST", SYNC_PREDICT_PATH, {"json": {"questionnaire_id": qids[i]}})),
+        Scenario("predict_busy_pool", max(1, requests // 5), concurrency,
+                 lambda i: ("POST", "/predict", {"json": {"questionnaire_id": qids[i]}}), background=busy, background_concurrency=48),
+        Scenario("predict_sync_busy_pool", max(1, requests // 5), concurrency,
+                 lambda i: ("POST", SYNC_PREDICT_PATH, {"json": {"questionnaire_id": qids[i]}}), background=busy, background_concurrency=48),
+        Scenario("predict_batch_256", few, 1,
+                 lambda i: ("POST", "/predict/batch", {"json": {"questionnaire_ids": [qids[(i * batch + j) % requests] for j in range(batch)], "top_k": 10}}),
+                 rows=batch),
+        Scenario("analytics", requests, concurrency, lambda i: ("GET", "/analytics", {})),
+        # A distinct query string misses the in-memory body cache, so these measure the real read
+        Scenario("analytics_uncached", requests, concurrency, lambda i: ("GET", f"/analytics?bench={i}", {})),
+        Scenario("teams_page_100", requests, concurrency,
+                 lambda i: ("GET", f"/teams?limit=100&after={qids[i] % n_t}&bench={i}", {})),
+        Scenario("teams_full", max(1, few // 2), 1, lambda i: ("GET", f"/teams?bench={i}", {}), rows=n_t),
+        Scenario("responses", requests, concurrency,
+                 lambda i: ("POST", f"/questionnaires/{qids[i]}/responses", {"json": {"responses": answers(i)}})),
+        Scenario("feedback", requests, concurrency,
+                 lambda i: ("POST", "/feedback", {"json": {"questionnaire_id": qids[i], "team_id": i % n_t + 1, "supported": i % 2}})),
+        Scenario("bulk_responses", 3, 1, lambda i: ("POST", "/bulk/responses?format=ndjson", {"content": bulk_responses}), rows=BULK_ROWS),
+        Scenario("bulk_feedback", 3, 1, lambda i: ("POST", "/bulk/feedback?format=ndjson", {"content": bulk_feedback}), rows=BULK_ROWS),
+        Scenario("train_incremental", 3, 1, lambda i: ("POST", "/train?mode=incremental", {})),
+    ]
+
+
+async def run_scenario(client: Any, sc: Scenario) -> Dict[str, Any]:
+    import httpx
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    sem = asyncio.Semaphore(sc.concurrency)
+
+    async def one(i: int) -> None:
+        method, url, kwargs = sc.request(i)
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                errors.append(type(e).__name__)
+                return
+            if r.status_code >= 400:
+                errors.append(f"{r.status_code}: {r.text[:200]}")
+                return
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    stop = asyncio.Event()
+
+    async def load() -> None:
+        i = 0
+        while not stop.is_set():
+            method, url, kwargs = sc.background(i)
+            i += 1
+            try:
+                await client.request(method, url, **kwargs)
+            except httpx.HTTPError:
+                pass
+
+    loaders = [asyncio.create_task(load()) for _ in range(sc.background_concurrency if sc.background else 0)]
+    if loaders:
+        await asyncio.sleep(0.5)  # let the background requests take the threadpool first
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(sc.requests)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await asyncio.gather(*loaders)
+
+    out: Dict[str, Any] = {"requests": sc.requests, "errors": len(errors)}
+    if errors:
+        out["first_error"] = errors[0]
+    if latencies:
+        pct = np.percentile(latencies, [50, 95, 99])
+        out.update(p50_ms=float(pct[0]), p95_ms=float(pct[1]), p99_ms=float(pct[2]),
+                   mean_ms=statistics.fmean(latencies), rps=len(latencies) / elapsed)
+        if sc.rows:
+            out["rows_per_s"] = len(latencies) * sc.rows / elapsed
+    return out
+
+
+async def run_all(client: Any, items: List[Scenario], log: Callable[[str], None]) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for sc in items:
+        results[sc.name] = await run_scenario(client, sc)
+        log(_row(sc.name, results[sc.name]))
+    return results
+
+
+# ------------------------------ Sync twin ------------------------------------
+SYNC_PREDICT_PATH = "/bench/predict-sync"
+BLOCK_PATH = "/bench/block"
+BLOCK_MS = 1000
+
+
+def bench_app() -> Any:
+    """`app.app` plus two bench-only routes, for the sync vs async handler comparison.
+
+    `SYNC_PREDICT_PATH` scores like `/predict` from a plain `def` handler on the sync session,
+    so it needs a threadpool thread per request, as `/predict` did before it became async.
+    `BLOCK_PATH` holds a threadpool thread for `ms` milliseconds, standing in for slow sync work
+    such as training or exports. Served with `uvicorn --factory bench:bench_app`.
+    """
+    from fastapi import Body, HTTPException, Query
+
+    import app
+
+    # Annotations here are strings resolved against this module, which does not import app at the top
+    def predict_sync(body: Dict[str, Any] = Body(...), sport: Optional[str] = Query(default=None)):
+        payload = app.PredictionIn(**body)
+        db = app.SessionLocal()
+        try:
+            user_prefs = dict(
+                db.query(app.QuestionnaireResponse.attribute_id, app.QuestionnaireResponse.value)
+                .filter(app.QuestionnaireResponse.questionnaire_id == payload.questionnaire_id)
+            )
+            if not user_prefs and db.get(app.Questionnaire, payload.questionnaire_id) is None:
+                raise HTTPException(status_code=404, detail="Questionnaire not found")
+            catalog = app.load_catalog(db, sport)
+            entry = app.model_registry.get(sport)
+            app.weight_profiles.refresh(db)
+            weights = app.weight_profiles.vector(catalog, payload.weights_profile, entry)
+        finally:
+            db.close()
+        model, model_attr_ids = (entry.model, entry.attribute_ids) if entry is not None else (None, None)
+        probs = app.score_teams(catalog, user_prefs, weights, model, model_attr_ids, payload.blend)
+        scores = [
+            app.TeamScore(team_id=catalog.team_ids[i], team_name=catalog.team_names[i], score=float(probs[i]))
+            for i in app.rank(probs, payload.top_k)
+        ]
+        return app.PredictionOut(questionnaire_id=payload.questionnaire_id, scores=scores, model_used=app.model_name(model))
+
+    def block(ms: int = Query(default=BLOCK_MS, ge=0, le=60_000)) -> Dict[str, int]:
+        time.sleep(ms / 1000.0)
+        return {"slept_ms": ms}
+
+    if not any(getattr(route, "path", None) == SYNC_PREDICT_PATH for route in app.app.routes):
+        app.app.add_api_route(SYNC_PREDICT_PATH, predict_sync, methods=["POST"], response_model=app.PredictionOut)
+        app.app.add_api_route(BLOCK_PATH, block, methods=["GET"])
+    return app.app
+
+
+# ------------------------------ Modes ----------------------------------------
+async def run_inprocess(items: List[Scenario], log: Callable[[str], None]) -> Dict[str, Dict[str, Any]]:
+    import httpx
+
+    application = bench_app()
+    async with application.router.lifespan_context(application):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+            return await run_all(client, items, log)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_server(items: List[Scenario], env: Dict[str, str], concurrency: int,
+                     log: Callable[[str], None]) -> Dict[str, Dict[str, Any]]:
+    import httpx
+
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "bench:bench_app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, **env},
+    )
+    try:
+        # Enough connections for each scenario's requests and its background load at once
+        connections = max([concurrency] + [sc.concurrency + sc.background_concurrency for sc in items])
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=600, limits=limits) as client:
+            deadline = time.perf_counter() + 120
+            while True:
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    if proc.poll() is not None or time.perf_counter() > deadline:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.05)
+            return await run_all(client, items, log)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+# ------------------------------ Reporting ------------------------------------
+def _row(name: str, m: Dict[str, Any]) -> str:
+    def f(key: str, fmt: str = "{:9.2f}") -> str:
+        return fmt.format(m[key]) if key in m else " " * 9
+    return f"  {name:<22} {m['requests']:>6} {m['errors']:>4} {f('p50_ms')} {f('p95_ms')} {f('p99_ms')} {f('rps', '{:9.1f}')} {f('rows_per_s', '{:9.0f}')}"
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float) -> List[str]:
+    """Regressions of `results` against `baseline` beyond `threshold` (a fraction, e.g. 0.2 = 20%)."""
+    failures = []
+    for mode, scenarios_ in results.items():
+        for name, m in scenarios_.items():
+            b = baseline.get("results", {}).get(mode, {}).get(name)
+            if b is None:
+                continue
+            if m["errors"] > b.get("errors", 0):
+                failures.append(f"{mode}/{name}: errors {b.get('errors', 0)} -> {m['errors']}")
+            for key, higher_is_better in METRICS.items():
+                if key not in m or not b.get(key):
+                    continue
+                new, old = m[key], b[key]
+                if higher_is_better:
+                    regressed = new < old / (1.0 + threshold)
+                else:
+                    # Sub-millisecond jitter is not a regression
+                    regressed = new > old * (1.0 + threshold) and new - old > min_delta_ms
+                if regressed:
+                    failures.append(f"{mode}/{name}: {key} {old:.2f} -> {new:.2f}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for key in ("questionnaires", "teams", "attributes", "answers", "feedback"):
+        parser.add_argument(f"--{key}", type=int, default=None, help=f"Override the scale's {key}")
+    parser.add_argument("--density", type=float, default=None, help="Share of attributes each team has")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per latency scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", choices=("inprocess", "server", "both"), default="both")
+    parser.add_argument("--only", default=None, help="Comma-separated scenario names to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="Keep the generated database and models here")
+    parser.add_argument("--out", default=None, help="Write the results JSON here")
+    parser.add_argument("--save-baseline", default=None, help="Write the results JSON here as the new baseline")
+    parser.add_argument("--baseline", default=None, help="Compare against this baseline and exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed regression as a fraction (default 0.2)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore latency increases smaller than this")
+    args = parser.parse_args()
+
+    cfg = dict(SCALES[args.scale])
+    for key in ("questionnaires", "teams", "attributes", "answers", "feedback", "density"):
+        if getattr(args, key) is not None:
+            cfg[key] = getattr(args, key)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-")
+    os.makedirs(workdir, exist_ok=True)
+    modes = ["inprocess", "server"] if args.mode == "both" else [args.mode]
+    paths = {mode: (os.path.join(workdir, f"{mode}.db"), os.path.join(workdir, f"model_{mode}")) for mode in modes}
+    # app reads these on import; the in-process run and the generator share this process
+    os.environ["DB_PATH"], os.environ["MODEL_DIR"] = paths.get("inprocess", paths[modes[0]])
+    os.environ.setdefault("WARMUP", "1")
+    sys.path.insert(0, BACKEND_DIR)
+
+    seed_db = os.path.join(workdir, "seed.db")
+    if os.path.exists(seed_db):
+        os.remove(seed_db)
+    print(f"generating {cfg} into {workdir}", flush=True)
+    dataset = generate(seed_db, cfg, args.seed)
+    print(f"  {dataset}", flush=True)
+
+    items = scenarios(cfg, args.requests, args.concurrency, args.seed)
+    if args.only:
+        wanted = set(args.only.split(","))
+        items = [sc for sc in items if sc.name in wanted]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for mode in modes:
+        db_path, model_dir = paths[mode]
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        shutil.copyfile(seed_db, db_path)
+        shutil.rmtree(model_dir, ignore_errors=True)
+        print(f"\n[{mode}]  {'scenario':<22} {'n':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'rows/s':>9}", flush=True)
+        log = lambda line: print(line, flush=True)  # noqa: E731
+        if mode == "inprocess":
+            results[mode] = asyncio.run(run_inprocess(items, log))
+        else:
+            env = {"DB_PATH": db_path, "MODEL_DIR": model_dir}
+            results[mode] = asyncio.run(run_server(items, env, args.concurrency, log))
+
+    report = {
+        "created_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {**cfg, "requests": args.requests, "concurrency": args.concurrency, "seed": args.seed},
+        "dataset": dataset,
+        "results": results,
+    }
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print(f"\nwarning: baseline config {baseline.get('config')} differs from this run", flush=True)
+        failures = compare(results, baseline, args.threshold, args.min_delta_ms)
+        print(f"\n{len(failures)} regression(s) beyond {args.threshold:.0%} vs {args.baseline}")
+        for line in failures:
+            print(f"  {line}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Cross-validate candidate models per sport, in parallel, the same engine as POST /train/evaluate.
+
+Each --candidate takes `family[:key=value,...]` with family logistic, sgd or hist_gb and estimator
+keyword arguments (values are parsed as JSON, else kept as strings). Without --candidate the
+default grid is used (EVAL_GRID in app.py). Every (sport, candidate, fold) fit is a separate task
+spread over --jobs worker processes.
+
+Usage (from this directory):
+
+  python evaluate.py                                      # default grid, all teams and every sport
+  python evaluate.py --sport football --folds 10 --jobs 4
+  python evaluate.py --candidate logistic:C=0.1 --candidate logistic:C=1 \\
+                     --candidate hist_gb:max_iter=200,learning_rate=0.05 --promote
+
+Prints a table per sport (best candidate first), or the full result as JSON with --json.
+--promote refits each sport's best candidate on all of its rows and saves it as that sport's
+model; a running server picks it up on its next prediction.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict
+
+
+def parse_candidate(text: str) -> Dict[str, Any]:
+    family, _, options = text.partition(":")
+    params: Dict[str, Any] = {}
+    for item in filter(None, options.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"bad option {item!r} in {text!r}")
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return {"family": family, "params": params}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sport", dest="sports", action="append", default=None,
+                        help="Sport to evaluate ('default' for all teams); repeat for several. Default: all teams and every sport")
+    parser.add_argument("--candidate", dest="candidates", action="append", type=parse_candidate, default=None,
+                        help="family[:key=value,...]; repeat for several")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="Worker processes (default: one per core)")
+    parser.add_argument("--promote", action="store_true", help="Save each sport's best candidate as its model")
+    parser.add_argument("--db", default=None, help="SQLite file to read (default: DB_PATH or backend/database.db)")
+    parser.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ["DB_PATH"] = os.path.abspath(args.db)
+    import app
+    from fastapi import HTTPException
+    from pydantic import ValidationError
+
+    options: Dict[str, Any] = {"folds": args.folds, "n_jobs": args.jobs, "promote": args.promote}
+    if args.sports:
+        options["sports"] = [None if s == "default" else s for s in args.sports]
+    if args.candidates:
+        options["candidates"] = args.candidates
+    try:
+        request = app.EvaluationIn(**options)
+    except ValidationError as e:
+        parser.error(str(e))
+    app.init_db()
+    db = app.SessionLocal()
+    try:
+        result = app.evaluate_models(db, request)
+    except HTTPException as e:
+        parser.error(e.detail)
+    finally:
+        db.close()
+
+    if args.json:
+        print(result.model_dump_json(indent=2))
+        return 0
+    print(f"{result.folds}-fold cross-validation on {result.n_jobs} worker(s) in {result.seconds:.1f} s")
+    for sport in result.sports:
+        print(f"\n[{sport.sport or 'all teams'}]  rows={sport.rows}  positives={sport.positives}  teams={sport.teams}"
+              + ("  promoted" if sport.promoted else ""))
+        if sport.error:
+            print(f"  skipped: {sport.error}")
+            continue
+        print(f"  {'candidate':<40} {'auc':>13} {'log loss':>13} {'fit s':>8} {'predict ms':>11}")
+        for r in sport.results:
+            name = r.family + (" " + ",".join(f"{k}={v}" for k, v in r.params.items()) if r.params else "")
+            print(f"  {name:<40} {r.auc:.4f}±{r.auc_std:.3f} {r.log_loss:.4f}±{r.log_loss_std:.3f} "
+                  f"{r.fit_seconds:>8.3f} {r.predict_ms:>11.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Stream a table or the training matrix out of the database, the same engine as GET /export/{table}.
+
+TABLE is feedback, responses, team_attributes or training (the feature matrix /train fits on,
+one row per usable feedback). Rows come out in id order, so an incremental pull passes the last
+id it saw as --since-id (for training, which is in questionnaire order, the highest feedback_id).
+--since takes an ISO timestamp (UTC unless it carries an offset). Memory stays flat however
+large the export is.
+
+Usage (from this directory):
+
+  python export.py feedback --format csv > feedback.csv
+  python export.py training --sport football --out football.csv.gz     # format and gzip from the name
+  python export.py responses --since 2026-10-01T00:00:00 --since-id 120000 --gzip > responses.ndjson.gz
+
+Writes to stdout unless --out is given; --out ending in .gz implies --gzip.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import sys
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("table", choices=("feedback", "responses", "team_attributes", "training"))
+    parser.add_argument("--format", choices=("ndjson", "csv"), default=None,
+                        help="Default: csv if --out names a .csv file, else ndjson")
+    parser.add_argument("--since-id", type=int, default=0, help="Only rows with a larger id (feedback id for training)")
+    parser.add_argument("--since", type=dt.datetime.fromisoformat, default=None,
+                        help="Only rows created at or after this ISO timestamp")
+    parser.add_argument("--sport", default=None, help="Only this sport's teams (feedback, team_attributes, training)")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument("--out", default=None, help="File to write (default: stdout)")
+    parser.add_argument("--db", default=None, help="SQLite file to read (default: DB_PATH or backend/database.db)")
+    args = parser.parse_args()
+
+    stem = args.out[:-3] if args.out and args.out.endswith(".gz") else args.out
+    fmt = args.format or ("csv" if stem and stem.endswith(".csv") else "ndjson")
+    compress = args.gzip or bool(args.out and args.out.endswith(".gz"))
+
+    if args.db:
+        os.environ["DB_PATH"] = os.path.abspath(args.db)
+    os.environ.setdefault("WARMUP", "0")
+    import app
+
+    try:
+        app.check_export(args.table, args.since, args.sport)
+    except ValueError as e:
+        parser.error(str(e))
+    app.init_db()
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        for chunk in app.export_stream(args.table, fmt, args.since_id, args.since, args.sport, compress):
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
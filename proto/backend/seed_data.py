@@ -0,0 +1,71 @@
+"""Seed the database with synthetic data, the same engine as POST /admin/reseed-large.
+
+Each --sport takes `name[:key=value,...]` with keys attributes, teams, questionnaires, answers,
+feedback and density (see SeedSport in app.py); `default` is the named football dataset. The
+schema is reset first unless --append is given, in which case rows are added after the
+existing ones.
+
+Usage (from this directory):
+
+  python seed_data.py                                # the default dataset, like the admin endpoint
+  python seed_data.py --sport football:teams=2000,attributes=200,questionnaires=1000000,answers=20,feedback=3 \\
+                      --sport cricket:teams=300,questionnaires=200000,answers=15,feedback=2
+  python seed_data.py --db /tmp/big.db --seed 7 --append --sport rugby:questionnaires=50000
+
+Prints the row counts as JSON. Seeding moves every data version, so a running server drops its
+cached catalogs, profiles and response bodies on its next request; saved models are kept until
+the next /train.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict
+
+INT_KEYS = ("attributes", "teams", "questionnaires", "answers", "feedback")
+
+
+def parse_sport(text: str) -> Dict[str, Any]:
+    name, _, options = text.partition(":")
+    spec: Dict[str, Any] = {"sport": None if name in ("", "default") else name}
+    for item in filter(None, options.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep or key not in INT_KEYS + ("density",):
+            raise argparse.ArgumentTypeError(f"bad option {item!r} in {text!r}")
+        spec[key] = float(value) if key == "density" else int(value)
+    return spec
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sport", dest="sports", action="append", type=parse_sport, default=None,
+                        help="name[:key=value,...]; repeat for several sports")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None, help="SQLite file to seed (default: DB_PATH or backend/database.db)")
+    parser.add_argument("--append", action="store_true", help="Keep existing rows instead of resetting the schema")
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ["DB_PATH"] = os.path.abspath(args.db)
+    os.environ.setdefault("WARMUP", "0")
+    import app
+
+    try:
+        request = app.SeedRequest(seed=args.seed, **({"sports": args.sports} if args.sports else {}))
+    except ValueError as e:  # pydantic's ValidationError, e.g. a size over its limit
+        parser.error(str(e))
+    app.init_db()
+    if not args.append:
+        app.recreate_schema()
+    try:
+        counts = app.seed_database(app.engine, request.sports, request.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(counts, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Cold-start report for app.py: import time and time to first request.
+
+Each run starts a fresh interpreter, so nothing is cached in-process between runs:
+
+  * import:  `python -X importtime -c "import app"`; total time, slowest modules, and whether
+             scikit-learn / joblib were pulled in (serving should not need them)
+  * serve:   `uvicorn app:app` on a free port, timing spawn -> first `GET /` answered (startup
+             migrations and warmup included) and the first `GET /attributes` and `GET /analytics`;
+             repeated with WARMUP=0 to show what warmup costs at startup and saves afterwards
+
+Every run gets its own DB_PATH and MODEL_DIR in a temp work directory (kept with --workdir), filled
+with a copy of --db and --model-dir, so startup migrations and warmup never touch backend/'s files.
+
+Usage (from this directory):
+
+  python startup_report.py [--runs 3] [--max-import-ms N] [--max-first-request-ms N] [--json out.json]
+  python startup_report.py --db /tmp/big.db --model-dir ''      # a seeded database, no models
+
+Prints a JSON report and exits 1 if a median exceeds a given limit, so it can gate a CI job.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("sklearn", "joblib", "scipy")
+
+
+def _run_env(workdir: str, db: str, model_dir: str) -> dict:
+    """DB_PATH and MODEL_DIR in a new directory under `workdir`, holding copies of `db` and `model_dir`."""
+    run_dir = tempfile.mkdtemp(prefix="run-", dir=workdir)
+    env = {"DB_PATH": os.path.join(run_dir, "database.db"), "MODEL_DIR": os.path.join(run_dir, "model")}
+    if db:
+        # The backup API gives a consistent copy, WAL included, without writing to the source
+        source = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+        target = sqlite3.connect(env["DB_PATH"])
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    if model_dir:
+        shutil.copytree(model_dir, env["MODEL_DIR"])
+    return env
+
+
+def measure_import(env: dict) -> dict:
+    code = "import sys, app; print(','.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True, env={**os.environ, **env},
+    )
+    modules = []  # (cumulative us, name, depth) in output order; a module's children come before it
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        modules.append((int(cumulative), name.strip(), len(name) - len(name.lstrip())))
+    app_index = next(i for i, m in enumerate(modules) if m[1] == "app" and m[2] == 1)
+    total_us = modules[app_index][0]
+    # Direct imports of app.py are the nearest entries one level deeper, back to the previous top-level module
+    children = []
+    for us, name, depth in reversed(modules[:app_index]):
+        if depth == 1:
+            break
+        if depth == 3:
+            children.append((us, name))
+    top_level = sorted(children, reverse=True)[:10]
+    return {
+        "import_ms": total_us / 1000.0,
+        "heavy_modules_loaded": [m for m in proc.stdout.strip().split(",") if m],
+        "slowest_imports_ms": {name: us / 1000.0 for us, name in top_level},
+    }
+
+
+def _existing(path: str) -> str:
+    return path if os.path.exists(path) else ""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str) -> float:
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=30) as r:
+        r.read()
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def measure_serve(env: dict, warmup: bool = True, timeout: float = 60.0) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env={**os.environ, **env, "WARMUP": "1" if warmup else "0"},
+    )
+    try:
+        while True:
+            try:
+                _get(base + "/")
+                break
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError("uvicorn exited before serving")
+                if time.perf_counter() - t0 > timeout:
+                    raise RuntimeError("server did not answer within %.0fs" % timeout)
+                time.sleep(0.005)
+        first_request_ms = (time.perf_counter() - t0) * 1000.0
+        return {
+            "first_request_ms": first_request_ms,
+            "first_attributes_ms": _get(base + "/attributes"),
+            "first_analytics_ms": _get(base + "/analytics"),
+        }
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-first-request-ms", type=float, default=None)
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the report to this file")
+    parser.add_argument("--db", default=_existing(os.path.join(BACKEND_DIR, "database.db")),
+                        help="Database each run starts from a copy of ('' for an empty one; default: backend's)")
+    parser.add_argument("--model-dir", default=_existing(os.path.join(BACKEND_DIR, "model")),
+                        help="Model directory each run starts from a copy of ('' for none; default: backend's)")
+    parser.add_argument("--workdir", default=None, help="Keep the per-run databases and models here")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="startup-")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        imports = [measure_import(_run_env(workdir, "", "")) for _ in range(args.runs)]
+        serves = [measure_serve(_run_env(workdir, args.db, args.model_dir)) for _ in range(args.runs)]
+        cold_serves = [measure_serve(_run_env(workdir, args.db, args.model_dir), warmup=False) for _ in range(args.runs)]
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    report = {
+        "runs": args.runs,
+        "import_ms": statistics.median(r["import_ms"] for r in imports),
+        **{key: statistics.median(r[key] for r in serves) for key in serves[0]},
+        **{f"{key}_no_warmup": statistics.median(r[key] for r in cold_serves) for key in cold_serves[0]},
+        "heavy_modules_loaded": imports[-1]["heavy_modules_loaded"],
+        "slowest_imports_ms": imports[-1]["slowest_imports_ms"],
+    }
+
+    failures = []
+    if args.max_import_ms is not None and report["import_ms"] > args.max_import_ms:
+        failures.append(f"import {report['import_ms']:.0f}ms > {args.max_import_ms:.0f}ms")
+    if args.max_first_request_ms is not None and report["first_request_ms"] > args.max_first_request_ms:
+        failures.append(f"first request {report['first_request_ms']:.0f}ms > {args.max_first_request_ms:.0f}ms")
+    report["failures"] = failures
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
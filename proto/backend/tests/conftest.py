@@ -0,0 +1,76 @@
+"""Shared fixtures: one app on a scratch database and model directory, with strict query budgets.
+
+The environment is set before `app` is imported, since it reads DB_PATH, MODEL_DIR and the
+other settings at import time. Run from the backend directory: `python -m pytest tests`.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+
+WORK_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ["DB_PATH"] = os.path.join(WORK_DIR, "test.db")
+os.environ["MODEL_DIR"] = os.path.join(WORK_DIR, "model")
+os.environ["WARMUP"] = "0"
+os.environ["QUERY_BUDGET"] = "strict"  # an endpoint over its budget fails the TestClient call
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as A  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+ADMIN = {"X-Admin-Token": A.ADMIN_TOKEN}
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    with TestClient(A.app) as c:
+        yield c
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def reseed(client: TestClient):
+    """Replace all data (and saved models) with a seeded dataset; no sports gives the named demo set."""
+    def _reseed(sports: Optional[List[Dict[str, Any]]] = None, seed: int = 1) -> Dict[str, Any]:
+        shutil.rmtree(A.MODEL_DIR, ignore_errors=True)
+        A.model_registry.clear()
+        r = client.post("/admin/reseed-large", headers=ADMIN, json={"seed": seed, **({"sports": sports} if sports else {})})
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    return _reseed
+
+
+@contextmanager
+def count_sql() -> Iterator[List[int]]:
+    """Count the SQL statements run on every engine inside the block; read `[0]` afterwards."""
+    n = [0]
+
+    def _count(*_: Any) -> None:
+        n[0] += 1
+
+    engines = (A.engine, A.write_engine, A.async_engine.sync_engine)
+    for e in engines:
+        event.listen(e, "before_cursor_execute", _count)
+    try:
+        yield n
+    finally:
+        for e in engines:
+            event.remove(e, "before_cursor_execute", _count)
+
+
+def snapshot_outcomes(client: TestClient) -> Dict[str, float]:
+    """`training_snapshot_total` by outcome, from /metrics."""
+    out = {}
+    for line in client.get("/metrics").text.splitlines():
+        if line.startswith("training_snapshot_total{"):
+            labels, value = line.rsplit(" ", 1)
+            out[labels.split('"')[1]] = float(value)
+    return out
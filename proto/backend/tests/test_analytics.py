@@ -0,0 +1,61 @@
+"""Incrementally maintained `analytics_counters` and stats must equal a rebuild from the base tables."""
+from __future__ import annotations
+
+import json
+
+from conftest import ADMIN
+
+
+def assert_consistent(client) -> dict:
+    before = client.get("/analytics").json()
+    r = client.post("/admin/rebuild-analytics", headers=ADMIN)
+    assert r.status_code == 200
+    assert r.json() == {"status": "ok", "consistent": True, "drift": {"attributes": [], "teams": [], "counters": []}}
+    assert client.get("/analytics").json() == before
+    return before
+
+
+def test_single_writes(client, reseed):
+    reseed([{"sport": "football", "teams": 5, "attributes": 4, "questionnaires": 10, "answers": 3, "feedback": 2}])
+    start = assert_consistent(client)
+
+    q = client.post("/questionnaires", json={"user_id": "u1"}).json()["id"]
+    answers = [{"attribute_id": 1, "value": 1}, {"attribute_id": 2, "value": 0}, {"attribute_id": 1, "value": 0}]
+    assert client.post(f"/questionnaires/{q}/responses", json={"responses": answers}).status_code == 200
+    # Re-answering replaces the stored answer rather than adding one
+    assert client.post(f"/questionnaires/{q}/responses", json={"responses": [{"attribute_id": 2, "value": 1}]}).status_code == 200
+    for team_id, supported in ((1, 1), (2, 0), (1, 0)):
+        assert client.post("/feedback", json={"questionnaire_id": q, "team_id": team_id, "supported": supported}).status_code == 200
+    assert client.post("/feedback", json={"questionnaire_id": q, "team_id": 999, "supported": 1}).status_code == 404
+
+    after = assert_consistent(client)
+    assert after["total_questionnaires"] == start["total_questionnaires"] + 1
+    assert after["total_feedback"] == start["total_feedback"] + 3
+    popularity = {a["attribute_id"]: a for a in after["attribute_popularity"]}
+    before_popularity = {a["attribute_id"]: a for a in start["attribute_popularity"]}
+    assert popularity[1]["total_answers"] == before_popularity[1]["total_answers"] + 1
+    assert popularity[1]["yes_count"] == before_popularity[1]["yes_count"]
+    assert popularity[2]["yes_count"] == before_popularity[2]["yes_count"] + 1
+
+
+def test_bulk_writes(client, reseed):
+    reseed([{"sport": "football", "teams": 5, "attributes": 4, "questionnaires": 10, "answers": 3, "feedback": 2}])
+    start = assert_consistent(client)
+
+    rows = [{"questionnaire_id": qid, "attribute_id": aid, "value": (qid + aid) % 2} for qid in range(1, 11) for aid in range(1, 5)]
+    rows.append({"questionnaire_id": 3, "attribute_id": 1, "value": 1})  # repeated in the same upload: last one wins
+    rows.append({"questionnaire_id": 999, "attribute_id": 1, "value": 1})  # rejected
+    body = "\n".join(json.dumps(r) for r in rows).encode()
+    r = client.post("/bulk/responses", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    # Accepted counts the answers stored, so the repeated one counts once
+    assert (r.json()["accepted"], r.json()["rejected"]) == (40, 1)
+
+    csv = b"questionnaire_id,team_id,supported\n" + b"".join(f"{q},{t},{(q * t) % 2}\n".encode() for q in range(1, 11) for t in range(1, 6))
+    r = client.post("/bulk/feedback", content=csv + b"1,999,1\n", headers={"Content-Type": "text/csv"})
+    assert r.status_code == 200
+    assert (r.json()["accepted"], r.json()["rejected"]) == (50, 1)
+
+    after = assert_consistent(client)
+    assert after["total_feedback"] == start["total_feedback"] + 50
+    assert sum(a["total_answers"] for a in after["attribute_popularity"]) == 40
@@ -0,0 +1,66 @@
+"""Bulk ingestion reports each bad line by number, valid lines around it still land."""
+from __future__ import annotations
+
+import app as A
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def test_bad_lines_are_reported_per_line(client, reseed, monkeypatch):
+    reseed([{"sport": "football", "teams": 3, "attributes": 3, "questionnaires": 3, "answers": 1, "feedback": 1}])
+    monkeypatch.setattr(A, "BULK_CHUNK_ROWS", 2)  # errors from several chunks
+    body = b"\n".join([
+        b'{"questionnaire_id": 1, "attribute_id": 1, "value": 1}',
+        b'\xff\xfe not utf-8',
+        b'{"questionnaire_id": 2, "attribute_id": 2, "value": 0}',
+        b'not json',
+        b'{"questionnaire_id": 999, "attribute_id": 2, "value": 0}',
+        b'{"questionnaire_id": 3, "attribute_id": 999, "value": 0}',
+        b'{"questionnaire_id": 3, "attribute_id": 3}',
+        b'',
+        b'{"questionnaire_id": 3, "attribute_id": 3, "value": 1}',
+    ])
+    r = client.post("/bulk/responses", content=body, headers=NDJSON)
+    assert r.status_code == 200
+    out = r.json()
+    assert out["accepted"] == 3
+    assert out["rejected"] == 5
+    assert [e["line"] for e in out["errors"]] == [2, 4, 5, 6, 7]
+    assert out["errors"][0]["error"].startswith("invalid UTF-8")
+    assert "999" in out["errors"][2]["error"]
+
+
+def test_bad_utf8_in_csv(client, reseed):
+    reseed([{"sport": "football", "teams": 3, "attributes": 3, "questionnaires": 3, "answers": 1, "feedback": 1}])
+    body = b"questionnaire_id,team_id,supported\n1,1,1\n1,\xc3\x28,1\n2,2,0\n"
+    r = client.post("/bulk/feedback", content=body, headers={"Content-Type": "text/csv"})
+    assert r.status_code == 200
+    assert r.json()["accepted"] == 2
+    assert [(e["line"], e["error"].split(":")[0]) for e in r.json()["errors"]] == [(3, "invalid UTF-8")]
+
+
+def test_errors_are_capped_but_all_counted(client, reseed):
+    reseed([{"sport": "football", "teams": 3, "attributes": 3, "questionnaires": 3, "answers": 1, "feedback": 1}])
+    bad = A.BULK_MAX_ERRORS + 50
+    body = b'{"questionnaire_id": 1, "attribute_id": 1, "value": 1}\n' + b'{"questionnaire_id": 999, "attribute_id": 1, "value": 1}\n' * bad
+    r = client.post("/bulk/responses", content=body, headers=NDJSON)
+    out = r.json()
+    assert (out["accepted"], out["rejected"]) == (1, bad)
+    # The lowest line numbers are the ones kept
+    assert [e["line"] for e in out["errors"]] == list(range(2, A.BULK_MAX_ERRORS + 2))
+
+
+def test_writer_does_not_build_catalogs(client, reseed, monkeypatch):
+    reseed([{"sport": "football", "teams": 3, "attributes": 3, "questionnaires": 3, "answers": 1, "feedback": 1}])
+
+    def no_build(*_):
+        raise AssertionError("catalog built on the writer")
+
+    monkeypatch.setattr(A, "_build_catalog", no_build)
+    A._catalogs.clear()
+    r = client.post("/bulk/responses", content=b'{"questionnaire_id": 1, "attribute_id": 3, "value": 1}\n'
+                    b'{"questionnaire_id": 1, "attribute_id": 4, "value": 1}', headers=NDJSON)
+    assert (r.json()["accepted"], r.json()["rejected"]) == (1, 1)
+    r = client.post("/bulk/feedback", content=b"questionnaire_id,team_id,supported\n2,3,1\n2,4,1\n",
+                    headers={"Content-Type": "text/csv"})
+    assert (r.json()["accepted"], r.json()["rejected"]) == (1, 1)
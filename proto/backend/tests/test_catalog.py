@@ -0,0 +1,86 @@
+"""The packed team index: popcount scoring, incremental updates and top_k selection."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import app as A
+
+
+def make_catalog(n_teams: int, n_attributes: int, seed: int = 0) -> A.TeamCatalog:
+    rng = np.random.default_rng(seed)
+    matrix = (rng.random((n_teams, n_attributes)) < 0.4).astype(np.uint8)
+    return A.TeamCatalog(list(range(1, n_teams + 1)), [f"t{i}" for i in range(n_teams)],
+                         list(range(1, n_attributes + 1)), [f"a{i}" for i in range(n_attributes)], matrix)
+
+
+def dense_overlap(catalog: A.TeamCatalog, U: np.ndarray, weights: np.ndarray):
+    UW = U * weights
+    return UW @ catalog.matrix.T.astype(np.float64), UW.sum(axis=1)
+
+
+@pytest.mark.parametrize("n_attributes", [5, 64, 130])
+def test_popcount_overlap_matches_dense(n_attributes):
+    catalog = make_catalog(300, n_attributes)
+    rng = np.random.default_rng(1)
+    U = (rng.random((7, n_attributes)) < 0.5).astype(np.uint8)
+    for weights in (np.ones(n_attributes), rng.choice([0.0, 1.0, 1.2, 1.4], n_attributes)):
+        match, desired = catalog.weighted_overlap(U, weights)
+        want_match, want_desired = dense_overlap(catalog, U, weights)
+        np.testing.assert_allclose(match, want_match, rtol=1e-12)
+        np.testing.assert_allclose(desired, want_desired, rtol=1e-12)
+
+
+def test_popcount_ties_are_exact():
+    catalog = make_catalog(400, 6, seed=3)  # few attributes, so many teams share a matching set
+    weights = np.array([1.0, 1.1, 1.2, 1.3, 1.4, 1.0])
+    U = np.array([[1, 1, 1, 0, 1, 1]], dtype=np.uint8)
+    scores = A.score_users(catalog, U, weights)[0]
+    matched = catalog.matrix & U[0]
+    for row in np.unique(matched, axis=0):
+        same = (matched == row).all(axis=1)
+        assert len(set(scores[same].tolist())) == 1
+    assert set(scores[(matched == U[0]).all(axis=1)].tolist()) == {1.0}
+    # A single user scores like the same user inside a batch
+    batch = np.vstack([U, np.ones((1, 6), dtype=np.uint8), U ^ 1])
+    assert np.array_equal(A.score_users(catalog, batch, weights)[0], scores)
+
+
+def test_set_team_updates_bits_in_place_and_appends():
+    catalog = make_catalog(16, 70)  # a full buffer, so the first new team grows it
+    updated = catalog.set_team(3, "t2", {1: 0, 65: 1, 70: 1})
+    assert updated is catalog
+    for i in range(20):
+        updated = updated.set_team(100 + i, f"new{i}", {aid: (i + aid) % 2 for aid in range(1, 71)})
+    assert updated is not catalog and len(catalog.team_ids) == 16
+    assert np.array_equal(updated.bits, A.pack_bits(updated.matrix).T)
+    fresh = A.TeamCatalog(updated.team_ids, updated.team_names, updated.attribute_ids, updated.attribute_names,
+                          updated.matrix.copy())
+    U = np.ones((1, 70), dtype=np.uint8)
+    weights = np.ones(70)
+    assert np.array_equal(A.score_users(updated, U, weights), A.score_users(fresh, U, weights))
+    assert updated.set_team(1, "t0", {999: 1}) is None
+
+
+def test_top_k_is_a_prefix_of_the_full_ranking():
+    rng = np.random.default_rng(5)
+    scores = rng.integers(0, 6, 1000) / 5.0  # lots of ties
+    full = A.rank(scores)
+    for k in (1, 7, 200, 999, 1000, 5000):
+        assert A.rank(scores, k).tolist() == full[:k].tolist()
+
+
+def test_team_writes_update_the_cached_catalog(client, reseed):
+    reseed([{"sport": "football", "teams": 10, "attributes": 8, "questionnaires": 5, "answers": 4, "feedback": 1}])
+    client.post("/predict", json={"questionnaire_id": 1})  # build and cache the catalog
+    client.post("/teams", json={"name": "Newcomers", "meta": {"sport": "football"}})
+    client.post("/teams/2/attributes", json={"attributes": {"1": 1, "2": 0, "8": 1}})
+    cached = A._catalogs[None]
+    db = A.SessionLocal()
+    try:
+        fresh = A._build_catalog(db)
+    finally:
+        db.close()
+    assert cached.team_ids == fresh.team_ids
+    assert np.array_equal(cached.matrix, fresh.matrix)
+    assert np.array_equal(cached.bits, fresh.bits)
@@ -0,0 +1,60 @@
+"""Writes from another process (a second worker, seed_data.py) reach this process's caches."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+from conftest import ADMIN
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def in_other_process(code: str) -> None:
+    """Run `code` with its own app and TestClient `c` on the same database."""
+    script = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "import app as A\n"
+        "from fastapi.testclient import TestClient\n"
+        "c = TestClient(A.app)\n" % BACKEND
+    ) + code
+    subprocess.run([sys.executable, "-c", script], check=True, env=os.environ.copy())
+
+
+def ranking(client) -> list:
+    return [s["team_id"] for s in client.post("/predict", json={"questionnaire_id": 1}).json()["scores"]]
+
+
+def test_other_process_writes_are_seen(client):
+    client.post("/admin/reseed-demo", headers=ADMIN)
+    client.post("/admin/delete-model", headers=ADMIN)
+    attributes = client.get("/attributes")
+    etag = attributes.headers["etag"]
+    teams = client.get("/teams").json()
+    feedback = client.get("/analytics").json()["total_feedback"]
+    assert ranking(client) == [1, 3, 2]
+
+    in_other_process(
+        "c.post('/attributes', json={'name': 'Other Process'})\n"
+        "c.post('/teams/2/attributes', json={'attributes': {'1': 1, '3': 1, '5': 1}})\n"
+        "c.post('/feedback', json={'questionnaire_id': 1, 'team_id': 2, 'supported': 1})\n"
+        "c.put('/weight-profiles/sentiment_v1', json={'default_weight': 1.0, 'weights': {'Big Budget': 5.0}})\n"
+    )
+    assert client.get("/attributes", headers={"If-None-Match": etag}).status_code == 200
+    assert len(client.get("/attributes").json()) == len(attributes.json()) + 1
+    assert client.get("/teams").json()[1]["attributes"] != teams[1]["attributes"]
+    assert client.get("/analytics").json()["total_feedback"] == feedback + 1
+    assert ranking(client) == [1, 2, 3]
+
+    in_other_process("A.recreate_schema()\n")
+    assert client.get("/attributes").json() == []
+    assert client.get("/teams").json() == []
+
+
+def test_seed_data_script_is_seen(client, reseed):
+    reseed()
+    teams = len(client.get("/teams").json())
+    subprocess.run([sys.executable, os.path.join(BACKEND, "seed_data.py"), "--db", os.environ["DB_PATH"],
+                    "--sport", "rugby:teams=7,attributes=5,questionnaires=10,answers=2,feedback=1"],
+                   check=True, env=os.environ.copy(), capture_output=True)
+    assert len(client.get("/teams").json()) == 7 != teams
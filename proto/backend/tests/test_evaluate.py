@@ -0,0 +1,53 @@
+"""/train/evaluate: cross-validation results, and promote saving models under the training slot."""
+from __future__ import annotations
+
+import json
+import os
+
+import app as A
+from conftest import ADMIN
+
+SPORTS = [{"sport": "football", "teams": 20, "attributes": 10, "questionnaires": 200, "answers": 5, "feedback": 2},
+          {"sport": "cricket", "teams": 10, "attributes": 10, "questionnaires": 100, "answers": 5, "feedback": 2}]
+CANDIDATES = [{"family": "logistic", "params": {"C": 0.1}}, {"family": "logistic", "params": {"C": 10.0}}]
+
+
+def evaluate(client, **options):
+    body = {"sports": ["football", "cricket"], "candidates": CANDIDATES, "folds": 3, "n_jobs": 1}
+    return client.post("/train/evaluate", json={**body, **options.pop("body", {})}, **options)
+
+
+def test_evaluate_reports_every_candidate(client, reseed):
+    reseed(SPORTS)
+    r = evaluate(client)
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert [s["sport"] for s in out["sports"]] == ["football", "cricket"]
+    for sport in out["sports"]:
+        assert sport["error"] is None and not sport["promoted"]
+        assert sorted(c["params"]["C"] for c in sport["results"]) == [0.1, 10.0]
+        assert [c["auc"] for c in sport["results"]] == sorted((c["auc"] for c in sport["results"]), reverse=True)
+    assert not os.path.exists(A._model_paths("football")[1])
+
+
+def test_promote_saves_best_candidate(client, reseed):
+    reseed(SPORTS)
+    assert evaluate(client, body={"promote": True}).status_code == 401
+    r = evaluate(client, body={"promote": True}, headers=ADMIN)
+    assert r.status_code == 200, r.text
+    for sport in r.json()["sports"]:
+        assert sport["promoted"]
+        with open(A._model_paths(sport["sport"])[1]) as f:
+            meta = json.load(f)
+        assert meta["evaluation"]["params"] == sport["results"][0]["params"]
+    assert client.post("/predict?sport=football", json={"questionnaire_id": 1}).json()["model_used"]
+
+
+def test_promote_waits_for_no_training_run(client, reseed):
+    reseed(SPORTS)
+    with A._training_slot("Cricket"):
+        r = evaluate(client, body={"promote": True}, headers=ADMIN)
+        assert r.status_code == 409
+    # Nothing is promoted, not even the sport whose slot was free, and its slot is released again
+    assert not os.path.exists(A._model_paths("football")[1])
+    assert client.post("/train?sport=football").status_code == 200
@@ -0,0 +1,84 @@
+"""/export/{table}: rows, filters, formats and gzip match what is in the database."""
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+from collections import Counter
+from typing import Any, Dict, List
+
+import pytest
+
+import app as A
+from conftest import ADMIN
+
+SPORTS = [{"sport": "football", "teams": 20, "attributes": 8, "questionnaires": 60, "answers": 4, "feedback": 3},
+          {"sport": "cricket", "teams": 10, "attributes": 8, "questionnaires": 30, "answers": 4, "feedback": 3}]
+
+
+def export(client, table: str, **params: Any) -> bytes:
+    r = client.get(f"/export/{table}", params=params, headers=ADMIN)
+    assert r.status_code == 200, r.text
+    return r.content
+
+
+def ndjson(client, table: str, **params: Any) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in export(client, table, **params).decode().splitlines()]
+
+
+def test_needs_admin_and_valid_filters(client):
+    assert client.get("/export/feedback").status_code == 401
+    assert client.get("/export/questionnaires", headers=ADMIN).status_code == 404
+    assert client.get("/export/team_attributes?since=2024-01-01", headers=ADMIN).status_code == 400
+    assert client.get("/export/responses?sport=football", headers=ADMIN).status_code == 400
+
+
+def test_feedback_rows_and_filters(client, reseed):
+    reseed(SPORTS)
+    db = A.SessionLocal()
+    try:
+        feedback = [tuple(r) for r in db.query(A.Feedback.id, A.Feedback.team_id, A.Feedback.supported).order_by(A.Feedback.id)]
+        football = {t for (t,) in db.query(A.Team.id).filter(A.Team.sport == "football")}
+    finally:
+        db.close()
+    rows = ndjson(client, "feedback")
+    assert [(r["id"], r["team_id"], r["supported"]) for r in rows] == feedback
+
+    cut = feedback[len(feedback) // 2][0]
+    assert [r["id"] for r in ndjson(client, "feedback", since_id=cut)] == [f[0] for f in feedback if f[0] > cut]
+    assert [r["id"] for r in ndjson(client, "feedback", sport="Football")] == [f[0] for f in feedback if f[1] in football]
+    assert ndjson(client, "feedback", since="2999-01-01T00:00:00Z") == []
+
+
+@pytest.mark.parametrize("table", ["feedback", "responses", "team_attributes"])
+def test_csv_and_gzip_hold_the_same_rows(client, reseed, table):
+    reseed(SPORTS)
+    rows = ndjson(client, table)
+    assert rows
+    text = export(client, table, format="csv").decode()
+    parsed = list(csv.DictReader(io.StringIO(text)))
+    assert [{k: str(v) for k, v in r.items()} for r in rows] == parsed
+    assert gzip.decompress(export(client, table, format="csv", gzip=True)).decode() == text
+
+
+def test_training_rows_match_the_training_matrix(client, reseed):
+    reseed(SPORTS)
+    db = A.SessionLocal()
+    try:
+        attribute_ids = [a for (a,) in db.query(A.Attribute.id).order_by(A.Attribute.id)]
+        team_ids = A._sport_team_ids(db, "cricket")
+        X, y, _ = A._build_dataset(db, attribute_ids, team_ids, sport="cricket")
+    finally:
+        db.close()
+    want = Counter((tuple(x), int(label)) for x, label in zip(X.tolist(), y.tolist()))
+
+    rows = ndjson(client, "training", sport="cricket")
+    assert Counter((tuple(int(a in r["attributes"]) for a in attribute_ids), r["supported"]) for r in rows) == want
+    text = gzip.decompress(export(client, "training", sport="cricket", format="csv", gzip=True)).decode()
+    parsed = list(csv.DictReader(io.StringIO(text)))
+    assert Counter((tuple(int(r[f"attr_{a}"]) for a in attribute_ids), int(r["supported"])) for r in parsed) == want
+
+    cut = max(r["feedback_id"] for r in rows[: len(rows) // 2])
+    assert sorted(r["feedback_id"] for r in ndjson(client, "training", sport="cricket", since_id=cut)) == \
+        sorted(r["feedback_id"] for r in rows if r["feedback_id"] > cut)
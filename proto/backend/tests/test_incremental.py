@@ -0,0 +1,54 @@
+"""mode=incremental bootstraps from the full history, then only consumes feedback past its watermark."""
+from __future__ import annotations
+
+import json
+import os
+
+import app as A
+
+SPORTS = [{"sport": "football", "teams": 20, "attributes": 10, "questionnaires": 100, "answers": 5, "feedback": 2}]
+
+
+def incremental(client) -> dict:
+    r = client.post("/train?sport=football&mode=incremental")
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def model_meta() -> dict:
+    with open(os.path.join(A.MODEL_DIR, "model_meta_football.json")) as f:
+        return json.load(f)
+
+
+def test_watermark_and_bootstrap(client, reseed):
+    reseed(SPORTS)
+    first = incremental(client)
+    assert (first["mode"], first["saved"], first["trained_on_rows"]) == ("incremental", True, 200)
+    watermark = first["feedback_watermark"]
+    assert model_meta()["feedback_watermark"] == watermark
+    assert sum(model_meta()["class_counts"]) == 200
+
+    nothing = incremental(client)
+    assert (nothing["saved"], nothing["trained_on_rows"], nothing["feedback_watermark"]) == (False, 0, watermark)
+
+    coef = A.model_registry.load_estimator("football").model.coef_.copy()
+    for team_id, supported in ((1, 1), (2, 0), (3, 1)):
+        assert client.post("/feedback", json={"questionnaire_id": 1, "team_id": team_id, "supported": supported}).status_code == 200
+    update = incremental(client)
+    assert (update["saved"], update["trained_on_rows"]) == (True, 3)
+    assert update["feedback_watermark"] > watermark
+    assert sum(model_meta()["class_counts"]) == 203
+    assert (A.model_registry.load_estimator("football").model.coef_ != coef).any()
+
+    # A full refit replaces the online model, so the next incremental run starts over
+    assert client.post("/train?sport=football").json()["trained_on_rows"] == 203
+    assert incremental(client)["trained_on_rows"] == 203
+
+
+def test_new_attribute_restarts_from_full_history(client, reseed):
+    reseed(SPORTS)
+    incremental(client)
+    client.post("/attributes", json={"name": "Late Addition"})
+    again = incremental(client)
+    assert again["trained_on_rows"] == 200
+    assert len(again["attributes"]) == 11
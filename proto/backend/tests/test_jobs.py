@@ -0,0 +1,47 @@
+"""At most one training run per sport: a second job or a synchronous /train for it gets 409."""
+from __future__ import annotations
+
+import time
+
+import app as A
+
+SPORTS = [{"sport": "football", "teams": 20, "attributes": 10, "questionnaires": 200, "answers": 5, "feedback": 2},
+          {"sport": "cricket", "teams": 10, "attributes": 10, "questionnaires": 100, "answers": 5, "feedback": 2}]
+
+
+def wait_for(client, job_id: str, timeout: float = 120.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/train/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} still {job['status']} after {timeout}s")
+
+
+def test_duplicate_sport_conflicts_with_sync_training(client, reseed):
+    reseed(SPORTS)
+    with A._training_slot("football"):
+        assert client.post("/train/jobs?sport=football").status_code == 409
+        assert client.post("/train?sport=Football").status_code == 409
+        assert client.post("/train?sport=cricket").status_code == 200
+    assert client.post("/train?sport=football").status_code == 200
+
+
+def test_duplicate_sport_job_conflicts(client, reseed):
+    reseed(SPORTS)
+    r = client.post("/train/jobs?sport=football")
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+    # The worker process takes a while to start, so the first job is still queued or running here
+    assert client.post("/train/jobs?sport=FOOTBALL").status_code == 409
+    assert client.post("/train?sport=football").status_code == 409
+    other = client.post("/train/jobs?sport=cricket")
+    assert other.status_code == 202
+
+    assert wait_for(client, job_id)["status"] == "succeeded"
+    assert wait_for(client, other.json()["job_id"])["status"] == "succeeded"
+    # The slot is released once the job is done
+    again = client.post("/train/jobs?sport=football")
+    assert again.status_code == 202
+    assert wait_for(client, again.json()["job_id"])["status"] == "succeeded"
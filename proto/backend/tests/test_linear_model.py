@@ -0,0 +1,59 @@
+"""Served linear models score exactly like the scikit-learn estimators they were exported from."""
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pytest
+
+import app as A
+
+SPORTS = [{"sport": "football", "teams": 25, "attributes": 70, "questionnaires": 300, "answers": 10, "feedback": 3}]
+
+
+@pytest.mark.parametrize("mode", ["full", "incremental"])
+def test_predict_proba_matches_estimator_exactly(client, reseed, mode):
+    reseed(SPORTS)
+    assert client.post(f"/train?sport=football&mode={mode}").status_code == 200
+    served = A.model_registry.get("football")
+    estimator = A.model_registry.load_estimator("football").model
+    assert isinstance(served.model, A.LinearModel)
+    assert served.model.estimator == type(estimator).__name__
+
+    rng = np.random.default_rng(0)
+    X = (rng.random((5000, len(served.attribute_ids))) < 0.3).astype(np.uint8)
+    assert np.array_equal(served.model.decision_function(X), estimator.decision_function(X))
+    assert np.array_equal(served.model.predict_proba(X), estimator.predict_proba(X))
+
+    # Through /predict as well: every team's score is the estimator's probability
+    scores = client.post("/predict?sport=football", json={"questionnaire_id": 7}).json()["scores"]
+    catalog = A._catalogs["football"]
+    db = A.SessionLocal()
+    try:
+        prefs = dict(db.query(A.QuestionnaireResponse.attribute_id, A.QuestionnaireResponse.value)
+                     .filter(A.QuestionnaireResponse.questionnaire_id == 7))
+    finally:
+        db.close()
+    user = catalog.user_vector(prefs, served.attribute_ids)
+    want = estimator.predict_proba(catalog.columns(served.attribute_ids) & user)[:, 1]
+    got = {s["team_id"]: s["score"] for s in scores}
+    assert [got[tid] for tid in catalog.team_ids] == want.tolist()
+
+
+def test_round_trip_and_refusal():
+    rng = np.random.default_rng(1)
+    model = A.LinearModel(rng.normal(size=(1, 6)), np.array([0.3]), np.array([0, 1]), "LogisticRegression")
+    buf = io.StringIO()
+    model.dump(buf)
+    buf.seek(0)
+    loaded = A.LinearModel.load(buf)
+    X = (rng.random((50, 6)) < 0.5).astype(np.uint8)
+    assert np.array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+    class NotQuiteLinear:
+        coef_, intercept_, classes_ = model.coef, model.intercept, model.classes_
+
+        def predict_proba(self, X):
+            return model.predict_proba(X) * (1 + 1e-15)
+
+    assert A.LinearModel.from_estimator(NotQuiteLinear(), 6) is None
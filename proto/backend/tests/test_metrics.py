@@ -0,0 +1,55 @@
+"""/metrics: per-route request counts, latency and SQL histograms, stage timings and state gauges."""
+from __future__ import annotations
+
+from typing import Dict
+
+from conftest import count_sql
+
+
+def scrape(client) -> Dict[str, float]:
+    """Every sample as `name{labels}` -> value."""
+    out = {}
+    for line in client.get("/metrics").text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            out[key] = float(value)
+    return out
+
+
+def delta(before: Dict[str, float], after: Dict[str, float], key: str) -> float:
+    return after.get(key, 0.0) - before.get(key, 0.0)
+
+
+def test_requests_are_counted_by_route_template(client, reseed):
+    reseed()
+    before = scrape(client)
+    client.get("/teams/1")
+    client.get("/teams/2")
+    client.get("/teams/999999")
+    with count_sql() as n:
+        client.post("/predict", json={"questionnaire_id": 1})
+    after = scrape(client)
+
+    teams = 'method="GET",route="/teams/{team_id}"'
+    assert delta(before, after, f'http_requests_total{{{teams},status="200"}}') == 2
+    assert delta(before, after, f'http_requests_total{{{teams},status="404"}}') == 1
+    assert delta(before, after, f"http_request_duration_seconds_count{{{teams}}}") == 3
+    assert delta(before, after, f'http_request_duration_seconds_bucket{{{teams},le="+Inf"}}') == 3
+    assert not any("/teams/1" in key or "/teams/999999" in key for key in after)
+
+    predict = 'method="POST",route="/predict"'
+    assert delta(before, after, f"http_request_sql_statements_sum{{{predict}}}") == n[0]
+    for stage in ("response_load", "catalog_load", "model_load", "weights", "sort_serialize"):
+        assert delta(before, after, f'stage_duration_seconds_count{{op="predict",stage="{stage}"}}') == 1
+
+
+def test_state_gauges(client, reseed):
+    reseed([{"sport": "football", "teams": 9, "attributes": 5, "questionnaires": 30, "answers": 3, "feedback": 2}])
+    client.post("/train?sport=football")
+    client.post("/predict?sport=football", json={"questionnaire_id": 1})
+    client.post("/predict?sport=football", json={"questionnaire_id": 1})
+    samples = scrape(client)
+    assert samples['team_catalog_teams{sport="football"}'] == 9
+    assert samples["prediction_cache_hits_total"] >= 1
+    assert any(key.startswith('model_registry_model_info{sport="football"') for key in samples)
+    assert samples['stage_duration_seconds_count{op="train_full",stage="fit"}'] >= 1
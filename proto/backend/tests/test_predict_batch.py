@@ -0,0 +1,42 @@
+"""/predict/batch streams one line per entry, in input order, matching single /predict calls."""
+from __future__ import annotations
+
+import json
+
+import app as A
+
+SPORTS = [{"sport": "football", "teams": 15, "attributes": 12, "questionnaires": 40, "answers": 6, "feedback": 2}]
+
+
+def batch(client, payload: dict, query: str = "") -> list:
+    r = client.post(f"/predict/batch{query}", json=payload)
+    assert r.status_code == 200, r.text
+    return [json.loads(line) for line in r.text.splitlines()]
+
+
+def test_lines_follow_input_order(client, reseed):
+    reseed(SPORTS)
+    lines = batch(client, {"questionnaire_ids": [1, 2, 99999, 1], "answers": [{"1": 1}, {}]})
+    assert [line.get("questionnaire_id", line.get("answers_index")) for line in lines] == [1, 2, 99999, 1, 0, 1]
+    assert lines[2]["error"] == "Questionnaire not found"
+    assert lines[0] == lines[3]
+
+
+def test_order_across_chunks(client, reseed, monkeypatch):
+    reseed(SPORTS)
+    monkeypatch.setattr(A, "BATCH_CHUNK_SIZE", 3)
+    ids = [5, 99999, 5, 3, 7, 88888, 3, 1]
+    lines = batch(client, {"questionnaire_ids": ids})
+    assert [line["questionnaire_id"] for line in lines] == ids
+    assert ["error" in line for line in lines] == [qid > 1000 for qid in ids]
+
+
+def test_matches_single_predictions(client, reseed):
+    reseed(SPORTS)
+    client.post("/train?sport=football")
+    for payload in ({"blend": 0.5, "top_k": 4}, {"weights_profile": "uniform"}):
+        lines = batch(client, {"questionnaire_ids": [4, 2, 9], **payload}, "?sport=football")
+        for line in lines:
+            single = client.post("/predict?sport=football", json={"questionnaire_id": line["questionnaire_id"], **payload}).json()
+            assert line["scores"] == single["scores"]
+            assert line["model_used"] == single["model_used"]
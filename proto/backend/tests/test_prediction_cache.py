@@ -0,0 +1,85 @@
+"""The per-answer-set prediction cache: hits for the same yes set, misses after anything scores change."""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+import app as A
+
+SPORTS = [{"sport": "football", "teams": 12, "attributes": 8, "questionnaires": 20, "answers": 4, "feedback": 2}]
+
+
+def stats(client) -> dict:
+    return client.get("/predict/cache").json()
+
+
+def predict(client, qid: int, **payload) -> list:
+    r = client.post("/predict", json={"questionnaire_id": qid, **payload})
+    assert r.status_code == 200, r.text
+    return r.json()["scores"]
+
+
+def yes_set(qid: int) -> dict:
+    db = A.SessionLocal()
+    try:
+        return dict(db.query(A.QuestionnaireResponse.attribute_id, A.QuestionnaireResponse.value)
+                    .filter(A.QuestionnaireResponse.questionnaire_id == qid))
+    finally:
+        db.close()
+
+
+def test_hits_and_invalidation(client, reseed):
+    reseed(SPORTS)
+    first = predict(client, 1)
+    before = stats(client)
+    assert predict(client, 1) == first
+    assert stats(client)["hits"] == before["hits"] + 1
+
+    # Another questionnaire with the same yes answers shares the entry
+    q = client.post("/questionnaires", json={}).json()["id"]
+    answers = [{"attribute_id": aid, "value": 1} for aid, value in yes_set(1).items() if value]
+    client.post(f"/questionnaires/{q}/responses", json={"responses": answers})
+    hits = stats(client)["hits"]
+    assert predict(client, q) == first
+    assert stats(client)["hits"] == hits + 1
+
+    # A different blend or profile is a different entry
+    misses = stats(client)["misses"]
+    predict(client, 1, weights_profile="uniform")
+    assert stats(client)["misses"] == misses + 1
+
+    # Team attribute writes, profile edits and retrains move the key
+    client.put("/weight-profiles/cache_test", json={"weights": {}})
+    predict(client, 1, weights_profile="cache_test")
+    for change in (
+        lambda: client.post("/teams/1/attributes", json={"attributes": {"1": 1, "2": 1}}),
+        lambda: client.put("/weight-profiles/cache_test", json={"default_weight": 2.0}),
+        lambda: client.post("/train"),
+    ):
+        assert change().status_code == 200
+        misses = stats(client)["misses"]
+        predict(client, 1, weights_profile="cache_test")
+        assert stats(client)["misses"] == misses + 1
+    client.delete("/weight-profiles/cache_test")
+
+
+def test_lru_bytes_and_ttl():
+    cache = A.PredictionCache(max_entries=2, max_bytes=3 * 80, ttl=60.0)
+    scores = [np.full(10, float(i)) for i in range(4)]  # 80 bytes each
+    cache.put(("a",), scores[0])
+    cache.put(("b",), scores[1])
+    assert cache.get(("a",)) is scores[0]  # "a" becomes most recent
+    cache.put(("c",), scores[2])
+    assert cache.get(("b",)) is None and cache.get(("a",)) is not None
+    assert cache.stats()["evictions"] == 1
+    assert not scores[0].flags.writeable
+
+    cache.put(("big",), np.zeros(100))  # over max_bytes on its own: not stored
+    assert cache.get(("big",)) is None
+
+    short = A.PredictionCache(max_entries=4, max_bytes=1 << 20, ttl=0.01)
+    short.put(("x",), scores[3])
+    time.sleep(0.02)
+    assert short.get(("x",)) is None
+    assert short.stats()["expirations"] == 1
@@ -0,0 +1,63 @@
+"""Query counts of the hot endpoints must not grow with the data.
+
+QUERY_BUDGET=strict (set in conftest) fails any call over its `@query_budget`; on top of that,
+the same calls must run the same number of statements on a small and a 100x larger dataset.
+`GET /teams` has no budget since it streams pages, so its count may only grow by page.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+import pytest
+
+import app as A
+from conftest import count_sql
+
+SMALL = [{"sport": "football", "teams": 20, "attributes": 30, "questionnaires": 60, "answers": 10, "feedback": 3},
+         {"sport": "cricket", "teams": 10, "attributes": 30, "questionnaires": 20, "answers": 10, "feedback": 3}]
+LARGE = [{"sport": "football", "teams": 2500, "attributes": 30, "questionnaires": 6000, "answers": 10, "feedback": 3},
+         {"sport": "cricket", "teams": 500, "attributes": 30, "questionnaires": 2000, "answers": 10, "feedback": 3}]
+
+CALLS = [
+    ("POST", "/predict", {"json": {"questionnaire_id": 3}}),
+    ("POST", "/predict?sport=football", {"json": {"questionnaire_id": 4, "blend": 0.5, "top_k": 5}}),
+    ("POST", "/predict?sport=cricket", {"json": {"questionnaire_id": 5, "weights_profile": "uniform"}}),
+    ("GET", "/teams?limit=50", {}),
+    ("GET", "/teams?sport=cricket&limit=20&after=22", {}),
+    ("GET", "/teams/3", {}),
+    ("POST", "/teams/3/attributes", {"json": {"attributes": {"1": 1, "2": 0}}}),
+    ("POST", "/train?sport=football", {}),
+    ("POST", "/train?sport=football&mode=incremental", {}),
+    ("POST", "/train?sport=cricket", {}),
+]
+
+
+def statements(client) -> Dict[str, int]:
+    out = {}
+    for method, url, kwargs in CALLS:
+        with count_sql() as n:
+            r = client.request(method, url, **kwargs)
+        assert r.status_code == 200, (url, r.text)
+        out[f"{method} {url}"] = n[0]
+    return out
+
+
+def test_budgets_hold_and_do_not_grow(client, reseed):
+    counts = {}
+    for name, sports in (("small", SMALL), ("large", LARGE)):
+        reseed(sports)
+        statements(client)  # cold: catalogs built, models trained and loaded, all within budget
+        counts[name] = statements(client)
+    assert counts["small"] == counts["large"]
+
+
+@pytest.mark.parametrize("teams", [10, 2 * A.TEAM_PAGE_ROWS + 10])
+def test_team_listing_grows_only_by_page(client, reseed, teams):
+    reseed([{"sport": "football", "teams": teams, "attributes": 30, "questionnaires": 1, "answers": 5, "feedback": 1}])
+    with count_sql() as n:
+        r = client.get("/teams")
+    assert len(r.json()) == teams
+    pages = -(-teams // A.TEAM_PAGE_ROWS)
+    # The version check, then a team query and an attribute query per page (plus one empty page
+    # read when the last page is full)
+    assert n[0] <= 1 + 2 * pages + 1
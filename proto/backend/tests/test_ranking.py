@@ -0,0 +1,134 @@
+"""/predict must rank like the original per-team heuristic loop when no model is loaded.
+
+Scores are sums in a different order than the loop's, so they agree to the last few bits and
+rankings agree up to such near-ties; teams with the same matching attributes must still tie exactly.
+"""
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+import app as A
+
+
+def baseline_ranking(db, questionnaire_id: int, profile: str, sport=None) -> List[Tuple[int, float]]:
+    """The heuristic as the original /predict computed it, one team at a time."""
+    attributes = {a.id: a.name for a in db.query(A.Attribute.id, A.Attribute.name)}
+    teams = db.query(A.Team.id).order_by(A.Team.id.asc())
+    if sport is not None:
+        teams = teams.filter(A.Team.sport == A.sport_key(sport))
+    default, by_name = db.query(A.WeightProfile.default_weight, A.WeightProfile.weights).filter(A.WeightProfile.name == profile).one()
+    by_name = {name.lower(): w for name, w in json.loads(by_name).items()}
+    weights = {aid: float(by_name.get(name.lower(), default)) for aid, name in attributes.items()}
+    user_prefs = {
+        r.attribute_id: r.value
+        for r in db.query(A.QuestionnaireResponse)
+        .filter(A.QuestionnaireResponse.questionnaire_id == questionnaire_id)
+        .order_by(A.QuestionnaireResponse.attribute_id.asc())
+    }
+    scores = []
+    for (team_id,) in teams:
+        team_attrs: Dict[int, int] = dict(
+            db.query(A.TeamAttribute.attribute_id, A.TeamAttribute.value).filter(A.TeamAttribute.team_id == team_id)
+        )
+        desired_w = sum(weights[aid] for aid, v in user_prefs.items() if v == 1)
+        if desired_w == 0:
+            heur = 0.0
+        else:
+            match_w = sum(weights[aid] for aid, v in user_prefs.items() if v == 1 and team_attrs.get(aid, 0) == 1)
+            heur = match_w / desired_w
+        scores.append((team_id, heur))
+    scores.sort(key=lambda s: s[1], reverse=True)
+    return scores
+
+
+def assert_same_ranking(got: List[Tuple[int, float]], expected: List[Tuple[int, float]]) -> None:
+    want = dict(expected)
+    assert sorted(t for t, _ in got) == sorted(want)
+    for team_id, score in got:
+        assert score == pytest.approx(want[team_id], rel=1e-12, abs=1e-12)
+    # Descending, and teams only swap places with the baseline where its scores are within rounding
+    for (a, score_a), (b, score_b) in zip(got, got[1:]):
+        assert score_a >= score_b
+        assert want[a] >= want[b] - 1e-12
+        if score_a == score_b:
+            assert a < b
+
+
+def matched_sets(db, questionnaire_id: int, team_ids: List[int]) -> Dict[int, frozenset]:
+    wanted = {aid for (aid,) in db.query(A.QuestionnaireResponse.attribute_id)
+              .filter(A.QuestionnaireResponse.questionnaire_id == questionnaire_id, A.QuestionnaireResponse.value == 1)}
+    has: Dict[int, set] = {t: set() for t in team_ids}
+    for team_id, aid in db.query(A.TeamAttribute.team_id, A.TeamAttribute.attribute_id).filter(
+            A.TeamAttribute.team_id.in_(team_ids), A.TeamAttribute.value == 1):
+        has[team_id].add(aid)
+    return {t: frozenset(has[t] & wanted) for t in team_ids}
+
+
+@pytest.mark.parametrize("profile", ["sentiment_v1", "uniform"])
+def test_named_dataset_matches_baseline(client, reseed, profile):
+    reseed()
+    db = A.SessionLocal()
+    try:
+        qids = [qid for (qid,) in db.query(A.Questionnaire.id).order_by(A.Questionnaire.id)]
+        assert qids
+        for qid in qids:
+            r = client.post("/predict", json={"questionnaire_id": qid, "weights_profile": profile})
+            assert r.status_code == 200
+            assert r.json()["model_used"] is None
+            got = [(s["team_id"], s["score"]) for s in r.json()["scores"]]
+            assert_same_ranking(got, baseline_ranking(db, qid, profile))
+    finally:
+        db.close()
+
+
+def test_sport_filter_and_ties_match_baseline(client, reseed):
+    # Few attributes and many teams, so lots of teams share the same matching set and tie
+    reseed([{"sport": "football", "teams": 60, "attributes": 6, "questionnaires": 15, "answers": 4, "feedback": 1},
+            {"sport": "cricket", "teams": 20, "attributes": 6, "questionnaires": 5, "answers": 4, "feedback": 1}], seed=7)
+    db = A.SessionLocal()
+    try:
+        for qid in range(1, 16):
+            r = client.post("/predict?sport=football", json={"questionnaire_id": qid})
+            got = [(s["team_id"], s["score"]) for s in r.json()["scores"]]
+            assert_same_ranking(got, baseline_ranking(db, qid, A.DEFAULT_WEIGHT_PROFILE, sport="football"))
+            by_set: Dict[frozenset, set] = {}
+            sets = matched_sets(db, qid, [t for t, _ in got])
+            for team_id, score in got:
+                by_set.setdefault(sets[team_id], set()).add(score)
+            assert all(len(scores) == 1 for scores in by_set.values())
+    finally:
+        db.close()
+
+
+def test_model_weights_ignore_harmful_matches():
+    catalog = A.TeamCatalog([1, 2, 3], ["a", "b", "c"], [10, 20, 30, 40], ["w", "x", "y", "z"],
+                            np.array([[1, 0, 0, 1], [1, 1, 0, 1], [1, 0, 1, 0]], dtype=np.uint8))
+    # The model knows 10, 20 and 30 (in its own order); 20 lowers the odds of support, 40 is new
+    model = A.LinearModel(np.array([[0.5, 2.0, -1.5]]), np.array([0.1]), np.array([0, 1]), "LogisticRegression")
+    entry = A.LoadedModel(model, [30, 10, 20], [1, 2, 3], "v", (), {})
+    weights = A._model_weights(catalog, entry)
+    assert weights.tolist() == [1.0, 0.0, 0.25, 0.0]
+
+    scores = A.score_users(catalog, np.ones((1, 4), dtype=np.uint8), weights)[0]
+    # Team 2 only adds attributes with a harmful and an unknown coefficient to team 1's
+    assert scores[0] == scores[1] == 0.8
+    assert scores[2] == 1.0
+
+    negative = A.LinearModel(np.array([[-0.5, -2.0, 0.0]]), np.array([0.1]), np.array([0, 1]), "LogisticRegression")
+    assert A._model_weights(catalog, entry._replace(model=negative)).tolist() == [1.0] * 4
+
+
+def test_weighted_product_matches_loop():
+    rng = np.random.default_rng(5)
+    matrix = (rng.random((500, 40)) < 0.4).astype(np.uint8)
+    catalog = A.TeamCatalog(list(range(500)), [str(i) for i in range(500)], list(range(40)), [str(j) for j in range(40)], matrix)
+    U = (rng.random((9, 40)) < 0.3).astype(np.uint8)
+    weights = rng.random(40)  # more distinct values than the popcount path takes
+    match, desired = catalog.weighted_overlap(U, weights)
+    want_match = np.array([[sum(weights[j] for j in range(40) if u[j] and t[j]) for t in matrix] for u in U])
+    np.testing.assert_allclose(match, want_match, rtol=1e-12)
+    np.testing.assert_allclose(desired, [weights[u == 1].sum() for u in U], rtol=1e-12)
@@ -0,0 +1,53 @@
+"""The seeding engine gives the same rows for the same request and seed, however it is chunked."""
+from __future__ import annotations
+
+import hashlib
+
+from sqlalchemy import text
+
+import app as A
+from conftest import ADMIN
+
+SPORTS = [{"sport": "football", "teams": 300, "attributes": 40, "questionnaires": 500, "answers": 8, "feedback": 3},
+          {"sport": "cricket", "teams": 12, "attributes": 10, "questionnaires": 40}]
+TABLES = {
+    "attributes": "id, name", "teams": "id, name, meta, sport", "team_attributes": "team_id, attribute_id, value",
+    "questionnaire_responses": "questionnaire_id, attribute_id, value", "feedback": "id, questionnaire_id, team_id, supported",
+    "attribute_stats": "attribute_id, yes_count, total_answers", "team_stats": "team_id, support_yes, total",
+}
+
+
+def fingerprint() -> dict:
+    out = {}
+    with A.engine.connect() as conn:
+        for table, columns in TABLES.items():
+            rows = conn.execute(text(f"SELECT {columns} FROM {table} ORDER BY {columns}")).fetchall()
+            out[table] = hashlib.sha256(repr(rows).encode()).hexdigest()
+    return out
+
+
+def test_same_seed_same_rows(reseed):
+    counts = reseed(SPORTS, seed=5)
+    first = fingerprint()
+    again = reseed(SPORTS, seed=5)
+    assert {**again, "seconds": None} == {**counts, "seconds": None}
+    assert fingerprint() == first
+    reseed(SPORTS, seed=6)
+    other = fingerprint()
+    assert other["team_attributes"] != first["team_attributes"]
+    assert other["feedback"] != first["feedback"]
+
+
+def test_team_blocks_do_not_change_the_draws(reseed, monkeypatch):
+    reseed(SPORTS, seed=5)
+    whole = fingerprint()["team_attributes"]
+    monkeypatch.setattr(A, "SEED_BLOCK_CELLS", 7 * 40)  # football teams drawn 7 at a time
+    reseed(SPORTS, seed=5)
+    assert fingerprint()["team_attributes"] == whole
+
+
+def test_team_matrix_is_bounded(client):
+    too_big = {"sport": "huge", "teams": 1_000_000, "attributes": A.SEED_MAX_TEAM_CELLS // 1_000_000 + 1}
+    r = client.post("/admin/reseed-large", headers=ADMIN, json={"sports": [too_big]})
+    assert r.status_code == 422
+    assert "teams x attributes" in r.text
@@ -0,0 +1,120 @@
+"""Training snapshots are reused, appended to or rebuilt exactly when the training matrix changed."""
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import app as A
+from conftest import ADMIN, snapshot_outcomes
+
+SPORTS = [{"sport": "football", "teams": 30, "attributes": 12, "questionnaires": 200, "answers": 6, "feedback": 2}]
+
+
+def canonical(X, y) -> np.ndarray:
+    M = np.hstack([np.asarray(X), np.asarray(y)[:, None]])
+    return M[np.lexsort(M.T[::-1])]
+
+
+def assert_matches_fresh_build(sport="football"):
+    """The snapshot holds the same rows (in any order) as building the matrix from scratch."""
+    db = A.SessionLocal()
+    try:
+        attribute_ids = [a for (a,) in db.query(A.Attribute.id).order_by(A.Attribute.id)]
+        team_ids = A._sport_team_ids(db, sport)
+        X1, y1, w1 = A._build_dataset(db, attribute_ids, team_ids, sport=sport)
+        X2, y2, w2 = A.load_training_matrix(db, sport, attribute_ids, team_ids)
+    finally:
+        db.close()
+    assert w1 == w2
+    assert np.array_equal(canonical(X1, y1), canonical(X2, y2))
+
+
+@pytest.fixture
+def train(client):
+    """POST /train for football and return which snapshot outcome it had."""
+    def _train() -> str:
+        before = snapshot_outcomes(client)
+        r = client.post("/train?sport=football")
+        assert r.status_code == 200, r.text
+        after = snapshot_outcomes(client)
+        (outcome,) = [k for k in after if after[k] != before.get(k, 0)]
+        return outcome
+
+    return _train
+
+
+def first_answer(questionnaire_id: int):
+    db = A.SessionLocal()
+    try:
+        row = db.query(A.QuestionnaireResponse).filter_by(questionnaire_id=questionnaire_id).first()
+        return row.attribute_id, row.value
+    finally:
+        db.close()
+
+
+def test_reuse_append_and_rebuild(client, reseed, train):
+    reseed(SPORTS)
+    assert train() == "rebuilt"
+    assert train() == "reused"
+    client.post("/feedback", json={"questionnaire_id": 1, "team_id": 2, "supported": 1})
+    assert train() == "appended"
+    assert_matches_fresh_build()
+
+    client.post("/teams/1/attributes", json={"attributes": {"1": 1, "2": 0}})
+    assert train() == "rebuilt"
+    client.post("/attributes", json={"name": "Brand New"})
+    assert train() == "rebuilt"
+    assert_matches_fresh_build()
+
+    reseed(SPORTS)  # same rows, but a new feedback table
+    assert train() == "rebuilt"
+
+
+def test_changed_answers_rebuild(client, reseed, train):
+    reseed(SPORTS)
+    assert train() == "rebuilt"
+
+    # A questionnaire nobody gave feedback on is not in the matrix
+    q = client.post("/questionnaires", json={}).json()["id"]
+    client.post(f"/questionnaires/{q}/responses", json={"responses": [{"attribute_id": 1, "value": 1}]})
+    assert train() == "reused"
+
+    # The same answer again changes nothing
+    aid, value = first_answer(1)
+    client.post("/questionnaires/1/responses", json={"responses": [{"attribute_id": aid, "value": value}]})
+    assert train() == "reused"
+
+    client.post("/questionnaires/1/responses", json={"responses": [{"attribute_id": aid, "value": 1 - value}]})
+    assert train() == "rebuilt"
+    assert_matches_fresh_build()
+
+    line = json.dumps({"questionnaire_id": 1, "attribute_id": aid, "value": value}).encode()
+    client.post("/bulk/responses", content=line, headers={"Content-Type": "application/x-ndjson"})
+    assert train() == "rebuilt"
+    assert_matches_fresh_build()
+
+
+def test_snapshot_files_per_sport(client, reseed):
+    reseed([{"sport": "default", "teams": 10, "attributes": 6, "questionnaires": 60, "answers": 4, "feedback": 2},
+            {"sport": "Foo/Bar", "teams": 10, "attributes": 6, "questionnaires": 60, "answers": 4, "feedback": 2}])
+    for query in ("", "?sport=default", "?sport=Foo/Bar"):
+        r = client.post(f"/train{query}")
+        assert r.status_code == 200, r.text
+    files = set(os.listdir(A.MODEL_DIR))
+    assert {"dataset_meta_default.json", "dataset_meta_%64efault.json", "dataset_meta_foo%2Fbar.json"} <= files
+    with open(os.path.join(A.MODEL_DIR, "dataset_meta_%64efault.json")) as f:
+        assert json.load(f)["rows"] == 120
+    with open(os.path.join(A.MODEL_DIR, "dataset_meta_default.json")) as f:
+        assert json.load(f)["rows"] == 240
+
+
+def test_delete_model_drops_registry_entry_of_escaped_sport(client, reseed):
+    reseed([{**SPORTS[0], "sport": "Foo/Bar"}])
+    assert client.post("/train?sport=Foo/Bar").status_code == 200
+    assert A.model_registry.get("Foo/Bar") is not None
+    assert A.sport_slug("Foo/Bar") in A.model_registry.stats()["models"]
+    assert client.post("/admin/delete-model?sport=Foo/Bar", headers=ADMIN).status_code == 200
+    assert A.model_registry.stats()["models"] == {}